@@ -0,0 +1,19 @@
+Feature: Bird's-eye lanes
+  Find lanes with sliding windows in a bird's-eye view.
+
+  Scenario Outline: Find lanes in the bird's-eye view
+    Given a road with borders at <left> and <right> px
+    When search lanes in 2 frames
+    Then the lanes found are centered at <center>
+    And the lanes found point straight ahead
+
+    Examples:
+    | left | right | center |
+    | 100  | 540   | 320    |
+    | 160  | 600   | 372    |
+    | None | None  | None   |
+
+  Scenario: Compare lane engines
+    Given the frames straight.jpeg curve-left.jpeg curve-right.jpeg
+    When benchmark the lane engines
+    Then each engine has a latency and a detection rate
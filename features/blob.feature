@@ -0,0 +1,14 @@
+Feature: Blobs
+  Track balls and targets by color between detections.
+
+  Scenario Outline: Find blobs
+    Given a frame with a <color> ball at <x>,<y>
+    When look for an orange blob near <px>,<py>
+    Then the blob found is at <found>
+
+    Examples:
+    | color  | x   | y   | px  | py  | found   |
+    | orange | 320 | 320 | 320 | 320 | 320,320 |
+    | orange | 360 | 300 | 320 | 320 | 360,300 |
+    | orange | 500 | 500 | 100 | 100 | None    |
+    | blue   | 320 | 320 | 320 | 320 | None    |
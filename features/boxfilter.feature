@@ -0,0 +1,16 @@
+Feature: Box filter
+  Remap model classes to kinds and drop implausible boxes.
+
+  Scenario Outline: Filter boxes
+    Given a box filter with settings <settings>
+    When filter boxes <boxes>
+    Then kept kinds are <kinds>
+    And dropped counts are <dropped>
+
+    Examples:
+    | settings                                | boxes                                                  | kinds | dropped |
+    | {}                                      | 1:10,10,100,100;2:0,0,5,5;3:10,10,100,300;99:0,0,50,50 | Balle | 1,1,1,0 |
+    | {"limits": {"Cube": {"max_aspect": 4}}} | 3:10,10,100,300;1:10,10,100,300                        | Cube  | 0,0,1,0 |
+    | {"horizon": [0.2, 0.4]}                 | 1:10,100,100,200;1:10,300,100,400                      | Balle | 0,0,0,1 |
+    | {"remap": [0, -1, 10]}                  | 1:10,10,100,100;2:10,10,100,100                        | Cible | 1,0,0,0 |
+    | {"default": {"min_size": 100}}          | 1:10,10,100,100;1:10,10,150,150                        | Balle | 0,1,0,0 |
@@ -0,0 +1,18 @@
+Feature: Broadcast
+  Fan out items to web clients with bounded queues.
+
+  Scenario Outline: Slow client keeps the latest items
+    Given a broadcaster with queues of <size>
+    When a client subscribes and <count> items are published
+    Then the client gets items <items>
+
+    Examples:
+    | size | count | items   |
+    | 1    | 5     | 5       |
+    | 3    | 5     | 3,4,5   |
+    | 8    | 2     | 1,2     |
+
+  Scenario: New client starts with the latest item
+    Given a broadcaster with queues of 1
+    When 3 items are published and a client subscribes
+    Then the client gets items 3
@@ -0,0 +1,22 @@
+Feature: Bus
+  Publish and receive multipart messages on topics.
+
+  Scenario: Receive messages in order
+    Given a publisher and a subscriber to detection
+    When publish 3 messages on detection
+    Then receive messages 1,2,3 on detection
+
+  Scenario: Receive only the latest message
+    Given a publisher and a latest-value subscriber to detection
+    When publish 3 messages on detection
+    Then receive messages 3 on detection
+
+  Scenario: Ignore other topics
+    Given a publisher and a subscriber to detection
+    When publish 2 messages on remote
+    Then receive no message
+
+  Scenario: Accept single frame messages
+    Given a subscriber to remote
+    When send legacy message remote {"button": 53}
+    Then receive payload {"button": 53} on remote
@@ -0,0 +1,36 @@
+Feature: Calibration
+  Azimuth, elevation and distance maps of the camera.
+
+  Scenario Outline: Look up uncalibrated maps
+    Given linear maps
+    When look up the center <x>,<y>
+    Then the azimuth is <az> and the elevation is <el>
+
+    Examples:
+    | x   | y   | az    | el   |
+    | 320 | 320 | 0     | 532  |
+    | 0   | 600 | -1000 | 0    |
+    | 639 | 0   | 996   | 1140 |
+    | 700 | 700 | 996   | -74  |
+
+  Scenario Outline: Undistort points
+    Given a calibration with distortion <k1>
+    When undistort and distort the point <x>,<y>
+    Then the point comes back to <x>,<y>
+    And the maps are the same after saving
+
+    Examples:
+    | k1   | x   | y   |
+    | 0.0  | 100 | 500 |
+    | -0.2 | 100 | 500 |
+    | -0.2 | 600 | 40  |
+
+  Scenario Outline: Refuse a calibration for another frame size
+    Given a calibration for frames of <width>x<height>
+    When calibrate the frames
+    Then the calibration is <result>
+
+    Examples:
+    | width | height | result  |
+    | 640   | 640    | used    |
+    | 640   | 480    | refused |
@@ -0,0 +1,13 @@
+Feature: Capture
+  Capture camera images in a background thread.
+
+  Scenario Outline: Replay image files
+    Given a capture thread replaying <images>
+    When wait for <count> snapshots
+    Then snapshots are in sequence
+    And frame takes the latest snapshot
+
+    Examples:
+    | images                 | count |
+    | ball01.jpeg            | 2     |
+    | cube01.jpeg;mixed.jpeg | 5     |
@@ -0,0 +1,18 @@
+Feature: Debug
+  Lazy log arguments and a ring of per-tick records.
+
+  Scenario Outline: Keep the last records
+    Given a debug ring of size <size>
+    When record <count> ticks
+    Then the dump holds ticks <ticks>
+
+    Examples:
+    | size | count | ticks       |
+    | 4    | 2     | 1,2         |
+    | 4    | 6     | 3,4,5,6     |
+    | 1    | 3     | 3           |
+
+  Scenario: Format lazy arguments only when emitted
+    Given a lazy log argument
+    When log it at DEBUG with level INFO
+    Then it was not formatted
@@ -19,3 +19,13 @@ Feature: DetectableList
     # | 1,10,30,9,2  | 1,17,50,9,3  | 1,10,30,9,1;0,17,50,9,3 |  # not same as color
     # | 1,10,30,9,0  | 2,17,30,9,3  | 2,17,30,9,3             |  # ttl timeout
     # | 1,10,30,9,2;1,17,30,9,3  | 1,10,30,9,3  | 1,10,30,9,3;2,17,30,9,3  |
+
+  Scenario Outline: Compact array form
+    Given a list with one thing <spec>
+    When convert to array and back
+    Then result is <spec>
+
+    Examples:
+    | spec                    |
+    | 1,10,30,9,2             |
+    | 1,10,30,9,2;2,17,50,4,3 |
@@ -0,0 +1,29 @@
+Feature: Events
+  Encode detections as Thymio event vectors.
+
+  Scenario Outline: Encode things
+    Given things <things>
+    When encode events
+    Then camera.detect vectors match the JSON format
+    And camera.thing has targets <targets>
+
+    Examples:
+    | things                                                        | targets |
+    | 3:0.9:100,400,200,500:200,40,40                               | 3       |
+    | 3:0.9:100,400,200,500:200,40,40;4:0.6:300,300,380,380:0,0,250 | 3,4     |
+    |                                                               |         |
+
+  Scenario Outline: Encode lanes
+    Given image from file <image>
+    When find lanes and encode events
+    Then camera.lane vector matches the JSON format
+
+    Examples:
+    | image            |
+    | curve-right.jpeg |
+    | straight.jpeg    |
+
+  Scenario: Encode frame age
+    Given things 3:0.9:100,400,200,500:200,40,40
+    When encode events of frame 40000 aged 120 ms
+    Then camera.detect vectors end with trace 7232 and age 120
@@ -45,3 +45,15 @@ Feature: Frame
     Examples:
     | image            |
     | curve-right.jpeg |
+
+  Scenario Outline: Sample center colors
+    Given a camera image <image>
+    And a feature <xy>
+    When sample center color
+    Then center color is the mean around the feature
+
+    Examples:
+    | image      | xy      |
+    | mixed.jpeg | 100,100 |
+    | mixed.jpeg | 320,400 |
+    | mixed.jpeg | 7,633   |
@@ -0,0 +1,14 @@
+Feature: Gate
+  Skip detection while the scene does not change.
+
+  Scenario Outline: Detect scene changes
+    Given a change gate that saw <first>
+    When the gate sees <second> after <delay> sec
+    Then the scene changed is <expected>
+
+    Examples:
+    | first         | second          | delay | expected |
+    | ball01.jpeg   | ball01.jpeg     | 0     | False    |
+    | ball01.jpeg   | cube01.jpeg     | 0     | True     |
+    | straight.jpeg | curve-left.jpeg | 0     | True     |
+    | ball01.jpeg   | ball01.jpeg     | 0.3   | True     |
@@ -0,0 +1,28 @@
+Feature: Governor
+  Adapt tick rate and resolution to latency and temperature.
+
+  Scenario Outline: Adapt to latency and temperature
+    Given a governor with target latency 0.4 and temperature 70
+    And CPU temperature <temp>
+    When <ticks> ticks take <latency> sec
+    Then governor level is <level>
+
+    Examples:
+    | temp | ticks | latency | level |
+    | 50   | 10    | 0.1     | 0     |
+    | 50   | 9     | 0.9     | 2     |
+    | 80   | 8     | 0.1     | 2     |
+    | 68   | 8     | 0.1     | 0     |
+    | 50   | 40    | 2.0     | 5     |
+
+  Scenario Outline: Recover when load drops
+    Given a governor with target latency 0.4 and temperature 70
+    And CPU temperature 50
+    When 9 ticks take 0.9 sec
+    And <ticks> ticks take 0.05 sec
+    Then governor level is <level>
+
+    Examples:
+    | ticks | level |
+    | 4     | 2     |
+    | 30    | 0     |
@@ -0,0 +1,18 @@
+Feature: Jobs
+  Run admin actions in the background with a timeout.
+
+  Scenario Outline: Job outcome
+    Given a job runner
+    When run a job that <behavior> with timeout 0.2 sec
+    Then the job state is <state>
+
+    Examples:
+    | behavior         | state   |
+    | returns          | done    |
+    | raises           | failed  |
+    | waits for an ack | timeout |
+
+  Scenario: Same action runs once
+    Given a job runner
+    When start the same job twice
+    Then only one job runs
@@ -12,3 +12,34 @@ Feature: Lane
     | curve-right.jpeg | 230;330  |
     | curve-left.jpeg  | -230;330 |
     | star01.jpeg      | None     |
+
+  Scenario Outline: Lane history per stream
+    Given image from file <image>
+    When refresh one of two lane lists
+    Then only that lane list has history
+
+    Examples:
+    | image            |
+    | curve-right.jpeg |
+    | straight.jpeg    |
+
+  Scenario Outline: Lane tracking
+    Given image from file <image>
+    When track lanes in 3 frames
+    Then tracked lanes are the detected lanes
+
+    Examples:
+    | image            |
+    | curve-right.jpeg |
+    | straight.jpeg    |
+
+  Scenario Outline: Tracked lanes survive a missed frame
+    Given image from file <image>
+    When track lanes in 3 frames
+    And track lanes in image star01.jpeg with motors <motors>
+    Then tracked lanes moved by <shift> px
+
+    Examples:
+    | image         | motors  | shift |
+    | straight.jpeg | 0,0     | 0     |
+    | straight.jpeg | 100,60  | -30   |
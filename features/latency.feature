@@ -0,0 +1,18 @@
+Feature: Latency
+  Trace frames from capture to the Thymio.
+
+  Scenario Outline: Acknowledge sent events
+    Given a latency tracer
+    When trace a frame with <events> camera.detect events
+    And the Thymio heartbeat goes <beats>
+    Then each stage was counted once
+    And the frame was acknowledged <acked>
+    And <waiting> events wait for acknowledgement
+
+    Examples:
+    | events | beats | acked | waiting |
+    | 0      | 50,51 | False | 0       |
+    | 2      | 50,51 | True  | 1       |
+    | 2      | 50,52 | True  | 0       |
+    | 2      | 56,50 | True  | 1       |
+    | 2      | 0,51  | False | 2       |
@@ -0,0 +1,16 @@
+Feature: Markers
+  Find things tagged with fiducial markers.
+
+  Scenario Outline: Find markers
+    Given a frame with marker <marker> at <x>,<y>
+    When detect markers for classes <classes>
+    Then the markers found are <kinds>
+    And the things are centered at <x>,<y>
+
+    Examples:
+    | marker | x   | y   | classes   | kinds   |
+    | 2      | 320 | 320 | None      | Stop    |
+    | 0      | 160 | 480 | None      | Parking |
+    | 10     | 480 | 160 | Cible     | Cible   |
+    | 12     | 320 | 320 | Stop      | None    |
+    | 40     | 320 | 320 | None      | None    |
@@ -0,0 +1,21 @@
+Feature: Models
+  Discover YOLO model variants and choose one within a latency budget.
+
+  Scenario Outline: Choose a model variant
+    Given model variants yolov8n-640-fp32,yolov8n-320-int8,yolov8s-640-fp16
+    And benchmark times yolov8n-640-fp32=0.30,yolov8n-320-int8=0.08,yolov8s-640-fp16=0.55
+    When choose within <budget> sec
+    Then chosen variant is <variant>
+
+    Examples:
+    | budget | variant          |
+    | 1.0    | yolov8s-640-fp16 |
+    | 0.4    | yolov8n-640-fp32 |
+    | 0.1    | yolov8n-320-int8 |
+    | 0.01   | yolov8n-320-int8 |
+
+  Scenario: Cache benchmark times
+    Given model variants yolov8n-640-fp32,yolov8n-320-int8
+    And benchmark times yolov8n-640-fp32=0.30,yolov8n-320-int8=0.08
+    When save benchmark cache
+    Then a new registry knows the same benchmark times
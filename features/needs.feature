@@ -0,0 +1,16 @@
+Feature: Program needs
+  Detectors, classes and rates declared by the Thymio programs.
+
+  Scenario Outline: Read program needs
+    Given the program <program>
+    Then the camera is on <camera>
+    And the detectors run on tick 3 at 2 Hz are <detectors>
+    And the things classes are <classes>
+
+    Examples:
+    | program                      | camera | detectors    | classes                               |
+    | _default.aesl                | True   | things,lanes | None                                  |
+    | _poweroff.aesl               | False  | None         | None                                  |
+    | 00-intelligence_humaine.aesl | True   | None         | Parking,Zebra,Stop,Gauche,Droite,Voie |
+    | 10-coureuse_prudente.aesl    | True   | things       | Parking,Zebra,Stop,Gauche,Droite,Voie |
+    | 20-chasseuse_de_tresor.aesl  | True   | things       | None                                  |
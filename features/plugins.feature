@@ -0,0 +1,17 @@
+Feature: Detector plugins
+  Detectors found by name, imported only when used.
+
+  Scenario Outline: Describe detectors
+    Given a detector registry
+    When load the detector <name>
+    Then the detector <name> costs <cost>, reads <views> and sends <event>
+
+    Examples:
+    | name   | cost   | views      | event        |
+    | lanes  | medium | color,xray | camera.lane  |
+    | marks  | low    | color,gray | camera.mark  |
+
+  Scenario: Register plugin events
+    Given a detector registry
+    When load the detector marks
+    Then the event encoder registers camera.mark with 6 values
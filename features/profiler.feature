@@ -0,0 +1,15 @@
+Feature: Profiler
+  Keep stack samples of slow ticks.
+
+  Scenario Outline: Profile slow ticks
+    Given a profiler with budget 0.05 sec
+    When run a tick that waits <wait> sec in stage <stage>
+    Then <count> slow ticks are kept
+    And the slow tick stages include <stage>
+    And the tick was sampled <sampled>
+
+    Examples:
+    | wait | stage   | count | sampled |
+    | 0.0  | capture | 0     | no      |
+    | 0.1  | capture | 1     | yes     |
+    | 0.2  | thymio  | 1     | yes     |
@@ -0,0 +1,18 @@
+Feature: Target selector
+  Choose one target per kind, with hysteresis.
+
+  Scenario Outline: Select targets
+    Given a target selector with margin 0.1 for 2 frames
+    When select targets in <frames>
+    Then targets are <targets>
+
+    Examples:
+    # kind,conf,az,el per feature; features separated by ;, frames by /
+    | frames                                                                    | targets |
+    | 3,0.9,0,100;3,0.6,0,100;4,0.5,0,100                                       | 0,2     |
+    | 3,0.9,0,600;3,0.6,0,100                                                   | 1       |
+    | 3,0.6,0,100;3,0.5,0,100/3,0.6,0,100;3,0.9,0,100                           | 0       |
+    | 3,0.6,0,100;3,0.5,0,100/3,0.6,0,100;3,0.9,0,100/3,0.6,0,100;3,0.9,0,100   | 1       |
+    | 3,0.6,0,100;3,0.5,0,100/3,0.6,0,100;3,0.65,0,100/3,0.6,0,100;3,0.65,0,100 | 0       |
+    | 3,0.6,0,100;3,0.5,0,100/3,0.5,0,100                                       | 0       |
+    | 3,0.5,0,100;3,0.5,0,450                                                   | 0       |
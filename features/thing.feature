@@ -43,3 +43,28 @@ Feature: Thing
     # | ball01.jpeg | '[{"class":3,"conf":92,"color":6,"az":15,"el":188,"xyxy":[292,535,358,467],"rgb":[60,70,74],"name":"Balle","label":"Balle 0.92"}]' | None | None |
     # | cube01.jpeg | None | '[{"class":4,"conf":95,"color":6,"az":25,"el":354,"xyxy":[297,451,359,376],"rgb":[55,68,72],"name":"Cube","label":"Cube 0.95"}]' | None |
     # | star01.jpeg | None | None | '[{"class":8,"conf":82,"color":7,"az":-4,"el":338,"xyxy":[292,449,348,395],"rgb":[0,48,168],"name":"Etoile","label":"Etoile 0.82"}]' |
+
+  Scenario Outline: Interpret YOLO boxes
+    Given YOLO boxes <boxes>
+    When interpret them at scale <scale>
+    Then things are <things>
+
+    Examples:
+    | boxes                                    | scale | things                             |
+    | 10,20,110,120,0.9,1                      | 1.0   | Balle:10,120,110,20                |
+    | 10,20,110,120,0.9,2;0,0,5,5,0.8,1        | 2.0   | Cible:20,240,220,40                |
+    | 10,20,110,420,0.9,3;10,20,110,120,0.7,99 | 1.0   | None                               |
+    | 10,20,60,70,0.9,3;100,20,150,70,0.8,11   | 0.5   | Cube:5,35,30,10;Etoile:50,35,75,10 |
+    | None                                     | 1.0   | None                               |
+
+  Scenario Outline: Reuse the YOLO input tensor
+    Given image from file ball01.jpeg
+    When preprocess at <imgsz>
+    And preprocess image cube01.jpeg at <imgsz>
+    Then the inputs are one 1x3x<imgsz>x<imgsz> tensor
+    And the input holds the last image
+
+    Examples:
+    | imgsz |
+    | 640   |
+    | 320   |
@@ -0,0 +1,13 @@
+Feature: Worker
+  Detect features in worker processes.
+
+  Scenario Outline: Detect lanes in a worker process
+    Given image from file <image>
+    And a worker pool for lanes
+    When refresh in worker and in process
+    Then worker finds the same lanes
+
+    Examples:
+    | image            |
+    | curve-right.jpeg |
+    | straight.jpeg    |
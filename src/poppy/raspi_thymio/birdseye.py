@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+"""
+Lane search in a bird's-eye view of the ground.
+"""
+
+import logging
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from .calibration import Calibration
+
+logger = logging.getLogger(__name__)
+
+
+class BirdseyeView:
+    """
+    Top view of the ground ahead, warped from the frame with remap maps
+    computed once per frame size. With a calibration that has a ground
+    homography, the view covers extent (near, far, width mm); otherwise
+    it straightens the roi trapezoid (bottom left, top left, top right,
+    bottom right, in fractions of the frame).
+    """
+
+    def __init__(
+        self,
+        size: Tuple[int, int] = (160, 160),
+        roi: Tuple[Tuple[float, float], ...] = ((0, 1), (0.3, 0.55), (0.7, 0.55), (1, 1)),
+        calibration: Calibration | None = None,
+        extent: Tuple[float, float, float] = (100.0, 500.0, 400.0),
+    ):
+        self.size = tuple(size)
+        self.roi = np.array(roi, dtype=np.float32)
+        # Only a calibration with a ground homography gives a metric view.
+        if calibration is not None and calibration.homography is None:
+            calibration = None
+        self.calibration = calibration
+        self.extent = tuple(extent)
+        self.maps: Dict[tuple, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def perspective(self, frame_size: Tuple[int, int]) -> np.ndarray:
+        """
+        Perspective transform from view pixels to the frame roi.
+        """
+        width, height = self.size
+        view = np.float32([[0, height], [0, 0], [width, 0], [width, height]])
+        return cv2.getPerspectiveTransform(view, self.roi * np.float32(frame_size))
+
+    def warp(self, image: np.ndarray) -> np.ndarray:
+        """
+        Bird's-eye view of a frame image.
+        """
+        frame_size = (image.shape[1], image.shape[0])
+        if (maps := self.maps.get(frame_size)) is None:
+            if self.calibration and self.calibration.frame_size == frame_size:
+                maps = self.calibration.birdseye_maps(self.size, self.extent)
+            else:
+                width, height = self.size
+                col, row = np.meshgrid(np.arange(width) + 0.5, np.arange(height) + 0.5)
+                grid = np.stack([col, row], axis=-1).reshape(-1, 1, 2).astype(np.float32)
+                pixels = cv2.perspectiveTransform(grid, self.perspective(frame_size))
+                maps = cv2.convertMaps(
+                    pixels.reshape(height, width, 2), None, cv2.CV_16SC2
+                )
+            self.maps[frame_size] = maps
+        return cv2.remap(image, *maps, cv2.INTER_LINEAR)
+
+    def to_frame(self, points: np.ndarray, frame_size: Tuple[int, int]) -> np.ndarray:
+        """
+        Frame pixels (N×2) of view pixels.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if self.calibration and self.calibration.frame_size == tuple(frame_size):
+            (width, height), (near, far, across) = self.size, self.extent
+            forward = far - points[:, 1] / height * (far - near)
+            left = across / 2 - points[:, 0] / width * across
+            mapped = np.c_[forward, left, np.ones(len(points))] @ np.linalg.inv(
+                self.calibration.homography
+            ).T
+            return self.calibration.distort_points(mapped[:, :2] / mapped[:, [2]])
+        return cv2.perspectiveTransform(
+            points.reshape(-1, 1, 2).astype(np.float32), self.perspective(frame_size)
+        ).reshape(-1, 2)
+
+
+class WindowSearch:
+    """
+    Find the two borders of a lane in the bird's-eye view: start from the
+    peaks of a column histogram of edge pixels, follow each border up with
+    windows (or near the previous fit), and fit x = a y² + b y + c. The
+    cost is bounded by the number of windows, not by Hough votes.
+
+    A lane row (mx, my, x1, y1, x2, y2, slope) runs along the centerline,
+    the mean of the two fits, from the lookahead row of the view down to
+    its bottom, in frame pixels, like LaneList candidates.
+    """
+
+    # Windows per border, their half-width and the pixels that move them.
+    windows = 8
+    margin = 16
+    min_pixels = 8
+    # Pixels needed for a fit, borders nearer than this (px) are one border.
+    min_fit = 40
+    min_gap = 20
+    # Row of the lane, as a fraction of the view height from the top.
+    lookahead = 0.6
+
+    def __init__(self, view: BirdseyeView | None = None):
+        self.view = view or BirdseyeView()
+        self.fits: List[np.ndarray] | None = None
+
+    def edges(self, gray: np.ndarray) -> np.ndarray:
+        """
+        Edge pixels of the bird's-eye view of a gray frame.
+        """
+        top = self.view.warp(gray)
+        return cv2.Canny(cv2.GaussianBlur(top, (5, 5), 0), 30, 100)
+
+    def bases(self, ys: np.ndarray, xs: np.ndarray) -> List[int]:
+        """
+        Columns of the two border peaks of the histogram of the lower half.
+        """
+        width, height = self.view.size
+        hist = np.bincount(xs[ys >= height // 2], minlength=width)
+        mid = width // 2
+        left, right = int(np.argmax(hist[:mid])), mid + int(np.argmax(hist[mid:]))
+        return [x for x in (left, right) if hist[x] >= self.min_pixels]
+
+    def slide(self, ys: np.ndarray, xs: np.ndarray, base: int) -> np.ndarray:
+        """
+        Indices of the pixels of the border starting at column base, in
+        windows from the bottom up; ys must be sorted.
+        """
+        height = self.view.size[1]
+        step = height // self.windows
+        found, x = [], base
+        for w in range(self.windows):
+            lo, hi = np.searchsorted(ys, [height - (w + 1) * step, height - w * step])
+            inside = lo + np.flatnonzero(np.abs(xs[lo:hi] - x) < self.margin)
+            found.append(inside)
+            if len(inside) >= self.min_pixels:
+                x = int(xs[inside].mean())
+        return np.concatenate(found)
+
+    def near(self, ys: np.ndarray, xs: np.ndarray, fit: np.ndarray) -> np.ndarray:
+        """
+        Indices of the pixels near a previous fit.
+        """
+        return np.flatnonzero(np.abs(xs - np.polyval(fit, ys)) < self.margin)
+
+    def fit(self, ys: np.ndarray, xs: np.ndarray, borders: List[np.ndarray]) -> List:
+        """
+        Fits of the borders (pixel indices) that have enough pixels.
+        """
+        return [np.polyfit(ys[i], xs[i], 2) for i in borders if len(i) >= self.min_fit]
+
+    def find(self, gray: np.ndarray) -> List[Tuple]:
+        """
+        Lane rows found in a gray frame (H×W), none or one.
+        """
+        ys, xs = np.nonzero(self.edges(gray))  # Sorted by row.
+        fits = self.fit(ys, xs, [self.near(ys, xs, f) for f in self.fits or []])
+        if len(fits) < 2:
+            # No previous borders, or lost them: search the whole view.
+            fits = self.fit(ys, xs, [self.slide(ys, xs, b) for b in self.bases(ys, xs)])
+
+        height = self.view.size[1]
+        ahead = height * self.lookahead
+        at = sorted(np.polyval(fit, ahead) for fit in fits)
+        if len(fits) < 2 or at[1] - at[0] < self.min_gap:
+            self.fits = None
+            return []
+        self.fits = fits
+
+        center = np.mean(fits, axis=0)
+        rows = [ahead, height]
+        frame_size = (gray.shape[1], gray.shape[0])
+        (x1, y1), (x2, y2) = self.view.to_frame(
+            np.c_[np.polyval(center, rows), rows], frame_size
+        )
+        # Same slope as LaneList.analyze_lines: 0 straight ahead, ±1 across.
+        slope = np.arctan2(x2 - x1, y2 - y1) / (np.pi / 2)
+        return [((x1 + x2) / 2, (y1 + y2) / 2, x1, y1, x2, y2, slope)]
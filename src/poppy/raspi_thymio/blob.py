@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+"""
+Color blob tracking between detections.
+"""
+
+import logging
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class BlobTracker:
+    """
+    Find the blob of a known hue near where a feature was, in the small HSV
+    view of the frame: threshold hue, saturation and value over a search
+    window in one array pass, label connected components, and keep the one
+    nearest the expected center.
+    """
+
+    def __init__(
+        self,
+        hue_tol: float = 0.04,
+        min_sat: int = 80,
+        min_val: int = 40,
+        min_area: int = 4,
+        window: float = 1.5,
+    ):
+        self.hue_tol = hue_tol
+        self.min_sat = min_sat
+        self.min_val = min_val
+        self.min_area = min_area
+        self.window = window
+
+    def mask(self, hsv: np.ndarray, hue: float) -> np.ndarray:
+        """
+        Pixels of hsv (H×W×3) within hue_tol of hue, in [0, 1).
+        """
+        diff = np.abs(hsv[..., 0].astype(np.int16) - round(hue * 256) % 256)
+        diff = np.minimum(diff, 256 - diff)
+        return (
+            (diff <= self.hue_tol * 256)
+            & (hsv[..., 1] >= self.min_sat)
+            & (hsv[..., 2] >= self.min_val)
+        )
+
+    def find(
+        self, hsv: np.ndarray, hue: float, box: np.ndarray, scale: float
+    ) -> np.ndarray | None:
+        """
+        Box (x1, y1, x2, y2 frame px) of the blob of hue nearest to box
+        (x1, y1, x2, y2 frame px, any corner order), None if there is none;
+        hsv is scale times the frame size.
+        """
+        x1, x2 = sorted(box[[0, 2]] * scale)
+        y1, y2 = sorted(box[[1, 3]] * scale)
+        cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+        reach = self.window * max(x2 - x1, y2 - y1, 4)
+        height, width = hsv.shape[:2]
+        left, top = int(max(cx - reach, 0)), int(max(cy - reach, 0))
+        right, bottom = int(min(cx + reach, width)), int(min(cy + reach, height))
+        if right <= left or bottom <= top:
+            return None
+
+        mask = self.mask(hsv[top:bottom, left:right], hue).astype(np.uint8)
+        _, _, stats, centroids = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        big = np.flatnonzero(stats[1:, cv2.CC_STAT_AREA] >= self.min_area) + 1
+        if not len(big):
+            return None
+        gaps = centroids[big] + (left, top) - (cx, cy)
+        best = big[np.argmin((gaps**2).sum(axis=1))]
+        bx, by, bw, bh = stats[best, :4]
+        return np.array([bx + left, by + top, bx + left + bw, by + top + bh]) / scale
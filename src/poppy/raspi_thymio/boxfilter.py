@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+"""
+Geometric sanity filter for detected boxes.
+"""
+
+import logging
+from enum import IntEnum
+from pathlib import Path
+from typing import Dict, NamedTuple, Sequence, Tuple, Type
+
+import numpy as np
+import yaml
+
+logger = logging.getLogger(__name__)
+
+
+class BoxLimits(NamedTuple):
+    """
+    Accepted box geometry for one kind, in frame pixels.
+    Aspect is height / width.
+    """
+
+    min_size: float = 20.0
+    max_size: float = np.inf
+    min_aspect: float = 0.0
+    max_aspect: float = float(np.tan(0.785 + 0.15))  # Not much taller than wide.
+
+
+class BoxFilter:
+    """
+    Remap model classes to kinds and drop implausible boxes, on the whole
+    box array at once.
+
+    Rules, in order:
+      - class: model class has no kind in the remap table (or maps to -1),
+      - size: width or height outside [min_size, max_size],
+      - aspect: height / width outside [min_aspect, max_aspect],
+      - horizon: box center inside the horizon band (fractions of frame height).
+    """
+
+    rules = ("class", "size", "aspect", "horizon")
+
+    def __init__(
+        self,
+        kinds: Type[IntEnum],
+        remap: Sequence[int],
+        limits: Dict[str, dict] | None = None,
+        default: dict | None = None,
+        horizon: Tuple[float, float] | None = None,
+    ):
+        self.kinds = kinds
+        self.remap = np.asarray(remap, dtype=int)
+        self.horizon = tuple(horizon) if horizon else None
+        limits, default = limits or {}, default or {}
+
+        unknown = set(limits) - {k.name for k in kinds}
+        if unknown:
+            raise ValueError(f"BoxFilter: unknown kinds {', '.join(sorted(unknown))}")
+
+        def kind_limits(value: int) -> BoxLimits:
+            try:
+                kind = kinds(value)
+            except ValueError:  # No kind has this value.
+                return BoxLimits(**default)
+            return BoxLimits(**{**default, **limits.get(kind.name, {})})
+
+        # One row of limits per kind value.
+        self.limits = np.array(
+            [kind_limits(value) for value in range(max(k.value for k in kinds) + 1)],
+            dtype=float,
+        )
+
+        self.dropped = dict.fromkeys(self.rules, 0)
+
+    @classmethod
+    def load(
+        cls, kinds: Type[IntEnum], remap: Sequence[int], path: Path | str | None = None
+    ) -> "BoxFilter":
+        """
+        Read filter settings (remap, default, limits, horizon) from a YAML
+        file; missing settings keep their defaults.
+        """
+        if not path:
+            return cls(kinds, remap)
+        config = yaml.safe_load(Path(path).read_text()) or {}
+        logger.info("BoxFilter: loaded %s", path)
+        return cls(kinds, config.pop("remap", remap), **config)
+
+    def __call__(
+        self, boxes: np.ndarray, class_ids: np.ndarray, height: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Filter boxes (N×4 x1, y1, x2, y2) of model classes; return the mask
+        of kept boxes and their kind values.
+        """
+        class_ids = np.asarray(class_ids, dtype=int)
+        known = (class_ids >= 0) & (class_ids < len(self.remap))
+        kinds = np.where(known, self.remap[np.where(known, class_ids, 0)], -1)
+        known &= kinds >= 0
+
+        min_size, max_size, min_aspect, max_aspect = self.limits[np.where(known, kinds, 0)].T
+        x1, y1, x2, y2 = np.asarray(boxes, dtype=float).T
+        w, h = abs(x2 - x1), abs(y2 - y1)
+        aspect = h / np.maximum(w, 1)
+
+        failed = {
+            "class": ~known,
+            "size": (w < min_size) | (h < min_size) | (w > max_size) | (h > max_size),
+            "aspect": (aspect < min_aspect) | (aspect > max_aspect),
+            "horizon": (
+                (self.horizon[0] * height <= (center := (y1 + y2) / 2))
+                & (center <= self.horizon[1] * height)
+                if self.horizon
+                else np.zeros(len(class_ids), dtype=bool)
+            ),
+        }
+
+        # Count each dropped box under the first rule it fails.
+        keep = np.ones(len(class_ids), dtype=bool)
+        counts = {}
+        for rule in self.rules:
+            counts[rule] = int((keep & failed[rule]).sum())
+            self.dropped[rule] += counts[rule]
+            keep &= ~failed[rule]
+        if any(counts.values()):
+            logger.debug("BoxFilter: dropped %s", counts)
+
+        return keep, kinds[keep]
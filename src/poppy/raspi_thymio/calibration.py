@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+
+"""
+Camera calibration: lens, ground plane, and per-pixel azimuth/elevation.
+"""
+
+import logging
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import click
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class AzelMaps:
+    """
+    Azimuth, elevation and ground distance (mm, -1 if unknown) of every
+    pixel of the frame, so that they are a table gather for any number of
+    centers. Azimuth spans -1000..1000 across the frame.
+    """
+
+    def __init__(self, az: np.ndarray, el: np.ndarray, dist: np.ndarray):
+        self.table = np.stack([az, el, dist], axis=-1).astype(np.int32)
+
+    @classmethod
+    def linear(cls, frame_size: Tuple[int, int] = (640, 640)) -> "AzelMaps":
+        """
+        Uncalibrated maps, linear in the pixel coordinates.
+        """
+        width, height = frame_size
+        x, y = np.meshgrid(np.arange(width), np.arange(height))
+        # Truncating casts, like int().
+        az = (x / 0.32).astype(int) - 1000
+        el = ((600 - y) * 1.9).astype(int)
+        return cls(az, el, np.full_like(az, -1))
+
+    @property
+    def frame_size(self) -> Tuple[int, int]:
+        """
+        Width, height of the frame the maps cover.
+        """
+        return self.table.shape[1], self.table.shape[0]
+
+    def lookup(self, centers: np.ndarray) -> np.ndarray:
+        """
+        Rows of az, el, dist of N centers (x, y), clipped to the frame.
+        """
+        centers = np.asarray(centers, dtype=int).reshape(-1, 2)
+        x = np.clip(centers[:, 0], 0, self.table.shape[1] - 1)
+        y = np.clip(centers[:, 1], 0, self.table.shape[0] - 1)
+        return self.table[y, x]
+
+
+class Calibration:
+    """
+    Camera matrix and lens distortion for one frame size, and the
+    homography from undistorted pixels to the ground plane (mm, x forward
+    and y left of the robot), if a board was laid on the ground.
+    """
+
+    def __init__(
+        self,
+        frame_size: Tuple[int, int],
+        camera: np.ndarray,
+        distortion: np.ndarray,
+        homography: np.ndarray | None = None,
+        maps: AzelMaps | None = None,
+    ):
+        self.frame_size = tuple(int(v) for v in frame_size)
+        self.camera = np.asarray(camera, dtype=float)
+        self.distortion = np.asarray(distortion, dtype=float).ravel()
+        self.homography = None if homography is None else np.asarray(homography, dtype=float)
+        if maps is not None:
+            self.__dict__["maps"] = maps
+        self.birdseye: Dict[tuple, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @classmethod
+    def load(cls, path: Path | str) -> "Calibration":
+        """
+        Read a calibration saved with its maps.
+        """
+        with np.load(path) as data:
+            homography = data["homography"] if "homography" in data else None
+            maps = AzelMaps(data["az"], data["el"], data["dist"]) if "az" in data else None
+            calibration = cls(
+                data["frame_size"], data["camera"], data["distortion"], homography, maps
+            )
+        logger.info("Calibration: loaded %s", path)
+        return calibration
+
+    def save(self, path: Path | str) -> None:
+        """
+        Write the calibration and its maps, to load them at startup.
+        """
+        extra = {} if self.homography is None else {"homography": self.homography}
+        np.savez(
+            path,
+            frame_size=np.array(self.frame_size),
+            camera=self.camera,
+            distortion=self.distortion,
+            az=self.maps.table[..., 0],
+            el=self.maps.table[..., 1],
+            dist=self.maps.table[..., 2],
+            **extra,
+        )
+        logger.info("Calibration: saved %s", path)
+
+    def undistort_points(self, points: np.ndarray) -> np.ndarray:
+        """
+        Undistorted pixels (N×2) of frame pixels.
+        """
+        points = np.asarray(points, dtype=np.float32).reshape(-1, 1, 2)
+        # The default 5 iterations leave ~0.5 px in the corners at k1 = -0.2.
+        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 50, 0.001)
+        # OpenCV 5 folds undistortPointsIter into undistortPoints.
+        undistort = getattr(cv2, "undistortPointsIter", cv2.undistortPoints)
+        return undistort(
+            points, self.camera, self.distortion, R=None, P=self.camera, criteria=criteria
+        ).reshape(-1, 2)
+
+    def distort_points(self, points: np.ndarray) -> np.ndarray:
+        """
+        Frame pixels (N×2) of undistorted pixels.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        rays = np.c_[points, np.ones(len(points))] @ np.linalg.inv(self.camera).T
+        projected, _ = cv2.projectPoints(
+            rays.reshape(-1, 1, 3), np.zeros(3), np.zeros(3), self.camera, self.distortion
+        )
+        return projected.reshape(-1, 2)
+
+    def ground(self, points: np.ndarray) -> np.ndarray:
+        """
+        Ground points (N×2 mm) of undistorted pixels, NaN above the horizon.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        mapped = np.c_[points, np.ones(len(points))] @ self.homography.T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(mapped[:, [2]] > 0, mapped[:, :2] / mapped[:, [2]], np.nan)
+
+    @cached_property
+    def maps(self) -> AzelMaps:
+        """
+        Calibrated maps: azimuth from the angle of the undistorted ray,
+        elevation as in the linear maps but on undistorted rows, distance
+        on the ground plane.
+        """
+        width, height = self.frame_size
+        x, y = np.meshgrid(np.arange(width), np.arange(height))
+        points = self.undistort_points(np.c_[x.ravel(), y.ravel()])
+        fx, cx = self.camera[0, 0], self.camera[0, 2]
+        half = np.arctan2(width / 2, fx)
+        az = np.arctan2(points[:, 0] - cx, fx) / half * 1000
+        el = (600 - points[:, 1]) * 1.9
+        dist = np.full(len(points), -1.0)
+        if self.homography is not None:
+            ground = self.ground(points)
+            dist = np.nan_to_num(np.hypot(ground[:, 0], ground[:, 1]), nan=-1.0)
+        shape = (height, width)
+        return AzelMaps(
+            np.clip(az, -32767, 32767).astype(int).reshape(shape),
+            np.clip(el, -32767, 32767).astype(int).reshape(shape),
+            np.clip(dist, -1, 32767).astype(int).reshape(shape),
+        )
+
+    @cached_property
+    def undistort_maps(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fixed-point cv2.remap maps from frame to undistorted pixels.
+        """
+        return cv2.initUndistortRectifyMap(
+            self.camera, self.distortion, None, self.camera, self.frame_size, cv2.CV_16SC2
+        )
+
+    def undistort(self, image: np.ndarray) -> np.ndarray:
+        """
+        Undistorted image of a frame image.
+        """
+        return cv2.remap(image, *self.undistort_maps, cv2.INTER_LINEAR)
+
+    def birdseye_maps(
+        self, size: Tuple[int, int], extent: Tuple[float, float, float]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fixed-point cv2.remap maps from the frame to a bird's-eye view of
+        size (width, height) px, covering the ground from near to far (mm)
+        ahead and width (mm) across, given as extent (near, far, width);
+        far is at the top, left at the left. Cached by size and extent.
+        """
+        if (maps := self.birdseye.get(key := (tuple(size), tuple(extent)))) is None:
+            (width, height), (near, far, across) = size, extent
+            col, row = np.meshgrid(np.arange(width) + 0.5, np.arange(height) + 0.5)
+            forward = far - row.ravel() / height * (far - near)
+            left = across / 2 - col.ravel() / width * across
+            mapped = np.c_[forward, left, np.ones(len(forward))] @ np.linalg.inv(
+                self.homography
+            ).T
+            pixels = self.distort_points(mapped[:, :2] / mapped[:, [2]])
+            pixels = pixels.reshape(height, width, 2).astype(np.float32)
+            maps = self.birdseye[key] = cv2.convertMaps(pixels, None, cv2.CV_16SC2)
+        return maps
+
+    @classmethod
+    def from_boards(
+        cls,
+        images: List[np.ndarray],
+        board: Tuple[int, int] = (9, 6),
+        square: float = 25.0,
+        ground: np.ndarray | None = None,
+        origin: Tuple[float, float] = (150.0, 0.0),
+    ) -> "Calibration":
+        """
+        Calibrate from gray images of a checkerboard of board inner corners
+        and square size (mm), seen from several angles. If ground is an
+        image of the board lying flat, its first inner corner at origin (mm
+        ahead, left of the robot), corners along a row going left and rows
+        going ahead, also find the ground homography.
+        """
+        grid = np.zeros((board[0] * board[1], 3), np.float32)
+        grid[:, :2] = np.mgrid[0 : board[0], 0 : board[1]].T.reshape(-1, 2) * square
+        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+
+        def corners(image: np.ndarray) -> np.ndarray | None:
+            found, points = cv2.findChessboardCorners(image, board)
+            if not found:
+                return None
+            return cv2.cornerSubPix(image, points, (5, 5), (-1, -1), criteria)
+
+        frame_size = images[0].shape[1], images[0].shape[0]
+        if any(image.shape[:2] != images[0].shape[:2] for image in images):
+            raise ValueError("Calibration: the board images have different sizes")
+        seen = [c for c in map(corners, images) if c is not None]
+        if len(seen) < 3:
+            raise ValueError(f"Calibration: board found in {len(seen)} images, need 3")
+        error, camera, distortion, _, _ = cv2.calibrateCamera(
+            [grid] * len(seen), seen, frame_size, None, None
+        )
+        logger.info("Calibration: %d boards, reprojection error %.3f px", len(seen), error)
+        calibration = cls(frame_size, camera, distortion)
+
+        if ground is not None:
+            if (points := corners(ground)) is None:
+                raise ValueError("Calibration: no board in the ground image")
+            floor = np.c_[origin[0] + grid[:, 1], origin[1] + grid[:, 0]]
+            calibration.homography, _ = cv2.findHomography(
+                calibration.undistort_points(points), floor
+            )
+        return calibration
+
+
+@click.command(name="ucia-calibrate")
+@click.argument(
+    "images", nargs=-1, required=True, type=click.Path(path_type=Path, exists=True)
+)
+@click.option(
+    "--board",
+    help="Inner corners of the checkerboard, COLSxROWS",
+    default="9x6",
+    show_default=True,
+    type=click.STRING,
+)
+@click.option(
+    "--square",
+    help="Checkerboard square size (mm)",
+    default=25.0,
+    show_default=True,
+    type=click.FLOAT,
+)
+@click.option(
+    "--ground",
+    help="Image of the checkerboard lying on the ground, for distances",
+    default=None,
+    type=click.Path(path_type=Path, exists=True),
+)
+@click.option(
+    "--origin",
+    help="Ground position of the first inner corner, AHEAD,LEFT (mm)",
+    default="150,0",
+    show_default=True,
+    type=click.STRING,
+)
+@click.option(
+    "--output",
+    help="Calibration file, read by the detector with --calibration",
+    default=Path("calibration.npz"),
+    show_default=True,
+    type=click.Path(path_type=Path),
+)
+@click.option(
+    "--loglevel",
+    help="Logging level",
+    default="INFO",
+    show_default=True,
+    type=click.STRING,
+)
+def main(
+    images: List[Path],
+    board: str,
+    square: float,
+    ground: Path | None,
+    origin: str,
+    output: Path,
+    loglevel: str,
+):
+    """
+    Calibrate the camera from checkerboard images, and write the lens,
+    ground homography and azimuth/elevation/distance maps. The images are
+    resized to the detector frame size first, like camera images.
+    """
+    from .frame import Frame  # Frame imports this module.
+
+    loglevel_int = getattr(logging, loglevel.upper(), logging.INFO)
+    logging.basicConfig(format="%(asctime)s %(message)s", level=loglevel_int)
+
+    def gray(path: Path) -> np.ndarray:
+        image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            raise click.ClickException(f"Calibration: can't read {path}")
+        return cv2.resize(image, Frame.frame_size, interpolation=cv2.INTER_AREA)
+
+    try:
+        calibration = Calibration.from_boards(
+            [gray(path) for path in images],
+            board=tuple(int(v) for v in board.lower().split("x")),
+            square=square,
+            ground=gray(ground) if ground else None,
+            origin=tuple(float(v) for v in origin.split(",")),
+        )
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    calibration.save(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+
+"""
+Camera capture thread.
+"""
+
+import logging
+import threading
+import time
+from itertools import cycle
+from pathlib import Path
+from typing import Iterable, NamedTuple, Tuple
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Clock of frame timestamps: libcamera stamps sensor images on CLOCK_BOOTTIME.
+CLOCK = getattr(time, "CLOCK_BOOTTIME", time.CLOCK_MONOTONIC)
+
+
+def clock_ns() -> int:
+    """
+    Now (ns), on the clock of frame timestamps.
+    """
+    return time.clock_gettime_ns(CLOCK)
+
+
+class Snapshot(NamedTuple):
+    """
+    A captured image, with its sensor timestamp (ns) and sequence number.
+    """
+
+    image: np.ndarray
+    timestamp: int
+    sequence: int
+
+
+class PiCameraSource:
+    """
+    Pi camera, read from its request stream.
+    """
+
+    def __init__(self, camera_num: int = 0, size: Tuple[int, int] = (640, 640)):
+        self.camera_num = camera_num
+        self.size = size
+        self.camera = None
+
+    def start(self) -> None:
+        """
+        Configure and start the camera.
+        Raise ImportError if optional dependency picamera2 is missing.
+        """
+        # Conditionally import optional dependency picamera2
+        from picamera2 import Picamera2  # type: ignore[import-not-found]
+
+        logger.debug("Camera %d: instantiating camera", self.camera_num)
+        self.camera = Picamera2(self.camera_num)
+        # Picamera2 "BGR888" is stored in [R, G, B] order, as PIL expects.
+        config = self.camera.create_video_configuration(
+            main={"size": self.size, "format": "BGR888"}, buffer_count=4
+        )
+        self.camera.configure(config)
+        self.camera.start()
+        logger.info("Camera %d: started %s", self.camera_num, str(self.camera))
+
+    def read(self, out: np.ndarray) -> int:
+        """
+        Copy the next camera image into out, return its sensor timestamp (ns).
+        """
+        request = self.camera.capture_request()
+        try:
+            np.copyto(out, request.make_array("main")[: out.shape[0], : out.shape[1], :3])
+            timestamp = request.get_metadata().get("SensorTimestamp")
+        finally:
+            request.release()
+        return timestamp or clock_ns()
+
+    def stop(self) -> None:
+        """
+        Stop the camera.
+        """
+        if self.camera:
+            self.camera.stop()
+            self.camera.close()
+        self.camera = None
+
+
+class FileSource:
+    """
+    Camera stand-in that replays image files in a loop.
+    """
+
+    def __init__(
+        self,
+        files: Iterable[Path],
+        size: Tuple[int, int] = (640, 640),
+        freq_hz: float = 30,
+    ):
+        self.files = [Path(f) for f in files]
+        self.size = size
+        self.wait_sec = 1.0 / freq_hz
+        self.images = None
+
+    def start(self) -> None:
+        """
+        Load and resize all images once.
+        """
+        if not self.files:
+            raise FileNotFoundError("FileSource: no image files to replay")
+        self.images = cycle(
+            [np.asarray(Image.open(f).convert("RGB").resize(self.size)) for f in self.files]
+        )
+        logger.info("FileSource: replaying %d files", len(self.files))
+
+    def read(self, out: np.ndarray) -> int:
+        """
+        Copy the next image into out, return its timestamp (ns).
+        """
+        time.sleep(self.wait_sec)
+        np.copyto(out, next(self.images))
+        return clock_ns()
+
+    def stop(self) -> None:
+        """
+        Nothing to release.
+        """
+
+
+class CaptureThread(threading.Thread):
+    """
+    Continuously fill a ring of preallocated buffers from a camera source.
+    Consumers take the latest image without waiting for the camera.
+    """
+
+    def __init__(
+        self,
+        source,
+        size: Tuple[int, int] = (640, 640),
+        buffers: int = 3,
+    ):
+        threading.Thread.__init__(self)
+        self.daemon = True
+
+        self.source = source
+        self.ring = np.zeros((buffers, size[1], size[0], 3), dtype=np.uint8)
+        self.snapshot = None
+        self.fresh = threading.Condition()
+        self.stop_event = threading.Event()
+        self.active = threading.Event()
+        self.active.set()
+
+    def run(self):
+        """
+        Run capture loop, writing into the least recently used buffer.
+        """
+        try:
+            self.source.start()
+        except (ImportError, OSError) as e:
+            logger.warning("Capture: no camera (%s), capture thread exits", e)
+            with self.fresh:
+                self.fresh.notify_all()
+            return
+
+        sequence = 0
+        while not self.stop_event.is_set():
+            if not self.active.is_set():
+                self.idle()
+                continue
+            buffer = self.ring[sequence % len(self.ring)]
+            try:
+                timestamp = self.source.read(buffer)
+            except Exception as e:  # Keep capturing after a camera hiccup.
+                logger.warning("Capture: read failed: %s", e)
+                self.stop_event.wait(0.1)
+                continue
+
+            with self.fresh:
+                self.snapshot = Snapshot(buffer, timestamp, sequence)
+                self.fresh.notify_all()
+            sequence += 1
+
+        self.source.stop()
+
+    def idle(self) -> None:
+        """
+        Stop the camera until capture resumes or stops.
+        """
+        self.source.stop()
+        logger.info("Capture: paused")
+        while not self.active.wait(0.5) and not self.stop_event.is_set():
+            pass
+        if not self.stop_event.is_set():
+            self.source.start()
+            logger.info("Capture: resumed")
+
+    def pause(self) -> None:
+        """
+        Stop capturing, and the camera, until resume.
+        """
+        self.active.clear()
+
+    def resume(self) -> None:
+        """
+        Capture again after pause.
+        """
+        self.active.set()
+
+    def latest(self) -> Snapshot | None:
+        """
+        Latest snapshot, or None if nothing was captured yet.
+        Its image stays valid while the next (buffers - 1) images are captured.
+        """
+        return self.snapshot
+
+    def wait(self, after: int = -1, timeout: float | None = None) -> Snapshot | None:
+        """
+        Wait for a snapshot with sequence number greater than after.
+        """
+        with self.fresh:
+            self.fresh.wait_for(
+                lambda: (s := self.snapshot) and s.sequence > after or not self.is_alive(),
+                timeout,
+            )
+        return self.snapshot
+
+    def stop(self) -> None:
+        """
+        Stop capture thread.
+        """
+        self.stop_event.set()
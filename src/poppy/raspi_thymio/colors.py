@@ -1,5 +1,11 @@
 # -*- coding: utf-8 -*-
 
+"""
+Color palette and color math.
+"""
+
+import numpy as np
+
 WHITE = (255, 255, 255, 250)
 BLACK = (0, 0, 0, 250)
 
@@ -19,3 +25,21 @@ BR_GRAY = (187, 187, 187, 255)
 EDGE = BR_BLUE
 LANE = BR_CYAN
 BEST = BR_GRAY
+
+
+def rgb_to_hue(rgb) -> np.ndarray:
+    """
+    Hue in [0, 1) of one or more RGB colors (last axis), vectorized.
+    Same result as colorsys.rgb_to_hls(*rgb)[0], for any channel scale.
+    """
+    rgb = np.asarray(rgb, dtype=float)[..., :3]
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    maxc = rgb.max(axis=-1)
+    span = maxc - rgb.min(axis=-1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rc, gc, bc = ((maxc - c) / span for c in (r, g, b))
+    hue = np.where(
+        r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc)
+    )
+    return np.where(span == 0, 0.0, (hue / 6.0) % 1.0)
@@ -7,12 +7,20 @@ Control loop.
 import json
 import logging
 import threading
-import zmq
+import time
+from contextlib import nullcontext
+from itertools import chain
 from pathlib import Path
 
+from .capture import CaptureThread, PiCameraSource
+from .events import EventEncoder
 from .frame import Frame
-from .thing import ThingKind, ThingList
+from .latency import LatencyTracer
+from .needs import ProgramNeeds
+from .plugins import DetectorRegistry
+from .profiler import TickSamples
 from .thymio import Thymio
+from .worker import WorkerPool
 
 logger = logging.getLogger(__name__)
 
@@ -28,33 +36,70 @@ class Control(threading.Thread):
 
     def __init__(
         self,
-        zmq_socket,
+        publisher,
         frame_dir: Path,
         freq_hz=60,
-        detectables=[ThingList()],
+        detectables=None,
         thymio=None,
+        source=None,
+        name: str = "",
+        frame_size=Frame.frame_size,
+        workers: bool = False,
+        governor=None,
+        models=None,
+        gate=None,
+        ring=None,
+        profiler=None,
+        tracer=None,
+        frame_age: bool = False,
+        needs=None,
     ):
-        threading.Thread.__init__(self)
+        threading.Thread.__init__(self, name=f"Control-{name}" if name else None)
         self.sleep_event = threading.Event()
         self.daemon = False
 
-        self.zmq_socket = zmq_socket
+        self.publisher = publisher
+        self.topic = f"detection.{name}" if name else "detection"
 
         self.frame_dir = frame_dir
         self.wait_sec = 1.0 / freq_hz
+        self.governor = governor
+        self.models = models
+        self.gate = gate
+        self.ring = ring
+        self.profiler = profiler
+        self.tracer = tracer
+        self.needs = needs
+        self.stream = name
+        self.ticks = 0
+        self.encoder = EventEncoder(frame_age=frame_age)
 
-        self.frame = Frame(out_dir=frame_dir)
+        # Capture thread, from the Pi camera unless another source is given.
+        self.capture = CaptureThread(
+            source or PiCameraSource(size=frame_size), size=frame_size
+        )
+        self.frame = Frame(out_dir=frame_dir, capture=self.capture, frame_size=frame_size)
         self.thymio = thymio if thymio else Thymio(start=True)
 
         # self.things = ThingList()
         # self.lanes = LaneList()
-        self.detectables = detectables
+        self.detectables = (
+            detectables if detectables is not None else [DetectorRegistry().create("things")]
+        )
+        # Lists by Thymio event, several detectors may feed the same one.
+        self.event_lists = {}
+        for objects in self.detectables:
+            self.encoder.register(type(objects))
+            self.event_lists.setdefault(objects.event_name, []).append(objects)
+
+        # Optionally detect in worker processes, outside this process's GIL.
+        self.pool = WorkerPool(self.detectables, self.frame) if workers else None
 
-        logger.info("Control loop fires every %g sec", self.wait_sec)
+        logger.info("Control %s loop fires every %g sec", self.topic, self.wait_sec)
 
-        # Instantiate camera.
-        camera = self.frame.camera()
-        logger.info("Control frame uses camera %s", camera)
+        # Start camera.
+        self.capture.start()
+        logger.info("Control frame uses capture %s", self.capture.source)
 
     def run(self):
         """
@@ -63,22 +108,114 @@ class Control(threading.Thread):
         logger.debug("Control thread run")
         while True:
             self.sleep_event.clear()
-            self.sleep_event.wait(self.wait_sec)
+            self.sleep_event.wait(
+                self.wait_sec / self.governor.rate if self.governor else self.wait_sec
+            )
             logger.debug("Detector thread wakeup")
             threading.Thread(target=self.detect_one).start()
 
     def detect_one(self):
         """
-        Capture one frame and detect objects.
+        Capture one frame and detect objects, dumping the debug ring on error,
+        profiling the tick if it is slow.
+        """
+        profile = (
+            self.profiler.tick(self.stream)
+            if self.profiler
+            else nullcontext(TickSamples(self.stream))
+        )
+        with profile as samples:
+            try:
+                self.tick(samples)
+            except Exception:
+                logger.exception("Control %s: tick %d failed", self.topic, self.ticks)
+                if self.ring:
+                    self.ring.dump(reason=f"error in {self.topic} tick {self.ticks}")
+
+    def tick(self, samples: TickSamples):
+        """
+        Capture one frame and detect objects, marking stages in samples.
         """
+        start = time.monotonic()
+        self.ticks += 1
+
+        # Detectors and settings chosen by the governor.
+        active, settings = self.detectables, {}
+        if self.governor:
+            active = [
+                objects
+                for i, objects in enumerate(self.detectables)
+                if self.governor.runs(i, self.ticks)
+            ]
+            settings = self.governor.settings
+        # The model variant's input size overrides the governor's ladder.
+        if self.models:
+            settings = {**settings, **self.models.settings}
+        if any(getattr(objects, "tracking", False) for objects in self.detectables):
+            settings = {**settings, "motors": self.thymio.motors()}
+
+        # Detectors, classes and rates the Thymio program needs, else the
+        # default rates of the detectors.
+        hz = 1.0 / self.wait_sec * (self.governor.rate if self.governor else 1.0)
+        if self.needs:
+            if not self.needs.camera_on:
+                self.capture.pause()
+                for objects in self.detectables:
+                    objects.clear()
+                return
+            self.capture.resume()
+            for objects in self.detectables:
+                if not self.needs.wants(objects.name):
+                    objects.clear()
+            active = [a for a in active if self.needs.runs(a.name, self.ticks, hz, a.rate)]
+            # Only detectors with classes take the classes setting.
+            for objects in active:
+                if hasattr(objects, "classes"):
+                    settings = {**settings, **self.needs.settings(objects.name)}
+        else:
+            active = [a for a in active if ProgramNeeds.due(self.ticks, hz, a.rate)]
+
+        samples.mark("capture")
         self.frame.get_frame()
-        for objects in self.detectables:
-            objects.refresh(self.frame)
+        samples.frame = self.frame.sequence
+        trace = LatencyTracer.begin(
+            f"{self.stream}/{self.frame.sequence}", self.frame.timestamp
+        )
+
+        # Detectors not run on this tick follow their features if they can.
+        running = {id(objects) for objects in active}
+        idle = [objects for objects in self.detectables if id(objects) not in running]
+
+        # Keep the last results while the scene does not change.
+        samples.mark("gate")
+        if self.gate and not self.gate.changed(self.frame):
+            active, idle = [], []
+
+        if self.pool and active:
+            samples.mark("workers")
+            self.pool.refresh(self.frame, active, settings)
+        elif active:
+            # Frame views the detectors read, computed once.
+            samples.mark("views")
+            for view in sorted({view for objects in active for view in objects.views}):
+                getattr(self.frame, view)
+            for objects in active:
+                samples.mark(type(objects).__name__)
+                objects.configure(**settings)
+                update = objects.update(self.frame)
+                samples.mark("merge")
+                objects.merge(update)
+        if idle:
+            samples.mark("follow")
+            for objects in idle:
+                objects.follow(self.frame)
         # self.things.refresh(self.frame)
         # self.lanes.refresh(self.frame)
 
+        samples.mark("targets")
         for objects in self.detectables:
             objects.update_targets()
+        LatencyTracer.mark(trace, "detect")
         # self.things.update_targets()
         # self.lanes.update_targets()
 
@@ -89,45 +226,97 @@ class Control(threading.Thread):
         # logger.info("Detect found %d lanes", len(things))
 
         # Write detected objects.
+        samples.mark("publish")
+        debug = logger.isEnabledFor(logging.DEBUG)
         # for objects in self.things, self.lanes:
         for objects in self.detectables:
             output = json.dumps(objects.format())
-            self.zmq_socket.send_string(f"detection {output}")
-            logging.debug("Detect: wrote zmq (%s) %s", self.zmq_socket, output)
+            self.publisher.send(
+                self.topic,
+                output.encode(),
+                frame=self.frame.sequence,
+                timestamp=self.frame.timestamp,
+                trace=trace["trace"],
+            )
+            if debug:
+                logger.debug("Detect: published %s %s", self.topic, output)
+        LatencyTracer.mark(trace, "publish")
 
-        # Get target_kind so we can decorate it.
-        chosen = {}
-
-        # Write decorated frame.
-        # self.frame.decorate(self.things, self.lanes)
-        self.frame.decorate(*self.detectables, chosen=chosen)
+        # Write decorated frame, circling the best target by priority.
+        boxes = [objects for objects in self.detectables if objects.decoration == "boxes"]
+        chosen = {kind: True for objects in boxes if (kind := objects.chosen()) is not None}
+        lanes = [objects for objects in self.detectables if objects.decoration == "lanes"]
+        samples.mark("decorate")
+        self.frame.decorate(
+            things=list(chain.from_iterable(boxes)),
+            lanes=list(chain.from_iterable(lanes)),
+            chosen=chosen,
+        )
 
         # Send Thymio events.
-        for objects in self.detectables:
-            name = type(objects[0] if objects else objects).__name__.lower()
-            self.thymio.events({f"camera.{name}": (e := objects.event())})
-            logger.debug(f"Send event camera.{name} %s", str(e))
+        samples.mark("thymio")
+        with self.encoder.lock:
+            self.encoder.stamp(self.frame.sequence, LatencyTracer.age(trace))
+            for name, lists in self.event_lists.items():
+                kinds = len(lists[0].kinds)
+                e = self.encoder.features(name, lists, kinds, targets=True).tolist()
+                self.thymio.events({name: e})
+                if debug:
+                    logger.debug("Send event %s %s", name, e)
 
         # self.thymio.events({"camera.lane": (e := self.lanes.event())})
         # logger.debug("Send event camera.lane %s", str(e))
 
-        for objects in self.detectables:
-            for thing in objects:
-                v = thing.event()  # conf color az el
-                self.thymio.events({"camera.detect": (e := [int(thing.kind), *v])})
-                logger.debug("Send event camera.detect %s", str(e))
-                self.thymio.variables({"camera.detect": e})
-                logger.debug("Set variable camera.detect %s", str(e))
-
-        # Send Thymio variables.
-        values = [0] * (4 * (len(ThingKind) - 1))
-        for objects in self.detectables:
-            for thing in objects:
-                v = thing.event()  # conf color az el
-                base = thing.kind * 4
-                values[base : (base + len(v))] = v
-        self.thymio.variables({"camera.thing": values})
-        logger.debug("Set variable camera.thing %s", str(e))
+        # Thing vectors, only for streams that detect things.
+        things = self.event_lists.get("camera.thing", [])
+        sent = self.send_things(things) if things else 0
+        LatencyTracer.mark(trace, "send")
 
         # Wait for variables.
         # self.thymio.update()
+
+        samples.mark("status")
+        latency = time.monotonic() - start
+        if self.ring:
+            self.ring.record(
+                stream=self.stream,
+                tick=self.ticks,
+                frame=self.frame.sequence,
+                active=len(active),
+                found=[len(objects) for objects in self.detectables],
+                targets=[
+                    [int(f.kind) for f in objects if f.target] for objects in self.detectables
+                ],
+                latency=latency,
+            )
+
+        if self.governor:
+            self.governor.tick(latency)
+
+        if self.tracer:
+            self.tracer.end(trace, events=sent)
+            if self.ticks % 10 == 0:
+                self.tracer.write_status()
+
+    def send_things(self, things) -> int:
+        """
+        Send camera.detect events and camera.thing variables to Thymio,
+        return the number of camera.detect events.
+        """
+        with self.encoder.lock:
+            detections = [
+                self.encoder.vectors("camera.detect", objects).tolist() for objects in things
+            ]
+            values = self.encoder.features("camera.thing", things, len(things[0].kinds))
+            values = values.tolist()
+
+        for e in chain.from_iterable(detections):  # kind conf color az el
+            self.thymio.events({"camera.detect": e})
+            logger.debug("Send event camera.detect %s", e)
+            self.thymio.variables({"camera.detect": e})
+            logger.debug("Set variable camera.detect %s", e)
+
+        # Send Thymio variables.
+        self.thymio.variables({"camera.thing": values})
+        logger.debug("Set variable camera.thing %s", values)
+        return sum(len(d) for d in detections)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+"""
+Cheap debugging: lazy log arguments and a ring of per-tick records.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+class Lazy:
+    """
+    Log argument computed only if the record is emitted, e.g.
+    logger.debug("Merge %s", Lazy(lambda: ",".join(str(i) for i in things))).
+    """
+
+    __slots__ = ("func",)
+
+    def __init__(self, func: Callable[[], object]):
+        self.func = func
+
+    def __str__(self) -> str:
+        return str(self.func())
+
+
+class DebugRing:
+    """
+    Bounded in-memory ring of structured per-tick records, written to a JSON
+    file on demand or on error. Records are plain dicts, nothing is
+    formatted until the ring is dumped.
+    """
+
+    def __init__(self, size: int = 256, path: Path | None = None):
+        self.lock = threading.Lock()
+        self.records: deque = deque(maxlen=size)
+        self.path = path
+
+    def record(self, **fields) -> None:
+        """
+        Append one record, with its monotonic time (sec).
+        """
+        fields["t"] = time.monotonic()
+        with self.lock:
+            self.records.append(fields)
+
+    def snapshot(self) -> List[dict]:
+        """
+        Copy of the records, oldest first.
+        """
+        with self.lock:
+            return list(self.records)
+
+    def dump(self, reason: str = "demand", path: Path | None = None) -> Path | None:
+        """
+        Write the records to path (or the ring's path), return the path.
+        """
+        if not (path := path or self.path):
+            return None
+        records = self.snapshot()
+        try:
+            Path(path).write_text(
+                json.dumps(dict(reason=reason, time=time.time(), records=records), default=str)
+            )
+        except OSError as e:
+            logger.warning("DebugRing: can't write %s: %s", path, e)
+            return None
+        logger.info("DebugRing: dumped %d records to %s (%s)", len(records), path, reason)
+        return Path(path)
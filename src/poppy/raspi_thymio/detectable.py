@@ -4,7 +4,6 @@
 Base class for features that can be detected
 """
 
-import colorsys
 import logging
 from enum import Enum, IntEnum
 from functools import cached_property, total_ordering
@@ -13,7 +12,10 @@ from typing import List, Tuple
 
 import numpy as np
 
+from .colors import rgb_to_hue
+from .debug import Lazy
 from .frame import Frame
+from .selector import TargetSelector
 from .self_type import Self
 
 logger = logging.getLogger(__name__)
@@ -56,9 +58,22 @@ class Detectable:
         """
         Azimuth, elevation.
         """
-        az = int(self.center[0] / 0.32) - 1000
-        el = int((600 - self.center[1]) * 1.9)
-        return az, el
+        az, el, _ = Frame.azel_maps.lookup(self.center)[0]
+        return int(az), int(el)
+
+    @cached_property
+    def distance(self) -> int:
+        """
+        Ground distance (mm), -1 if the camera is not calibrated.
+        """
+        return int(Frame.azel_maps.lookup(self.center)[0, 2])
+
+    @cached_property
+    def hue(self) -> float:
+        """
+        Hue of the feature color, in [0, 1).
+        """
+        return float(rgb_to_hue(self.color))
 
     def same_as(self: Self, other: Self) -> bool:
         """
@@ -67,18 +82,17 @@ class Detectable:
         cen_diff = self.center - other.center
         cen_ssq = np.dot(cen_diff.T, cen_diff)
 
-        col_diff = (
-            colorsys.rgb_to_hls(*self.color)[0] - colorsys.rgb_to_hls(*other.color)[0]
-        )
-        logger.debug(
-            "Check same %s@%s %s@%s: cen_ssq %g col_diff %g",
-            str(self.color),
-            str(self.center),
-            str(other.color),
-            str(other.center),
-            cen_ssq,
-            col_diff,
-        )
+        col_diff = self.hue - other.hue
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Check same %s@%s %s@%s: cen_ssq %g col_diff %g",
+                str(self.color),
+                str(self.center),
+                str(other.color),
+                str(other.center),
+                cen_ssq,
+                col_diff,
+            )
 
         return self.kind == other.kind and cen_ssq <= 100 and abs(col_diff) <= 0.1
 
@@ -87,9 +101,10 @@ class Detectable:
         result = {
             "class": int(self.kind),
             "conf": int(self.confidence * 100),
-            "color": int(colorsys.rgb_to_hls(*self.color)[0] * 12.0),
+            "color": int(self.hue * 12.0),
             "az": self.azel[0],
             "el": self.azel[1],
+            "dist": self.distance,
             "xyxy": self.xyxy.astype(int).tolist(),
             # "rgb": self.color,
             "name": self.kind.name,
@@ -118,12 +133,49 @@ class DetectableList(List[Detectable]):
     List of detectable features.
     """
 
+    # Feature class and kinds, for the compact array form.
+    feature = Detectable
+    kinds = DetectableKind
+    columns = ("kind", "conf", "x1", "y1", "x2", "y2", "r", "g", "b")
+    # Detector name, as programs and streams give it.
+    name = None
+    # Thymio event of the targets, and its fields if EventEncoder does not
+    # know it: one slot of them per kind.
+    event_name = None
+    event_layout = None
+    # Plugin declarations: cost class (low, medium, high), Frame views read,
+    # default rate (Hz, every tick if None), and how frames show features.
+    cost = "low"
+    views = ("color",)
+    rate = None
+    decoration = "boxes"
+    # Target selection: priority by kind name, challenger margin and frames.
+    priority = {}
+    switch_margin = 0.1
+    switch_frames = 3
+    # Each instance has its own selector, made on first use.
+    selector = None
+
+    @classmethod
+    def configure(cls, **settings) -> None:
+        """
+        Apply settings to the class attributes that exist.
+        """
+        for key, value in settings.items():
+            if hasattr(cls, key):
+                setattr(cls, key, value)
+
     def refresh(self: Self, frame: Frame) -> None:
         """
         Detect new features, refresh TTL.
         """
-        update = self.detect(frame)
-        self.merge(update)
+        self.merge(self.update(frame))
+
+    def update(self: Self, frame: Frame) -> Self:
+        """
+        Detect new features to merge into this list.
+        """
+        return self.detect(frame)
 
     @classmethod
     def detect(cls, frame: Frame) -> Self:
@@ -133,57 +185,122 @@ class DetectableList(List[Detectable]):
         """
         return cls([])
 
+    def follow(self: Self, frame: Frame) -> None:
+        """
+        Follow features, cheaply, on frames where detection does not run.
+        Nothing by default.
+        """
+
+    def colorize(self: Self, frame: Frame) -> None:
+        """
+        Sample colors and hues of all features from the frame in one batch.
+        """
+        if not self:
+            return
+        rgb = frame.center_colors(np.array([f.center for f in self]))
+        for feature, color, hue in zip(self, rgb, rgb_to_hue(rgb)):
+            feature.color = color
+            feature.hue = float(hue)
+
     def merge(self: Self, update: Self) -> None:
         """
         Detect new features, refresh TTL.
         """
-        logger.debug("Detectable: Merge into [%s]", ",".join(str(i) for i in self))
-        logger.debug(
-            "Detectable: w/ update [%s]", ",".join(str(i) for i in sorted(update))
-        )
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Detectable: Merge into [%s]", ",".join(str(i) for i in self))
+            logger.debug(
+                "Detectable: w/ update [%s]", ",".join(str(i) for i in sorted(update))
+            )
         pool = {k: list(g) for k, g in groupby(sorted(update), key=lambda x: x.kind)}
-        logger.debug(
-            "Detectable: w/ pool(%s): %s",
-            ",".join(str(i) for i in pool.keys()),
-            " ".join(f"[{str(i)}] = ({str(x)})" for i, x in pool.items()),
-        )
+        if debug:
+            logger.debug(
+                "Detectable: w/ pool(%s): %s",
+                ",".join(str(i) for i in pool.keys()),
+                " ".join(f"[{str(i)}] = ({str(x)})" for i, x in pool.items()),
+            )
         for i, feature in enumerate(self):
             if feature.ttl < 1:
-                logger.debug("Detectable: dropping %s ttl < 1", str(feature))
+                if debug:
+                    logger.debug("Detectable: dropping %s ttl < 1", str(feature))
                 del self[i]
                 continue
             feature.ttl -= 1
             for j, candidate in enumerate(pool.get(feature.kind, {})):
-                logger.debug("Detectable: eval %s", str(feature))
                 if feature.same_as(candidate):
-                    logger.debug(
-                        "Detectable: %s same feature %s", str(feature), str(candidate)
-                    )
+                    if debug:
+                        logger.debug(
+                            "Detectable: %s same feature %s", str(feature), str(candidate)
+                        )
+                    candidate.target = feature.target
                     self[i] = candidate
                     del pool[feature.kind][j]
                     continue
-                else:
+                elif debug:
                     logger.debug(
                         "Detectable: %s not same %s", str(feature), str(candidate)
                     )
-        logger.debug(
-            "Detectable: appending %s", " ".join(str(v) for v in pool.values())
-        )
+        if debug:
+            logger.debug(
+                "Detectable: appending %s", " ".join(str(v) for v in pool.values())
+            )
         self.extend(chain.from_iterable(pool.values()))
 
     def update_targets(self: Self) -> None:
         """
-        For each kind, choose new target if needed.
-        """
-        features = filter(lambda d: d.azel[1] < 500, sorted(self, key=lambda d: d.kind))
-        for k, grp in groupby(features, key=lambda d: d.kind):
-            subset = list(grp)
-            # logger.debug("Update: subset %s", str(DetectableList(subset)))
-            if not any(f.target for f in subset):
-                by_conf = sorted(subset, key=lambda f: f.confidence, reverse=True)
-                if by_conf and (best := by_conf[0]):
-                    best.target = True
-                    logger.debug("Update: %s is target", str(best))
+        For each kind, keep the target or choose a new one.
+        """
+        if self.selector is None:
+            self.selector = TargetSelector(
+                self.kinds,
+                priority=self.priority,
+                margin=self.switch_margin,
+                frames=self.switch_frames,
+            )
+        # Rows (kind, conf, az, el, target), azel of all centers in one lookup.
+        boxes = np.array(
+            [(int(f.kind), f.confidence, f.target, *f.xyxy) for f in self], dtype=float
+        ).reshape(-1, 7)
+        centers = (boxes[:, 3:] @ Mcenter.T).astype(int)
+        azel = Frame.azel_maps.lookup(centers)[:, :2]
+        rows = np.c_[boxes[:, :2], azel, boxes[:, 2]]
+        for feature, target in zip(self, self.selector.select(rows)):
+            feature.target = bool(target)
+        logger.debug("Update: targets %s", Lazy(lambda: [str(f) for f in self if f.target]))
+
+    def chosen(self) -> Enum | None:
+        """
+        Kind of the best target, by priority, at the last update.
+        """
+        kind = self.selector.chosen if self.selector else None
+        return None if kind is None else self.kinds(kind)
+
+    def to_array(self) -> np.ndarray:
+        """
+        Compact array form, one row per feature with the given columns.
+        """
+        array = np.zeros((len(self), len(self.columns)))
+        for row, f in zip(array, self):
+            row[:9] = (int(f.kind), f.confidence, *f.xyxy, *np.asarray(f.color)[:3])
+            for i, name in enumerate(self.columns[9:], start=9):
+                row[i] = getattr(f, name)
+        return array
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> Self:
+        """
+        Make list from compact array form.
+        """
+        return cls(
+            cls.feature(
+                xyxy=row[2:6].astype(int),
+                kind=cls.kinds(int(row[0])),
+                color=row[6:9].astype(int),
+                confidence=float(row[1]),
+                **{name: float(v) for name, v in zip(cls.columns[9:], row[9:])},
+            )
+            for row in array
+        )
 
     def format(self):
         """Format for JSON conversion."""
@@ -17,12 +17,25 @@ Why does this file exist, and why not put this in __main__?
 
 import logging
 import os
-import zmq
 from pathlib import Path
+from typing import List, NamedTuple
 
 import click
 
+from .bus import DETECTION_ENDPOINTS, REMOTE_ENDPOINTS, Publisher, Subscriber
+from .calibration import Calibration
+from .capture import FileSource, PiCameraSource
 from .control import Control
+from .debug import DebugRing
+from .events import EventEncoder
+from .frame import Frame
+from .gate import ChangeGate
+from .governor import Governor
+from .latency import LatencyTracer
+from .models import ModelRegistry
+from .needs import ProgramNeeds
+from .plugins import DetectorRegistry
+from .profiler import SlowTickProfiler
 from .remote import Remote
 from .thymio import Thymio
 
@@ -32,6 +45,35 @@ FRAME_DIR = Path("/run/ucia")
 OUT_FIFO = Path("/run/ucia/detection.fifo")
 REMOTE_FIFO = Path("/run/ucia/remote.fifo")
 
+# Detector plugins, imported only when a stream uses them.
+DETECTABLES = DetectorRegistry()
+
+
+class Stream(NamedTuple):
+    """
+    A video stream: name, camera number, and detector names.
+    """
+
+    name: str
+    camera: int
+    detectors: List[str]
+
+
+def parse_stream(spec: str) -> Stream:
+    """
+    Parse a video stream spec NAME=CAMERA:DETECTOR[,DETECTOR...],
+    for example "forward=0:things" or "down=1:lanes".
+    """
+    name, _, rest = spec.rpartition("=")
+    camera, _, names = rest.partition(":")
+    detectors = names.split(",") if names else ["things"]
+    if not camera.isdigit() or any(d not in DETECTABLES for d in detectors):
+        raise click.BadParameter(
+            f"{spec!r} is not NAME=CAMERA:DETECTOR[,DETECTOR...]"
+            f" with DETECTOR in {', '.join(DETECTABLES.names())}"
+        )
+    return Stream(name=name, camera=int(camera), detectors=detectors)
+
 
 @click.command(name="ucia-detector")
 @click.option(
@@ -50,16 +92,149 @@ REMOTE_FIFO = Path("/run/ucia/remote.fifo")
 )
 @click.option(
     "--zmq-address",
-    help="Address for zmq",
-    default="tcp://localhost:5556",
+    help="Endpoints to publish detections on (@ binds, > connects)",
+    default=DETECTION_ENDPOINTS,
+    show_default=True,
+    type=click.STRING,
+)
+@click.option(
+    "--zmq-remote",
+    help="Endpoints to receive remote control events on (@ binds, > connects)",
+    default=REMOTE_ENDPOINTS,
     show_default=True,
     type=click.STRING,
 )
+@click.option(
+    "--stream",
+    "streams",
+    help="Video stream NAME=CAMERA:DETECTOR[,DETECTOR...], repeat for several cameras",
+    multiple=True,
+    default=["=0:things"],
+    show_default=True,
+    type=click.STRING,
+)
+@click.option(
+    "--replay",
+    help="Replay image files from this directory instead of the camera",
+    default=None,
+    type=click.Path(path_type=Path, exists=True, file_okay=False),
+)
+@click.option(
+    "--workers/--no-workers",
+    default=False,
+    show_default=True,
+    help="Run detectors in worker processes",
+)
+@click.option(
+    "--governor/--no-governor",
+    default=True,
+    show_default=True,
+    help="Adapt rate and resolution to latency and temperature",
+)
+@click.option(
+    "--target-latency",
+    help="Governor target tick latency (sec)",
+    default=0.4,
+    show_default=True,
+    type=click.FLOAT,
+)
+@click.option(
+    "--target-temp",
+    help="Governor target CPU temperature (°C)",
+    default=70.0,
+    show_default=True,
+    type=click.FLOAT,
+)
+@click.option(
+    "--gate/--no-gate",
+    default=True,
+    show_default=True,
+    help="Skip detection while the scene does not change",
+)
+@click.option(
+    "--gate-area",
+    help="Fraction of the frame that must change to detect again",
+    default=0.005,
+    show_default=True,
+    type=click.FLOAT,
+)
+@click.option(
+    "--lane-tracking/--no-lane-tracking",
+    default=True,
+    show_default=True,
+    help="Track lanes between frames, fed by the motor speeds",
+)
+@click.option(
+    "--lane-engine",
+    help="Find lanes with Hough lines, or with sliding windows in a bird's-eye view",
+    default="hough",
+    show_default=True,
+    type=click.Choice(["hough", "windows"]),
+)
+@click.option(
+    "--calibration",
+    help="Camera calibration from poppy-raspi-thymio-calibrate, for azimuth/elevation maps",
+    default=os.environ.get("UCIA_CALIBRATION"),
+    type=click.Path(path_type=Path, exists=True, dir_okay=False),
+)
+@click.option(
+    "--undistort/--no-undistort",
+    default=False,
+    show_default=True,
+    help="Find lanes in the undistorted frame (needs --calibration)",
+)
+@click.option(
+    "--blob-tracking",
+    help="Track balls and targets by color on every tick, YOLO confirming them"
+    " at this rate (Hz, 0: no tracking)",
+    default=0.0,
+    show_default=True,
+    type=click.FLOAT,
+)
+@click.option(
+    "--latency-budget",
+    help="Choose the best YOLO model variant within this inference time (sec)",
+    default=None,
+    type=click.FLOAT,
+)
+@click.option(
+    "--debug-ring",
+    help="Per-tick debug records kept in memory, dumped on error (0: none)",
+    default=256,
+    show_default=True,
+    type=click.INT,
+)
+@click.option(
+    "--slow-tick",
+    help="Profile ticks that take longer than this (sec, 0: never)",
+    default=1.0,
+    show_default=True,
+    type=click.FLOAT,
+)
+@click.option(
+    "--latency/--no-latency",
+    default=True,
+    show_default=True,
+    help="Trace frames from capture to Thymio, acknowledged by _camera.heartbeat",
+)
+@click.option(
+    "--frame-age/--no-frame-age",
+    default=False,
+    show_default=True,
+    help="Append frame trace and age (ms) to camera.detect and camera.lane events",
+)
+@click.option(
+    "--offline-events",
+    help="While the Thymio is disconnected, drop events or keep the latest of each",
+    default="drop",
+    show_default=True,
+    type=click.Choice(["drop", "latest"]),
+)
 @click.option("--verbose/--quiet", default=False, help="YOLO verbose")
 @click.option(
     "--loglevel",
     help="Logging level",
-    default="DEBUG",
+    default="INFO",
     show_default=True,
     type=click.STRING,
 )
@@ -67,6 +242,26 @@ def main(
     freq: float,
     frame_dir: Path,
     zmq_address: str,
+    zmq_remote: str,
+    streams: list[str],
+    replay: Path | None,
+    workers: bool,
+    governor: bool,
+    target_latency: float,
+    target_temp: float,
+    gate: bool,
+    gate_area: float,
+    lane_tracking: bool,
+    lane_engine: str,
+    calibration: Path | None,
+    undistort: bool,
+    blob_tracking: float,
+    latency_budget: float | None,
+    debug_ring: int,
+    slow_tick: float,
+    latency: bool,
+    frame_age: bool,
+    offline_events: str,
     verbose: bool,
     loglevel: str,
 ):
@@ -74,39 +269,122 @@ def main(
     Continuously capture an image and detect objects using YOLO.
     Send JSON records to a FIFO and record image frames in files.
     """
-    loglevel_int = getattr(logging, loglevel.upper(), logging.DEBUG)
+    loglevel_int = getattr(logging, loglevel.upper(), logging.INFO)
     logging.basicConfig(format="%(asctime)s %(message)s", level=loglevel_int)
     logger.info("Setting loglevel to %s = %s", loglevel, str(loglevel_int))
     logger.propagate = False
 
     frame_dir.mkdir(mode=0o775, parents=True, exist_ok=True)
 
-    context = zmq.Context()
+    publisher = Publisher(zmq_address)
+    subscriber = Subscriber(zmq_remote, topics=["remote"], bind=True)
+
+    # Load the detectors the streams use, with the events they declare.
+    videos = [parse_stream(spec) for spec in streams]
+    encoder = EventEncoder(frame_age=frame_age)
+    for name in dict.fromkeys(d for video in videos for d in video.detectors):
+        encoder.register(DETECTABLES.load(name))
+
+    # Connect in the background, the camera and model warm up meanwhile.
+    thymio = Thymio(start=True, events=encoder.events, policy=offline_events)
 
-    pub_socket = context.socket(zmq.PUB)
-    pub_socket.bind("tcp://*:5557")
-    logging.info("Open PUB zmq %s", pub_socket)
+    # Camera calibration, also in worker processes.
+    if calibration:
+        os.environ["UCIA_CALIBRATION"] = str(calibration)
+        os.environ["UCIA_UNDISTORT"] = "1" if undistort else "0"
+        try:
+            Frame.calibrate(Calibration.load(calibration), undistort)
+        except ValueError as e:
+            raise click.ClickException(str(e))
 
-    sub_socket = context.socket(zmq.SUB)
-    sub_socket.bind("tcp://*:5556")
-    sub_socket.setsockopt(zmq.SUBSCRIBE, b'')
-    logging.info("Open SUB zmq %s", sub_socket)
+    # Lane engine and tracking, also in worker processes.
+    os.environ["UCIA_LANE_ENGINE"] = lane_engine
+    os.environ["UCIA_LANE_TRACKING"] = "1" if lane_tracking else "0"
+    for cls in DETECTABLES.loaded.values():
+        cls.configure(lane_engine=lane_engine, tracking=lane_tracking)
+        # Blob tracking between YOLO runs, at a lower YOLO rate.
+        if blob_tracking and hasattr(cls, "blob_tracking"):
+            cls.configure(blob_tracking=True, rate=blob_tracking)
+    if lane_tracking:
+        thymio.watch()
 
-    thymio = Thymio(start=True)
+    # Latency of frames, closed by the Thymio heartbeat.
+    tracer = LatencyTracer(status_file=frame_dir / "latency.json") if latency else None
+    if tracer:
+        thymio.watch()
+        thymio.on_variables(tracer.variables)
+
+    # One governor for all streams, they share the CPU.
+    gov = (
+        Governor(
+            target_latency=target_latency,
+            target_temp=target_temp,
+            status_file=frame_dir / "governor.json",
+        )
+        if governor
+        else None
+    )
+
+    # Model variants, benchmarked on first start if a budget is given.
+    models = ModelRegistry(status_file=frame_dir / "models.json")
+    if latency_budget is not None:
+        models.benchmark_all()
+        if choice := models.choose(latency_budget):
+            models.select(choice.name)
+    models.write_status()
+
+    # Recent ticks of all streams, dumped on error or by a remote "debug" message.
+    ring = DebugRing(debug_ring, path=frame_dir / "debug-ring.json") if debug_ring else None
+
+    # Stack samples of slow ticks, for the web UI.
+    profiler = (
+        SlowTickProfiler(budget=slow_tick, status_file=frame_dir / "slow-ticks.json")
+        if slow_tick
+        else None
+    )
+
+    # Detectors the Thymio program needs, switched with the program.
+    needs = ProgramNeeds()
 
     remote = Remote(
-        zmq_socket=sub_socket,
+        subscriber=subscriber,
         thymio=thymio,
+        governor=gov,
+        models=models,
+        publisher=publisher,
+        ring=ring,
+        needs=needs,
     )
     remote.start()  # Run forever in background.
 
-    control = Control(
-        zmq_socket=pub_socket,
-        frame_dir=frame_dir,
-        freq_hz=freq,
-        thymio=thymio,
-    )
-    control.start()  # Run forever in foreground.
+    # One control loop per video stream, the first one writes to frame_dir.
+    for i, video in enumerate(videos):
+        stream_dir = frame_dir / video.name if i else frame_dir
+        stream_dir.mkdir(mode=0o775, parents=True, exist_ok=True)
+
+        control = Control(
+            publisher=publisher,
+            frame_dir=stream_dir,
+            freq_hz=freq,
+            detectables=[DETECTABLES.create(d) for d in video.detectors],
+            thymio=thymio,
+            source=(
+                FileSource(sorted(replay.glob("*.jp*g")), freq_hz=freq)
+                if replay
+                else PiCameraSource(camera_num=video.camera)
+            ),
+            name=video.name,
+            workers=workers,
+            governor=gov,
+            models=models,
+            gate=ChangeGate(area=gate_area) if gate else None,
+            ring=ring,
+            profiler=profiler,
+            tracer=tracer,
+            frame_age=frame_age,
+            needs=needs,
+        )
+        control.start()  # Run forever in foreground.
 
 
 if __name__ == "__main__":
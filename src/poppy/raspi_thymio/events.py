@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+"""
+Thymio event layouts and encoding.
+"""
+
+import logging
+import threading
+from typing import Dict, Iterable, List, Tuple, Type
+
+import numpy as np
+
+from .colors import rgb_to_hue
+from .detectable import DetectableList
+from .frame import Frame
+
+logger = logging.getLogger(__name__)
+
+# Events registered with the Thymio: name, number of values.
+EVENTS = (
+    ("camera.detect", 5),
+    ("camera.thing", 60),
+    ("camera.lane", 3),
+    ("command", 1),
+    ("A_sound_system", 1),
+    ("M_motor_left", 1),
+    ("M_motor_right", 1),
+    ("Q_add_motion", 4),
+    ("Q_cancel_motion", 1),
+    ("Q_reset", 0),
+)
+
+# Fields of camera events; slotted events repeat them once per kind.
+LAYOUTS = {
+    "camera.detect": ("kind", "conf", "color", "az", "el"),
+    "camera.thing": ("conf", "color", "az", "el"),
+    "camera.lane": ("az", "el", "slope"),
+}
+
+# Fields appended to unslotted camera events with frame_age: frame trace
+# number (15 bits) and frame age (ms) when sent.
+FRAME_FIELDS = ("trace", "age")
+
+# Field columns computed by EventEncoder.fields.
+FIELDS = ("kind", "target", "conf", "color", "az", "el", "slope") + FRAME_FIELDS
+
+
+class EventEncoder:
+    """
+    Encode detections as Thymio event vectors, in one array pass per list,
+    into int16 buffers allocated once from the event table. Hold lock
+    while using a returned buffer.
+
+    With frame_age, camera.detect and camera.lane also carry the trace and
+    age of the frame set by stamp; Thymio programs must then declare the
+    longer events, as registered from self.events.
+    """
+
+    def __init__(
+        self, events: Iterable[Tuple[str, int]] = EVENTS, frame_age: bool = False
+    ):
+        self.lock = threading.Lock()
+        self.sizes = dict(events)
+        self.layouts = dict(LAYOUTS)
+        if frame_age:
+            for name in ("camera.detect", "camera.lane"):
+                self.layouts[name] += FRAME_FIELDS
+                self.sizes[name] += len(FRAME_FIELDS)
+        # Event table to register with the Thymio.
+        self.events = tuple(self.sizes.items())
+        self.buffers: Dict[str, np.ndarray] = {
+            name: np.zeros(self.sizes[name], dtype=np.int16) for name in self.layouts
+        }
+        self.index = {
+            name: [FIELDS.index(f) for f in layout] for name, layout in self.layouts.items()
+        }
+        self.trace, self.age = 0, 0
+
+    def register(self, objects: Type[DetectableList]) -> None:
+        """
+        Add the event a detector plugin declares with its layout, one slot
+        per kind, unless the event is known.
+        """
+        name, layout = objects.event_name, objects.event_layout
+        if not name or not layout or name in self.layouts:
+            return
+        self.layouts[name] = tuple(layout)
+        self.sizes[name] = len(layout) * len(objects.kinds)
+        self.events = tuple(self.sizes.items())
+        self.buffers[name] = np.zeros(self.sizes[name], dtype=np.int16)
+        self.index[name] = [FIELDS.index(f) for f in layout]
+
+    def stamp(self, trace: int, age: int) -> None:
+        """
+        Frame trace number and age (ms) for the next events.
+        """
+        self.trace, self.age = trace & 0x7FFF, min(max(age, 0), 0x7FFF)
+
+    def fields(self, objects: DetectableList) -> np.ndarray:
+        """
+        One row of FIELDS per feature, as Detectable.format computes them.
+        """
+        array = objects.to_array()
+        rows = np.zeros((len(array), len(FIELDS)), dtype=np.int64)
+        if not len(array):
+            return rows
+        # Truncating casts, like int() on each value.
+        center = (array[:, [2, 3]] * 0.5 + array[:, [4, 5]] * 0.5).astype(int)
+        rows[:, 0] = array[:, 0]
+        rows[:, 1] = [f.target for f in objects]
+        rows[:, 2] = (array[:, 1] * 100).astype(int)
+        rows[:, 3] = (rgb_to_hue(array[:, 6:9]) * 12.0).astype(int)
+        rows[:, 4:6] = Frame.azel_maps.lookup(center)[:, :2]
+        if "slope" in objects.columns:
+            rows[:, 6] = (array[:, objects.columns.index("slope")] * 100).astype(int)
+        rows[:, 7:9] = self.trace, self.age
+        return rows
+
+    def slots(self, name: str, rows: np.ndarray, kinds: int) -> np.ndarray:
+        """
+        Fill event name with the fields of rows, one slot per kind below
+        kinds; the last row of a kind wins, missing kinds are zero.
+        """
+        buffer = self.buffers[name]
+        index = self.index[name]
+        width = len(index)
+        buffer[:] = 0
+        rows = rows[rows[:, 0] < min(kinds, len(buffer) // width)]
+        slots = buffer[: len(buffer) // width * width].reshape(-1, width)
+        slots[rows[:, 0]] = rows[:, index]
+        return buffer
+
+    def targets(self, objects: DetectableList, kinds: int | None = None) -> np.ndarray:
+        """
+        Slotted event vector of the targets of objects.
+        """
+        name = objects.event_name
+        rows = self.fields(objects)
+        return self.slots(name, rows[rows[:, 1] == 1], kinds or len(objects.kinds))
+
+    def features(
+        self, name: str, lists: List[DetectableList], kinds: int, targets: bool = False
+    ) -> np.ndarray:
+        """
+        Slotted event vector of all features, or only the targets, of
+        several lists; later lists win a kind.
+        """
+        rows = [self.fields(objects) for objects in lists]
+        rows = np.concatenate(rows) if rows else np.zeros((0, len(FIELDS)), dtype=int)
+        return self.slots(name, rows[rows[:, 1] == 1] if targets else rows, kinds)
+
+    def vectors(self, name: str, objects: DetectableList) -> np.ndarray:
+        """
+        Fields of event name, one row per feature.
+        """
+        return self.fields(objects)[:, self.index[name]].astype(np.int16)
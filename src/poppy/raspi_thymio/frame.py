@@ -5,6 +5,7 @@ Video frame handling.
 """
 
 import logging
+import os
 from functools import cached_property
 from pathlib import Path
 from typing import Tuple
@@ -17,6 +18,9 @@ from PIL import Image, ImageDraw, ImageFilter, ImageFont
 
 import poppy.raspi_thymio.colors as colors
 
+from .calibration import AzelMaps, Calibration
+from .capture import clock_ns
+
 logger = logging.getLogger(__name__)
 
 Mcenter = np.array([[0.5, 0, 0.5, 0], [0, 0.5, 0, 0.5]])
@@ -29,11 +33,17 @@ class Frame:
 
     frame_size = (640, 640)
     hough_width = 320
+    blob_width = 160
+
+    # Camera calibration and its azimuth/elevation maps, set by calibrate;
+    # with undistort, lanes are found in the undistorted x-ray image.
+    calibration = None
+    undistort = False
+    azel_maps = AzelMaps.linear(frame_size)
     mask_poly = np.array([[0, 28], [4, 20], [26, 20], [30, 28]]) * hough_width // 30
     mask = cv2.fillPoly(
         np.zeros((hough_width, hough_width)), [mask_poly], (255, 255, 255)
     )
-    _camera = None
 
     try:
         font_file = next(
@@ -48,10 +58,20 @@ class Frame:
         else ImageFont.load_default(size=12)
     )
 
-    def __init__(self, out_dir: Path | None = None) -> None:
+    def __init__(
+        self,
+        out_dir: Path | None = None,
+        capture=None,
+        frame_size: Tuple[int, int] | None = None,
+    ) -> None:
         """
         Instantiate video frame stream, logging frames to out_dir.
+        Camera frames are taken from the capture thread, if any.
         """
+        self.capture = capture
+        self.frame_size = frame_size or self.frame_size
+        self.timestamp = 0
+        self.sequence = -1
         if out_dir:
             try:
                 (Path(out_dir) / "touch").touch(exist_ok=True)
@@ -75,24 +95,44 @@ class Frame:
         if image_file:
             logger.debug("Frame: reading from %s", str(image_file))
             color = Image.open(image_file)
+            timestamp, sequence = clock_ns(), self.sequence + 1
         else:
             logger.debug("Frame: reading from camera")
-            if not(camera := self.camera()):
+            if not self.capture or not (snapshot := self.capture.wait(timeout=1.0)):
                 logger.debug("Frame: no camera, can't read")
                 return
-            color = camera.capture_image()
-        self.color = color.resize(self.frame_size)
+            color = Image.fromarray(snapshot.image)
+            timestamp, sequence = snapshot.timestamp, snapshot.sequence
+        self.load(color.resize(self.frame_size), timestamp, sequence)
 
         with open(self.out_dir / "raw.jpeg", "wb") as f:
             self.color.save(f)
             logger.debug("Frame: wrote raw frame %s", f.name)
 
+    @classmethod
+    def calibrate(cls, calibration: Calibration | None, undistort: bool = False) -> None:
+        """
+        Use calibration (linear maps if None) for all frames. Raise
+        ValueError if it is for another frame size: its maps would not
+        cover the frames.
+        """
+        if calibration and calibration.frame_size != cls.frame_size:
+            raise ValueError(
+                f"Frame: calibrated for {calibration.frame_size}, frames are {cls.frame_size}"
+            )
+        cls.calibration, cls.undistort = calibration, undistort and calibration is not None
+        cls.azel_maps = calibration.maps if calibration else AzelMaps.linear(cls.frame_size)
+
+    def load(self, color: Image.Image, timestamp: int = 0, sequence: int = 0) -> None:
+        """
+        Use color as the current frame.
+        """
+        self.color = color
+        self.timestamp, self.sequence = timestamp, sequence
+
         # Invalidate cached properties
-        try:
-            del self.gray
-            del self.xray
-        except AttributeError:
-            pass
+        for prop in ("gray", "xray", "integral", "hsv"):
+            self.__dict__.pop(prop, None)
 
     @cached_property
     def gray(self) -> Image.Image:
@@ -106,7 +146,10 @@ class Frame:
         """
         Return x-ray image.
         """
-        blur = self.gray.resize((self.hough_width, self.hough_width)).filter(
+        gray = self.gray
+        if self.undistort and self.calibration.frame_size == gray.size:
+            gray = Image.fromarray(self.calibration.undistort(np.asarray(gray)))
+        blur = gray.resize((self.hough_width, self.hough_width)).filter(
             ImageFilter.GaussianBlur(4)
         )
         xray = cv2.Canny(np.array(blur), 30, 100)
@@ -116,6 +159,22 @@ class Frame:
         logger.debug("Frame: wrote xray frame %s", f_name)
         return xray
 
+    @cached_property
+    def hsv(self) -> np.ndarray:
+        """
+        Return HSV array (0..255 channels) of the frame, blob_width wide.
+        """
+        width, height = self.color.size
+        small = (self.blob_width, round(self.blob_width * height / width))
+        return np.asarray(self.color.resize(small, Image.BILINEAR).convert("HSV"))
+
+    @cached_property
+    def integral(self) -> np.ndarray:
+        """
+        Return summed-area table of the color image, for O(1) box means.
+        """
+        return cv2.integral(np.asarray(self.color))
+
     def remap_gray(self, coord: np.ndarray) -> np.ndarray:
         """Remap coord to gray dimensions."""
         return coord
@@ -124,20 +183,37 @@ class Frame:
         """Remap coord to x-ray dimensions."""
         return (coord * self.frame_size[0] / self.hough_width).astype(int)
 
-    def center_color(self, center) -> Tuple[int, int, int]:
-        """Mean object color around the center."""
-        cx, cy = center
+    def from_xray(self, points: np.ndarray) -> np.ndarray:
+        """
+        Frame pixels of x-ray pixels, in pairs along the last axis.
+        """
+        scaled = np.asarray(points) * (self.frame_size[0] / self.hough_width)
+        if not self.undistort or self.calibration.frame_size != self.color.size:
+            return scaled
+        return self.calibration.distort_points(scaled).reshape(scaled.shape)
 
-        rgb = (
-            np.array(self.color)[(cy - 7):(cy + 7), (cx - 7):(cx + 7)]
-            .mean(axis=0)
-            .mean(axis=0)
-            .astype(int)
-        )
-        # logger.debug(
-        #     "*** midpoint color (%d,%d) = %s im %s", cx, cy, str(rgb), str(self.color)
-        # )
-        return rgb
+    def box_colors(self, boxes: np.ndarray) -> np.ndarray:
+        """
+        Mean colors of N boxes (rows x1, y1, x2, y2, clipped to the frame).
+        """
+        boxes = np.asarray(boxes, dtype=int).reshape(-1, 4)
+        w, h = self.color.size
+        x1, x2 = (np.clip(v, 0, w) for v in np.sort(boxes[:, [0, 2]], axis=1).T)
+        y1, y2 = (np.clip(v, 0, h) for v in np.sort(boxes[:, [1, 3]], axis=1).T)
+
+        sat = self.integral
+        total = sat[y2, x2] - sat[y1, x2] - sat[y2, x1] + sat[y1, x1]
+        area = np.maximum((x2 - x1) * (y2 - y1), 1).reshape(-1, 1)
+        return (total / area).astype(int)
+
+    def center_colors(self, centers: np.ndarray, half: int = 7) -> np.ndarray:
+        """Mean object colors around N centers."""
+        centers = np.asarray(centers, dtype=int).reshape(-1, 2)
+        return self.box_colors(np.c_[centers - half, centers + half])
+
+    def center_color(self, center) -> np.ndarray:
+        """Mean object color around the center."""
+        return self.center_colors(center)[0]
 
     def center_color_xyxy(self, xyxy) -> np.ndarray:
         """
@@ -187,43 +263,12 @@ class Frame:
             self.color.save(f)
             logger.debug("Frame: wrote frame %s", f.name)
 
-    @classmethod
-    def camera(cls):
-        """
-        Get the Pi camera, instantiate only once even if shared by multiple
-        video streams.
-        """
-
-        # cls._camera can have one of three values:
-        # False = no camera, None = not initialized, else initialized.
-
-        if cls._camera or cls._camera is False:
-            logger.debug("Camera: initialized or False, -> %s", str(cls._camera))
-            return cls._camera
-
-        # cls._camera == None, try to initialize camera.
-
-        try:
-            # Conditionally import optional dependency picamera2
-            from picamera2 import Picamera2  # type: ignore[import-not-found]
-        except ImportError:
-            logger.warn("Camera: optional dependency Picamera2 missing, no camera -> False")
-            cls._camera = False
-            return False
-
-        logger.debug("Camera: instantiating camera")
-        cls._camera = Picamera2()
-        logger.debug("Camera: Picamera2() == %s", str(cls._camera))
-        cls._camera.preview_configuration.main.size = cls.frame_size
-        cls._camera.preview_configuration.main.format = "RGB888"
-        cls._camera.preview_configuration.align()
-        cls._camera.configure("preview")
-        logger.debug("Camera: starting %s", str(cls._camera))
-        cls._camera.start()
-        logger.debug("Camera: started %s", str(cls._camera))
-
-        logger.info("Camera: -> %s", str(cls._camera))
-        return cls._camera
-
     def __str__(self) -> str:
         return f"{self}"
+
+
+# Calibration of the camera, also in worker processes.
+if calibration_file := os.environ.get("UCIA_CALIBRATION"):
+    Frame.calibrate(
+        Calibration.load(calibration_file), os.environ.get("UCIA_UNDISTORT", "0") == "1"
+    )
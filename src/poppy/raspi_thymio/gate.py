@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""
+Scene change gate.
+"""
+
+import logging
+import time
+from typing import Tuple
+
+import cv2
+import numpy as np
+
+from .frame import Frame
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeGate:
+    """
+    Tell whether the scene changed since the last detection, by comparing
+    downscaled grayscale frames. While it has not, detectors can be skipped
+    and their last results reused, at most max_age seconds.
+    """
+
+    # Thumbnail size, and gray level change of a thumbnail cell that counts.
+    size: Tuple[int, int] = (32, 32)
+    cell_threshold = 12
+
+    def __init__(self, area: float = 0.005, max_age: float = 2.0):
+        self.area = area
+        self.max_age = max_age
+        self.reference = None
+        self.refreshed = 0.0
+        self.skipped = 0
+
+    def thumbnail(self, frame: Frame) -> np.ndarray:
+        """
+        Downscaled grayscale frame.
+        """
+        return cv2.resize(
+            np.asarray(frame.gray), self.size, interpolation=cv2.INTER_AREA
+        ).astype(np.int16)
+
+    def changed(self, frame: Frame) -> bool:
+        """
+        Whether more than area (fraction) of the frame changed since the last
+        detection, or the last results are too old. If so, the frame becomes
+        the new reference.
+        """
+        thumbnail = self.thumbnail(frame)
+        now = time.monotonic()
+        if self.reference is None or now - self.refreshed >= self.max_age:
+            changed = True
+        else:
+            moved = np.count_nonzero(abs(thumbnail - self.reference) > self.cell_threshold)
+            changed = moved > self.area * thumbnail.size
+            logger.debug("Gate: %d cells changed, %s", moved, changed)
+
+        if changed:
+            self.reference, self.refreshed = thumbnail, now
+        else:
+            self.skipped += 1
+        return changed
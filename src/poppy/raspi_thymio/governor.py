@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+"""
+Adaptive frame-rate governor.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class Governor:
+    """
+    Adapt tick rate, inference resolution and detector strides to the
+    measured tick latency and the CPU temperature.
+    """
+
+    thermal_zone = Path("/sys/class/thermal/thermal_zone0/temp")
+    throttled = Path("/sys/devices/platform/soc/soc:firmware/get_throttled")
+
+    # Operating points from full service to lowest load:
+    # rate scale, inference image size, stride of secondary detectors.
+    ladder = (
+        (1.0, 640, 1),
+        (0.75, 640, 1),
+        (0.75, 480, 1),
+        (0.5, 480, 2),
+        (0.5, 320, 2),
+        (0.25, 320, 4),
+    )
+
+    # Consecutive ticks under or over target before changing level.
+    patience = 4
+    # Smoothing factor for the tick latency moving average.
+    alpha = 0.3
+
+    def __init__(
+        self,
+        target_latency: float = 0.4,
+        target_temp: float = 70.0,
+        status_file: Path | None = None,
+    ):
+        self.lock = threading.Lock()
+        self.target_latency = target_latency
+        self.target_temp = target_temp
+        self.status_file = status_file
+
+        self.level = 0
+        self.pressure = 0
+        self.latency = 0.0
+        self.temp = None
+        self.load = 0.0
+        self.ticks = 0
+
+        logger.info(
+            "Governor: target latency %g sec, temperature %g °C",
+            target_latency,
+            target_temp,
+        )
+
+    @property
+    def rate(self) -> float:
+        """Scale factor for the tick rate."""
+        return self.ladder[self.level][0]
+
+    @property
+    def imgsz(self) -> int:
+        """Inference image size."""
+        return self.ladder[self.level][1]
+
+    @property
+    def stride(self) -> int:
+        """Secondary detectors run every stride ticks."""
+        return self.ladder[self.level][2]
+
+    @property
+    def settings(self) -> dict:
+        """Detector class settings for the current level."""
+        return dict(imgsz=self.imgsz)
+
+    def runs(self, index: int, tick: int) -> bool:
+        """
+        Whether the index-th detector of a stream runs on this tick.
+        The first detector always runs.
+        """
+        return index == 0 or tick % self.stride == 0
+
+    def read_temp(self) -> float | None:
+        """
+        CPU temperature (°C), or None if unknown.
+        """
+        try:
+            return int(self.thermal_zone.read_text()) / 1000.0
+        except (OSError, ValueError):
+            return None
+
+    def read_throttled(self) -> bool:
+        """
+        Whether the firmware reports current throttling (Raspberry Pi).
+        """
+        try:
+            return bool(int(self.throttled.read_text(), 16) & 0xF)
+        except (OSError, ValueError):
+            return False
+
+    def tick(self, latency: float) -> None:
+        """
+        Account for one tick of the given latency (sec), adapt level.
+        """
+        with self.lock:
+            self.ticks += 1
+            self.latency += self.alpha * (latency - self.latency)
+            self.temp = self.read_temp()
+            self.load = os.getloadavg()[0] / (os.cpu_count() or 1)
+
+            hot = self.temp is not None and self.temp > self.target_temp
+            if hot or self.latency > self.target_latency or self.read_throttled():
+                self.pressure = max(self.pressure, 0) + 1
+            elif (
+                self.latency < 0.7 * self.target_latency
+                and (self.temp is None or self.temp < self.target_temp - 5)
+                and self.load < 0.9
+            ):
+                self.pressure = min(self.pressure, 0) - 1
+            else:
+                self.pressure = 0
+
+            if abs(self.pressure) >= self.patience:
+                level = self.level + (1 if self.pressure > 0 else -1)
+                self.level = min(max(level, 0), len(self.ladder) - 1)
+                self.pressure = 0
+                logger.info("Governor: level %d %s", self.level, self.ladder[self.level])
+
+            self.write_status()
+
+    def set(self, **setpoints) -> None:
+        """
+        Change setpoints target_latency, target_temp, or force a level.
+        """
+        with self.lock:
+            for key in ("target_latency", "target_temp"):
+                if key in setpoints:
+                    setattr(self, key, float(setpoints[key]))
+            if "level" in setpoints:
+                self.level = min(max(int(setpoints["level"]), 0), len(self.ladder) - 1)
+                self.pressure = 0
+        logger.info("Governor: set %s", setpoints)
+
+    def status(self) -> dict:
+        """
+        Setpoints and measurements.
+        """
+        return {
+            "target_latency": self.target_latency,
+            "target_temp": self.target_temp,
+            "latency": round(self.latency, 4),
+            "temp": self.temp,
+            "load": round(self.load, 2),
+            "level": self.level,
+            "rate": self.rate,
+            "imgsz": self.imgsz,
+            "stride": self.stride,
+            "ticks": self.ticks,
+        }
+
+    def write_status(self) -> None:
+        """
+        Write status as JSON for the web UI.
+        """
+        if self.status_file:
+            try:
+                (tmp := self.status_file.with_suffix(".tmp")).write_text(
+                    json.dumps(self.status())
+                )
+                tmp.replace(self.status_file)
+            except OSError as e:
+                logger.debug("Governor: can't write status: %s", e)
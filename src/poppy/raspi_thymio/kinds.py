@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+"""
+Kinds of things, shared by the detectors of things.
+"""
+
+from enum import IntEnum
+
+
+class ThingKind(IntEnum):
+    Parking = 0   # V3 native 0
+    Zebra = 1     # V3 native 14
+    Stop = 2      # V3 native 12
+    Balle = 3     # V3 native 1
+    Cube = 4      # V3 native 3
+    Cylindre = 5  # V3 native 4
+    Hexagone = 6  # V3 native 5
+    Maison = 7    # V3 native 6
+    Etoile = 8    # V3 native 11
+    Triangle = 9  # V3 native 13
+    Cible = 10    # V3 native 2
+    Nid = 11      # V3 native 10
+    Gauche = 12   # V3 native 7
+    Droite = 13   # V3 native 8
+    Voie = 14     # V3 native 9
+    Other = 15
@@ -4,19 +4,23 @@
 Lanes that can be followed
 """
 
-import colorsys
 import logging
+import os
+import time
 from collections import deque
 from enum import IntEnum
-from itertools import combinations
 from typing import List, Tuple
 
 import cv2
 import numpy as np
 
+from .birdseye import BirdseyeView, WindowSearch
+from .colors import rgb_to_hue
 from .detectable import Detectable, DetectableList
+from .events import EventEncoder
 from .frame import Frame
 from .self_type import Self
+from .tracker import LaneTracker
 
 logger = logging.getLogger(__name__)
 
@@ -60,14 +64,12 @@ class Lane(Detectable):
         result["slope"] = self.slope
         return result
 
-    def event(self) -> List[List[int]]:
+    def event(self) -> List[int]:
         """
-        Format single thing as Thymio event.
+        Format single lane as Thymio event.
         """
-        f = self.format()
-        vec = [f.get(i, 0) for i in ["az", "el", "slope"]]
-        vec[2] = int(vec[2] * 100)
-        return vec
+        with LaneList.encoder.lock:
+            return LaneList.encoder.vectors("camera.lane", LaneList([self]))[0].tolist()
 
     def __str__(self) -> str:
         return self.label
@@ -78,39 +80,138 @@ class LaneList(DetectableList[Lane]):
     List of detected lanes.
     """
 
+    feature = Lane
+    kinds = LaneKind
+    name = "lanes"
+    event_name = "camera.lane"
+    cost = "medium"
+    views = ("color", "xray")
+    decoration = "lanes"
+    columns = DetectableList.columns + ("slope",)
+
     # Hough parameters rho, theta, threshold; min pts, max gap; iterations
     hough_params = [2, np.pi / 90, 15]
     minlen, maxgap = 15, 25
     hough_iter = 8
 
-    # Shared history of past lines
+    # Default history of past lines, each instance has its own
     lines = deque(maxlen=6)
 
+    # Track lanes between frames instead of averaging past lines, searching
+    # only the predicted band with fewer Hough iterations.
+    tracking = os.environ.get("UCIA_LANE_TRACKING", "0") == "1"
+    tracked_iter = 2
+    # Commanded motor speeds (left, right), if known.
+    motors = None
+
+    # Lane engine: Hough lines in the frame, or sliding windows in a
+    # bird's-eye view of the ground.
+    lane_engine = os.environ.get("UCIA_LANE_ENGINE", "hough")
+
     # Smoothing of lane lines
     bins_edges = 640 / 12.0 * np.array(range(12))
 
+    # Event encoder of event(), its buffers shared by all lists.
+    encoder = EventEncoder()
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.lines = deque(maxlen=type(self).lines.maxlen)
+        self.tracker = LaneTracker()
+        self.search = WindowSearch(BirdseyeView(calibration=Frame.calibration))
+
     @classmethod
-    def detect(cls, frame: Frame) -> Self:
+    def configure(cls, **settings) -> None:
         """
-        Factory method to detect lanes in an image.
+        Apply settings; the lane engine decides the frame views read.
+        """
+        super().configure(**settings)
+        cls.views = ("color", "gray") if cls.lane_engine == "windows" else ("color", "xray")
+
+    def update(self: Self, frame: Frame) -> Self:
+        """
+        Detect new lanes using this list's history, or its tracker.
+        """
+        if self.lane_engine == "windows":
+            return self.windows(frame)
+        if self.tracking:
+            return self.track(frame)
+        return self.detect(frame, history=self.lines)
+
+    def track(self: Self, frame: Frame) -> Self:
+        """
+        Detect lanes near their predicted position, and filter them.
+        """
+        t = frame.timestamp / 1e9 if frame.timestamp else time.monotonic()
+        self.tracker.predict(t, self.motors)
+
+        band = self.tracker.band(frame.hough_width, frame.hough_width / frame.frame_size[0])
+        if band is None:
+            sample = self.hough(frame.xray, frame, self.hough_iter)
+        else:
+            sample = self.hough(frame.xray * band, frame, self.tracked_iter)
+
+        measured = []
+        if len(sample):
+            # No history: the tracker does the smoothing.
+            combo = self.add_lines(lines=sample, history=deque(maxlen=0))
+            measured = self.choose_best_lane(lines=combo, frame=frame)
+        rows = self.tracker.update(np.array(measured, dtype=float).reshape(-1, 7), t)
+        logger.debug("Tracked lanes %s", rows)
+
+        return type(self)(
+            Lane(xyxy=np.array(row[2:6]).astype(int), kind=LaneKind.Center, slope=row[6])
+            for row in rows
+        )
+
+    def windows(self: Self, frame: Frame) -> Self:
+        """
+        Detect lanes with a window search in the bird's-eye view, and filter
+        them if tracking.
+        """
+        rows = self.search.find(np.asarray(frame.gray))
+        if self.tracking:
+            t = frame.timestamp / 1e9 if frame.timestamp else time.monotonic()
+            self.tracker.predict(t, self.motors)
+            rows = self.tracker.update(np.array(rows, dtype=float).reshape(-1, 7), t)
+        logger.debug("Window lanes %s", rows)
+
+        return type(self)(
+            Lane(xyxy=np.array(row[2:6]).astype(int), kind=LaneKind.Center, slope=row[6])
+            for row in rows
+        )
+
+    @classmethod
+    def hough(cls, xray: np.ndarray, frame: Frame, iterations: int) -> np.ndarray:
+        """
+        Hough lines found in iterations passes over xray, in frame pixels.
         """
         lines = [
             cv2.HoughLinesP(
-                frame.xray,
+                xray,
                 *cls.hough_params,
                 np.array([]),
                 minLineLength=cls.minlen,
                 maxLineGap=cls.maxgap,
             )
-            * (frame.frame_size[0] / frame.hough_width)
-            for i in range(cls.hough_iter)
+            for i in range(iterations)
         ]
-        sample = np.concatenate(lines)
-        combo = cls.add_lines(lines=sample)
-        logger.debug("Detect_one: combo lines \n%s", str(combo))
+        lines = [i for i in lines if i is not None]
+        if not lines:
+            return np.zeros((0, 1, 4))
+        return frame.from_xray(np.concatenate(lines))
+
+    @classmethod
+    def detect(cls, frame: Frame, history: deque | None = None) -> Self:
+        """
+        Factory method to detect lanes in an image.
+        """
+        sample = cls.hough(frame.xray, frame, cls.hough_iter)
+        combo = cls.add_lines(lines=sample, history=history)
+        logger.debug("Detect_one: combo lines \n%s", combo)
 
         best_lanes = cls.choose_best_lane(lines=combo, frame=frame)
-        logger.info("Best lanes %s", best_lanes)
+        logger.debug("Best lanes %s", best_lanes)
 
         return cls(
             Lane(xyxy=np.array(line[2:6]), kind=LaneKind.Center, slope=line[6])
@@ -118,18 +219,19 @@ class LaneList(DetectableList[Lane]):
         )
 
     @classmethod
-    def add_lines(cls, lines):
+    def add_lines(cls, lines, history: deque | None = None):
         """Add new lines to moving average."""
 
         # info = cls.analyze_lines(lines)
+        history = cls.lines if history is None else history
 
         # Combine new lines with history.
-        if len(cls.lines) < 2:
+        if len(history) < 2:
             concat = cls.analyze_lines(lines)
-            cls.lines.extend([concat[:, :, :4]])
+            history.extend([concat[:, :, :4]])
         else:
-            concat = cls.analyze_lines(np.concatenate(list(cls.lines) + [lines]))
-            cls.lines.extend([cls.analyze_lines(lines)[:, :, :4]])
+            concat = cls.analyze_lines(np.concatenate(list(history) + [lines]))
+            history.extend([cls.analyze_lines(lines)[:, :, :4]])
 
         # Filter to choose mostly vertical lines
         vertical = concat[abs(concat[:, :, 5]) > 0.3].reshape(-1, 1, 7)
@@ -169,40 +271,36 @@ class LaneList(DetectableList[Lane]):
         Assume lines are sorted by midpoint (column 4).
         """
         d = lines.astype(int)[:, 0, [4, 5]]
-        comp = {
-            (i, j): ((d[i, 0] + d[j, 0]) // 2, (d[i, 1] + d[j, 1]) // 2, slope)
-            for i, j in combinations(range(d.shape[0]), r=2)
-            if abs(d[i, 0] - d[j, 0]) < 150
-            if colorsys.rgb_to_hls(
-                *frame.center_color_xyxy((d[i, 0], d[i, 1], d[j, 0], d[j, 1]))
-            )[0]
-            < 100
-            if abs(slope := np.arctan2(d[j, 1] - d[i, 1], d[j, 0] - d[i, 0])) < 0.78
-        }
-        # logger.debug("*** comparison %s", str(comp))
-
-        candidates = sorted(
-            [
-                (*c[:2], d[ab[0], 0], d[ab[0], 1], d[ab[1], 0], d[ab[1], 1], c[2])
-                for ab, c in comp.items()
-            ],
-            key=lambda v: v[6],
+
+        # All pairs (i, j), i < j, in the same order as itertools.combinations.
+        i, j = np.triu_indices(d.shape[0], k=1)
+        slope = np.arctan2(d[j, 1] - d[i, 1], d[j, 0] - d[i, 0])
+        hue = rgb_to_hue(frame.center_colors(((d[i] + d[j]) * 0.5).astype(int)))
+        keep = (abs(d[i, 0] - d[j, 0]) < 150) & (hue < 100) & (abs(slope) < 0.78)
+
+        i, j, slope = i[keep], j[keep], slope[keep]
+        order = np.argsort(slope, kind="stable")[:2]
+        candidates = list(
+            zip(
+                ((d[i, 0] + d[j, 0]) // 2)[order],
+                ((d[i, 1] + d[j, 1]) // 2)[order],
+                d[i, 0][order],
+                d[i, 1][order],
+                d[j, 0][order],
+                d[j, 1][order],
+                slope[order],
+            )
         )
         # logger.debug("*** candidates %s", str(candidates))
 
-        return candidates[: min(2, len(candidates))]
+        return candidates
 
-    def event(self) -> List[List[int]]:
+    def event(self) -> List[int]:
         """
         Format lanes as Thymio event.
         """
-        best = {
-            k: obj.event()
-            for k in LaneKind
-            for obj in self
-            if obj.kind == k and obj.target
-        }
-        return [i for k in LaneKind for i in best.get(k, [0, 0, 0]) if k < 9]
+        with self.encoder.lock:
+            return self.encoder.targets(self).tolist()
 
     def __str__(self) -> str:
         return f"LaneList<{hex(id(self))}({', '.join(str(t) for t in self)})>"
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+"""
+Side-by-side benchmark of the lane engines.
+"""
+
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import click
+import numpy as np
+
+from .frame import Frame
+from .lane import LaneList
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ("hough", "windows")
+
+
+def benchmark(
+    images: Sequence[Path], engines: Sequence[str] = ENGINES, repeat: int = 1
+) -> Dict[str, dict]:
+    """
+    Run each lane engine over the images, in order, repeat times. Report
+    the detection time per frame (ms), the fraction of frames with a lane
+    and the jitter of the lane azimuth between consecutive frames.
+    """
+    saved = LaneList.lane_engine
+    results = {}
+    try:
+        for engine in engines:
+            LaneList.configure(lane_engine=engine)
+            lanes, frame = LaneList(), Frame()
+            times: List[float] = []
+            azimuths: List[int | None] = []
+            for image in list(images) * repeat:
+                frame.get_frame(image)
+                start = time.perf_counter()
+                lanes.merge(lanes.update(frame))
+                lanes.update_targets()
+                times.append((time.perf_counter() - start) * 1000)
+                best = next((lane for lane in lanes if lane.target), None)
+                azimuths.append(best.azel[0] if best else None)
+            pairs = zip(azimuths, azimuths[1:])
+            steps = [abs(b - a) for a, b in pairs if a is not None and b is not None]
+            results[engine] = {
+                "frames": len(times),
+                "mean_ms": round(float(np.mean(times)), 2),
+                "p95_ms": round(float(np.percentile(times, 95)), 2),
+                "max_ms": round(max(times), 2),
+                "found": round(sum(a is not None for a in azimuths) / len(azimuths), 3),
+                "jitter": round(float(np.mean(steps)), 1) if steps else None,
+            }
+            logger.info("Lane bench %s: %s", engine, results[engine])
+    finally:
+        LaneList.configure(lane_engine=saved)
+    return results
+
+
+@click.command(name="ucia-lane-bench")
+@click.argument(
+    "images", nargs=-1, required=True, type=click.Path(path_type=Path, exists=True)
+)
+@click.option(
+    "--repeat",
+    help="Runs over the images",
+    default=3,
+    show_default=True,
+    type=click.INT,
+)
+@click.option(
+    "--loglevel",
+    help="Logging level",
+    default="WARNING",
+    show_default=True,
+    type=click.STRING,
+)
+def main(images: List[Path], repeat: int, loglevel: str):
+    """
+    Compare the latency and stability of the lane engines on a sequence
+    of frames.
+    """
+    loglevel_int = getattr(logging, loglevel.upper(), logging.WARNING)
+    logging.basicConfig(format="%(asctime)s %(message)s", level=loglevel_int)
+    click.echo(json.dumps(benchmark(images, repeat=repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+"""
+Latency tracing, from camera capture to the Thymio.
+"""
+
+import json
+import logging
+import threading
+from bisect import bisect_left
+from collections import deque
+from pathlib import Path
+from typing import Dict
+
+from .capture import clock_ns
+
+logger = logging.getLogger(__name__)
+
+# Thymio programs cycle _camera.heartbeat through 50..56, one step per
+# camera.detect event they handle.
+HEARTBEAT_BASE, HEARTBEAT_CYCLE = 50, 7
+
+
+class LatencyTracer:
+    """
+    Trace each frame through capture, detection, ZMQ publish and Thymio
+    event send, with timestamps (ns) on the clock of frame timestamps
+    (CLOCK_BOOTTIME on Linux), and histograms of the time between stages.
+    The Thymio acknowledges camera.detect events by stepping
+    _camera.heartbeat, closing the loop.
+    """
+
+    # Stages of a frame, in order; segments are named by their end stage.
+    stages = ("capture", "detect", "publish", "send", "ack")
+    # Histogram bucket upper bounds (ms), the last bucket is unbounded.
+    bounds = (5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+
+    def __init__(self, status_file: Path | None = None, pending: int = 64):
+        self.status_file = status_file
+        self.lock = threading.Lock()
+        self.segments = self.stages[1:] + ("total", "acked")
+        self.histograms: Dict[str, list] = {
+            s: [0] * (len(self.bounds) + 1) for s in self.segments
+        }
+        # Traces of camera.detect events sent, waiting for a heartbeat.
+        self.sent: deque = deque(maxlen=pending)
+        self.beat = None
+        self.last: dict = {}
+
+    @staticmethod
+    def begin(trace: str, captured: int) -> dict:
+        """
+        New trace of a frame captured at time captured (ns), a frame
+        timestamp.
+        """
+        return {"trace": trace, "capture": captured or clock_ns()}
+
+    @staticmethod
+    def mark(record: dict, stage: str) -> None:
+        """
+        Mark stage of a trace as reached now.
+        """
+        record[stage] = clock_ns()
+
+    @staticmethod
+    def age(record: dict) -> int:
+        """
+        Age of the traced frame (ms).
+        """
+        return (clock_ns() - record["capture"]) // 1_000_000
+
+    def add(self, segment: str, ns: int) -> None:
+        """
+        Count a duration (ns) in the histogram of segment.
+        """
+        self.histograms[segment][bisect_left(self.bounds, ns / 1e6)] += 1
+
+    def end(self, record: dict, events: int = 0) -> None:
+        """
+        Count the stage durations of a trace whose events were sent,
+        events camera.detect events of them waiting for acknowledgement.
+        """
+        with self.lock:
+            reached = [s for s in self.stages if s in record]
+            for begin, end in zip(reached, reached[1:]):
+                self.add(end, record[end] - record[begin])
+            self.add("total", record[reached[-1]] - record["capture"])
+            self.sent.extend([record] * events)
+            self.last = record
+
+    def heartbeat(self, value: int) -> None:
+        """
+        Acknowledge the oldest sent events, one per heartbeat step.
+        """
+        now = clock_ns()
+        with self.lock:
+            if not all(
+                b is not None and 0 <= b - HEARTBEAT_BASE < HEARTBEAT_CYCLE
+                for b in (self.beat, value)
+            ):
+                self.beat = value
+                return
+            steps, self.beat = (value - self.beat) % HEARTBEAT_CYCLE, value
+            for _ in range(min(steps, len(self.sent))):
+                record = self.sent.popleft()
+                if "ack" not in record:
+                    record["ack"] = now
+                    self.add("ack", now - record.get("send", now))
+                    self.add("acked", now - record["capture"])
+
+    def variables(self, variables: dict) -> None:
+        """
+        Take the heartbeat from changed Thymio variables.
+        """
+        if (beat := variables.get("_camera.heartbeat")) is not None:
+            self.heartbeat(int(beat[0]))
+
+    def status(self) -> dict:
+        """
+        Histograms, and the stage times (ms) of the last trace.
+        """
+        with self.lock:
+            last = {
+                s: round((self.last[s] - self.last["capture"]) / 1e6, 1)
+                for s in self.stages
+                if s in self.last
+            }
+            return {
+                "bounds": list(self.bounds),
+                "histograms": {s: list(h) for s, h in self.histograms.items()},
+                "last": dict(trace=self.last.get("trace"), **last),
+            }
+
+    def write_status(self) -> None:
+        """
+        Write status as JSON for the web UI.
+        """
+        if self.status_file:
+            try:
+                (tmp := self.status_file.with_suffix(".tmp")).write_text(
+                    json.dumps(self.status())
+                )
+                tmp.replace(self.status_file)
+            except OSError as e:
+                logger.debug("Latency: can't write status: %s", e)
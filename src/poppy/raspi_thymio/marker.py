@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+"""
+Things tagged with fiducial markers (ArUco, AprilTag).
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+
+import cv2
+import numpy as np
+import yaml
+
+from .detectable import Detectable, DetectableList
+from .frame import Frame
+from .kinds import ThingKind
+from .self_type import Self
+
+logger = logging.getLogger(__name__)
+
+
+class Marker(Detectable):
+    """
+    A thing found by its marker.
+    """
+
+    def __init__(
+        self,
+        xyxy: np.ndarray,
+        kind: ThingKind = ThingKind.Other,
+        color: Tuple = (0, 0, 0),
+        confidence: float = 1.0,
+        target: bool = False,
+        ttl: int = 3,
+    ) -> None:
+        super().__init__(xyxy, kind, color, confidence, target, ttl)
+
+    @property
+    def label(self) -> str:
+        """Marker text label."""
+        return f"#{self.kind.name} {self.azel}"
+
+    def __str__(self) -> str:
+        return f"{self.label}{self.center}={self.azel}{'!' if self.target else ''}"
+
+
+class MarkerList(DetectableList[Marker]):
+    """
+    List of things found by their markers, much cheaper than YOLO: it can
+    run on every frame, alongside ThingList or instead of it. Markers are
+    mapped to kinds by their ID.
+    """
+
+    feature = Marker
+    kinds = ThingKind
+    # Programs ask for things; markers serve the same needs and events.
+    name = "things"
+    event_name = "camera.thing"
+    views = ("color", "gray")
+
+    classes = None  # Kind names to detect, all if None.
+
+    # Marker dictionary, and kind of each marker ID: marker N is kind N
+    # unless UCIA_MARKERS (YAML: dictionary, kinds {id: name}) says otherwise.
+    dictionary = "DICT_4X4_50"
+    ids: Dict[int, ThingKind] = {kind.value: kind for kind in ThingKind if kind.name != "Other"}
+
+    # One OpenCV detector, made on first use, shared by all video streams.
+    detector = None
+    detector_lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path | str | None = None) -> None:
+        """
+        Read the marker dictionary and ID map from a YAML file.
+        """
+        if not path:
+            return
+        config = yaml.safe_load(Path(path).read_text()) or {}
+        kinds = config.get("kinds", {})
+        unknown = {name for name in kinds.values() if name not in ThingKind.__members__}
+        if unknown:
+            raise ValueError(f"MarkerList: unknown kinds {', '.join(sorted(unknown))}")
+        cls.configure(
+            dictionary=config.get("dictionary", cls.dictionary),
+            ids={int(i): ThingKind[name] for i, name in kinds.items()} or cls.ids,
+            detector=None,
+        )
+        logger.info("MarkerList: loaded %s", path)
+
+    @classmethod
+    def make_detector(cls) -> cv2.aruco.ArucoDetector:
+        """
+        Detector of the markers of the dictionary.
+        """
+        dictionary = cv2.aruco.getPredefinedDictionary(getattr(cv2.aruco, cls.dictionary))
+        logger.info("MarkerList: detecting %s markers", cls.dictionary)
+        return cv2.aruco.ArucoDetector(dictionary, cv2.aruco.DetectorParameters())
+
+    @classmethod
+    def detect(cls, frame: Frame) -> Self:
+        """
+        Factory method to detect marked things in an image.
+        """
+        with cls.detector_lock:
+            if cls.detector is None:
+                cls.detector = cls.make_detector()
+            corners, ids, _ = cls.detector.detectMarkers(np.asarray(frame.gray))
+        if ids is None:
+            return cls([])
+
+        markers = cls.postprocess(np.array(corners).reshape(-1, 4, 2), ids.ravel())
+        markers.colorize(frame)
+        logger.debug("Marker Detect: found %s", markers)
+        return markers
+
+    @classmethod
+    def postprocess(cls, corners: np.ndarray, ids: np.ndarray) -> Self:
+        """
+        Interpret markers (N×4×2 corners, IDs) as things, boxed by their
+        corners, ignoring unmapped IDs and kinds not in classes.
+        """
+        wanted = {ThingKind[name] for name in cls.classes} if cls.classes else set(ThingKind)
+        low, high = corners.min(axis=1).astype(int), corners.max(axis=1).astype(int)
+        # Same corner order as ThingList: x1, y2, x2, y1.
+        boxes = np.stack([low[:, 0], high[:, 1], high[:, 0], low[:, 1]], axis=1)
+        return cls(
+            Marker(xyxy=xyxy, kind=kind)
+            for xyxy, marker in zip(boxes, ids)
+            if (kind := cls.ids.get(int(marker))) is not None and kind in wanted
+        )
+
+    def __str__(self) -> str:
+        return f"MarkerList<{hex(id(self))}({', '.join(str(t) for t in self)})>"
+
+
+MarkerList.load(os.environ.get("UCIA_MARKERS"))
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+"""
+Registry of YOLO model variants.
+"""
+
+import json
+import logging
+import os
+import platform
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+import yaml
+
+logger = logging.getLogger(__name__)
+
+
+class ModelVariant(NamedTuple):
+    """
+    An exported YOLO model: size letter (n, s, m...), input size, precision.
+    """
+
+    name: str
+    path: Path
+    size: str
+    imgsz: int
+    precision: str
+
+    @property
+    def quality(self) -> tuple:
+        """Sort key, higher is presumably more accurate."""
+        return (
+            "nsmlx".find(self.size),
+            self.imgsz,
+            ("int8", "fp16", "fp32").index(self.precision),
+        )
+
+
+class ModelRegistry:
+    """
+    Discover YOLO model variants under UCIA_MODELS, benchmark them once on
+    this CPU, and choose the best variant within a latency budget.
+    """
+
+    root = Path(os.environ.get("UCIA_MODELS", "."))
+    cache_file = (
+        Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")).expanduser()
+        / "ucia"
+        / "models.json"
+    )
+    runs = 5
+
+    def __init__(
+        self,
+        root: Path | None = None,
+        cache_file: Path | None = None,
+        status_file: Path | None = None,
+    ):
+        self.root = Path(root or self.root)
+        self.cache_file = Path(cache_file or self.cache_file)
+        self.status_file = status_file
+        self.variants: Dict[str, ModelVariant] = {
+            v.name: v for v in self.discover(self.root)
+        }
+        self.latency: Dict[str, float] = self.load_cache()
+        self.current: ModelVariant | None = None
+        logger.info("Models: found %d variants under %s", len(self.variants), self.root)
+
+    @staticmethod
+    def discover(root: Path) -> List[ModelVariant]:
+        """
+        Find exported ncnn models, described by their metadata.yaml.
+        """
+        variants = []
+        for path in sorted(root.glob("**/*_ncnn_model")):
+            try:
+                meta = yaml.safe_load((path / "metadata.yaml").read_text()) or {}
+            except (OSError, yaml.YAMLError):
+                meta = {}
+            args = meta.get("args", {})
+            imgsz = meta.get("imgsz", [640])
+            size = re.search(r"YOLO\w*?\d+([nsmlx])", str(path), re.IGNORECASE)
+            variants.append(
+                ModelVariant(
+                    name=str(path.relative_to(root)).replace("/weights", ""),
+                    path=path,
+                    size=size.group(1).lower() if size else "n",
+                    imgsz=int(imgsz[0] if isinstance(imgsz, list) else imgsz),
+                    precision=(
+                        "int8" if args.get("int8") else "fp16" if args.get("half") else "fp32"
+                    ),
+                )
+            )
+        return variants
+
+    def cache_key(self, variant: ModelVariant) -> str:
+        """
+        Benchmarks are valid for one machine and one model file version.
+        """
+        mtime = max((p.stat().st_mtime_ns for p in variant.path.iterdir()), default=0)
+        return f"{platform.node()}:{platform.machine()}:{variant.path}:{mtime}"
+
+    def load_cache(self) -> Dict[str, float]:
+        """
+        Read cached benchmark results of current variants.
+        """
+        try:
+            cached = json.loads(self.cache_file.read_text())
+        except (OSError, ValueError):
+            cached = {}
+        return {
+            name: cached[key]
+            for name, v in self.variants.items()
+            if (key := self.cache_key(v)) in cached
+        }
+
+    def save_cache(self) -> None:
+        """
+        Write benchmark results.
+        """
+        try:
+            cached = json.loads(self.cache_file.read_text())
+        except (OSError, ValueError):
+            cached = {}
+        cached.update(
+            {self.cache_key(self.variants[n]): t for n, t in self.latency.items()}
+        )
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            self.cache_file.write_text(json.dumps(cached, indent=2))
+        except OSError as e:
+            logger.warning("Models: can't write cache %s: %s", self.cache_file, e)
+
+    def benchmark(self, variant: ModelVariant) -> float:
+        """
+        Median inference time (sec) of a variant on this CPU.
+        """
+        from ultralytics import YOLO
+
+        model = YOLO(variant.path, task="detect", verbose=False)
+        image = np.zeros((variant.imgsz, variant.imgsz, 3), dtype=np.uint8)
+        model.predict(image, imgsz=variant.imgsz, verbose=False)  # Warm up.
+        times = []
+        for _ in range(self.runs):
+            start = time.perf_counter()
+            model.predict(image, imgsz=variant.imgsz, verbose=False)
+            times.append(time.perf_counter() - start)
+        return float(np.median(times))
+
+    def benchmark_all(self) -> None:
+        """
+        Benchmark variants that were not benchmarked yet on this CPU.
+        """
+        todo = [v for n, v in self.variants.items() if n not in self.latency]
+        for variant in todo:
+            logger.info("Models: benchmarking %s", variant.name)
+            try:
+                self.latency[variant.name] = self.benchmark(variant)
+            except Exception as e:  # A broken export must not stop the detector.
+                logger.warning("Models: can't benchmark %s: %s", variant.name, e)
+        if todo:
+            self.save_cache()
+
+    def choose(self, budget: float) -> ModelVariant | None:
+        """
+        Best variant whose latency is within budget (sec), else the fastest.
+        """
+        timed = [v for n, v in self.variants.items() if n in self.latency]
+        if not timed:
+            return None
+        within = [v for v in timed if self.latency[v.name] <= budget]
+        if within:
+            return max(within, key=lambda v: v.quality)
+        return min(timed, key=lambda v: self.latency[v.name])
+
+    def select(self, name: str) -> ModelVariant:
+        """
+        Make the named variant current. Raise KeyError if unknown.
+        """
+        self.current = self.variants[name]
+        logger.info("Models: selected %s", name)
+        self.write_status()
+        return self.current
+
+    @property
+    def settings(self) -> dict:
+        """
+        Detector class settings for the current variant. Exported variants
+        have a fixed input size, so its imgsz wins over the governor's.
+        """
+        if not self.current:
+            return {}
+        return dict(model=str(self.current.path), imgsz=self.current.imgsz)
+
+    def status(self) -> dict:
+        """
+        Variants, their latency and the current choice.
+        """
+        return {
+            "current": self.current.name if self.current else None,
+            "variants": [
+                dict(
+                    name=v.name,
+                    size=v.size,
+                    imgsz=v.imgsz,
+                    precision=v.precision,
+                    latency=self.latency.get(v.name),
+                )
+                for v in sorted(self.variants.values(), key=lambda v: v.quality)
+            ],
+        }
+
+    def write_status(self) -> None:
+        """
+        Write status as JSON for the web UI.
+        """
+        if self.status_file:
+            try:
+                self.status_file.write_text(json.dumps(self.status()))
+            except OSError as e:
+                logger.debug("Models: can't write status: %s", e)
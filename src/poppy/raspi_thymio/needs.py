@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+"""
+Detectors needed by the running Thymio program.
+"""
+
+import json
+import logging
+import threading
+from importlib.resources import files
+
+logger = logging.getLogger(__name__)
+
+
+class ProgramNeeds:
+    """
+    Detectors, classes and rates the running Thymio program needs, from the
+    "camera" entry of its JSON sidecar, for example
+    {"camera": {"things": {"classes": ["Stop", "Zebra"], "rate": 1}}}.
+    An empty entry turns the camera off; without one, every detector runs
+    at full rate.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.program = None
+        self.camera = None
+
+    @staticmethod
+    def load(program: str) -> dict | None:
+        """
+        Camera entry of the sidecar of program, None if there is none.
+        """
+        sidecar = files("poppy.raspi_thymio.aesl").joinpath(
+            program.removesuffix(".aesl") + ".json"
+        )
+        try:
+            camera = json.loads(sidecar.read_text(encoding="utf-8")).get("camera")
+        except (FileNotFoundError, ValueError) as e:
+            logger.debug("Needs: no sidecar for %s: %s", program, e)
+            return None
+        if camera is not None and not isinstance(camera, dict):
+            logger.warning("Needs: ignoring invalid camera entry of %s", program)
+            return None
+        return camera
+
+    def select(self, program: str) -> None:
+        """
+        Use the needs of program.
+        """
+        camera = self.load(program)
+        with self.lock:
+            self.program, self.camera = program, camera
+        logger.info("Needs: %s uses %s", program, "all detectors" if camera is None else camera)
+
+    @property
+    def camera_on(self) -> bool:
+        """
+        Whether the program needs the camera at all.
+        """
+        return self.camera is None or bool(self.camera)
+
+    def wants(self, name: str) -> bool:
+        """
+        Whether the program needs detector name.
+        """
+        return self.camera is None or name in self.camera
+
+    @staticmethod
+    def due(tick: int, freq_hz: float, rate: float | None) -> bool:
+        """
+        Whether something at rate (Hz, always if None) runs on this tick of
+        a loop at freq_hz.
+        """
+        return not rate or tick % max(1, round(freq_hz / rate)) == 0
+
+    def runs(self, name: str, tick: int, freq_hz: float, rate: float | None = None) -> bool:
+        """
+        Whether detector name, of default rate, runs on this tick of a loop
+        at freq_hz.
+        """
+        if (camera := self.camera) is not None and name not in camera:
+            return False
+        return self.due(tick, freq_hz, (camera or {}).get(name, {}).get("rate", rate))
+
+    def settings(self, name: str) -> dict:
+        """
+        Detector class settings of detector name.
+        """
+        return dict(classes=(self.camera or {}).get(name, {}).get("classes"))
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+"""
+Registry of detector plugins.
+"""
+
+import logging
+from importlib import import_module
+from importlib.metadata import entry_points
+from typing import Dict, List, Type
+
+from .detectable import DetectableList
+from .events import LAYOUTS
+
+logger = logging.getLogger(__name__)
+
+# Entry point group of detector plugins: name = "module:DetectableListClass".
+GROUP = "poppy.raspi_thymio.detectors"
+
+# Built-in detectors, also when the package is not installed.
+BUILTIN = {
+    "things": "poppy.raspi_thymio.thing:ThingList",
+    "lanes": "poppy.raspi_thymio.lane:LaneList",
+    "markers": "poppy.raspi_thymio.marker:MarkerList",
+}
+
+
+class DetectorRegistry:
+    """
+    Detector plugins by name, from the built-in table and the entry points
+    of GROUP. A plugin is a DetectableList class; its module is imported
+    only when the detector is first used. It declares, as class attributes,
+    its cost class, the frame views it reads, its Thymio event and layout,
+    and its default rate.
+    """
+
+    def __init__(self, group: str = GROUP):
+        self.targets: Dict[str, str] = dict(BUILTIN)
+        for entry in entry_points(group=group):
+            self.targets[entry.name] = entry.value
+        self.loaded: Dict[str, Type[DetectableList]] = {}
+
+    def names(self) -> List[str]:
+        """
+        Names of all known detectors, without importing them.
+        """
+        return list(self.targets)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.targets
+
+    def load(self, name: str) -> Type[DetectableList]:
+        """
+        Import detector name, once. Raise KeyError if it is unknown.
+        """
+        if (cls := self.loaded.get(name)) is None:
+            module, _, attr = self.targets[name].partition(":")
+            cls = self.loaded[name] = getattr(import_module(module), attr)
+            logger.info(
+                "Detector %s: %s, cost %s, views %s, event %s",
+                name,
+                cls.__name__,
+                cls.cost,
+                ",".join(cls.views),
+                cls.event_name,
+            )
+        return cls
+
+    def create(self, name: str) -> DetectableList:
+        """
+        New empty list of detector name.
+        """
+        return self.load(name)()
+
+    def describe(self, name: str) -> dict:
+        """
+        Declared properties of detector name.
+        """
+        cls = self.load(name)
+        return dict(
+            name=name,
+            cost=cls.cost,
+            views=list(cls.views),
+            event=cls.event_name,
+            layout=list(cls.event_layout or LAYOUTS.get(cls.event_name, ())),
+            rate=cls.rate,
+        )
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+
+"""
+Stack sampling profiler of slow control ticks.
+"""
+
+import json
+import logging
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class TickSamples:
+    """
+    Stage marks and stack samples of one running tick.
+    """
+
+    def __init__(self, stream: str = ""):
+        self.stream = stream
+        self.start = time.monotonic()
+        self.marks = [("start", self.start)]
+        self.stacks: Counter = Counter()
+        self.frame = None
+
+    def mark(self, name: str) -> None:
+        """
+        Mark the start of stage name.
+        """
+        self.marks.append((name, time.monotonic()))
+
+    def stages(self) -> List[tuple]:
+        """
+        Duration (sec) of each stage, named by its start mark.
+        """
+        return [
+            (name, round(end - begin, 4))
+            for (name, begin), (_, end) in zip(self.marks, self.marks[1:])
+        ]
+
+
+class SlowTickProfiler:
+    """
+    Sample the stacks of running ticks every interval, in a daemon thread,
+    and keep the profiles of the last ticks that took longer than budget.
+    Only ticks running for onset × budget already are sampled, and stacks
+    are kept raw, made into text only for the slow ticks.
+    Stages marked in a tick (capture, detect, targets, publish, thymio) give
+    the time spent in each. Profiles are written to a JSON file for the
+    web UI.
+    """
+
+    def __init__(
+        self,
+        budget: float = 1.0,
+        interval: float = 0.005,
+        keep: int = 20,
+        depth: int = 24,
+        onset: float = 0.5,
+        status_file: Path | None = None,
+    ):
+        self.budget = budget
+        self.interval = interval
+        self.depth = depth
+        self.onset = onset * budget
+        self.status_file = status_file
+        self.lock = threading.Lock()
+        self.running: Dict[int, TickSamples] = {}
+        self.slow: deque = deque(maxlen=keep)
+        self.ticks = 0
+
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.sample, name="Profiler", daemon=True)
+        self.thread.start()
+        logger.info("Profiler: keep ticks over %g sec, sampled every %g sec", budget, interval)
+
+    def walk(self, frame) -> tuple:
+        """
+        Stack of frame as (file, function, line) entries, innermost first.
+        """
+        entries = []
+        while frame is not None and len(entries) < self.depth:
+            entries.append((frame.f_code.co_filename, frame.f_code.co_name, frame.f_lineno))
+            frame = frame.f_back
+        return tuple(entries)
+
+    @staticmethod
+    def fold(stack: tuple) -> str:
+        """
+        Stack of walk as "file:function:line" entries, outermost first.
+        """
+        return ";".join(f"{Path(file).name}:{name}:{line}" for file, name, line in stack[::-1])
+
+    def sample(self) -> None:
+        """
+        Sample the stacks of ticks running for onset, until closed.
+        """
+        while not self.stop_event.wait(self.interval):
+            if not self.running:
+                continue
+            since = time.monotonic() - self.onset
+            with self.lock:
+                due = [(i, s) for i, s in self.running.items() if s.start <= since]
+            if not due:
+                continue
+            frames = sys._current_frames()
+            with self.lock:
+                for ident, samples in due:
+                    # Not if the tick ended meanwhile, done reads its stacks.
+                    if self.running.get(ident) is not samples:
+                        continue
+                    if (frame := frames.get(ident)) is not None:
+                        samples.stacks[self.walk(frame)] += 1
+
+    def close(self) -> None:
+        """
+        Stop sampling, and wait for the sampler thread.
+        """
+        self.stop_event.set()
+        self.thread.join()
+
+    @contextmanager
+    def tick(self, stream: str = ""):
+        """
+        Profile the enclosed tick, in the current thread.
+        """
+        ident = threading.get_ident()
+        samples = TickSamples(stream)
+        with self.lock:
+            self.running[ident] = samples
+        try:
+            yield samples
+        finally:
+            with self.lock:
+                del self.running[ident]
+            self.done(samples)
+
+    def done(self, samples: TickSamples) -> None:
+        """
+        Keep the profile of a finished tick if it was slow.
+        """
+        end = time.monotonic()
+        self.ticks += 1
+        if (latency := end - samples.start) <= self.budget:
+            return
+        samples.marks.append(("end", end))
+        total = sum(samples.stacks.values())
+        stacks: Counter = Counter()
+        for stack, count in samples.stacks.items():
+            stacks[self.fold(stack)] += count
+        profile = {
+            "stream": samples.stream,
+            "frame": samples.frame,
+            "time": time.time(),
+            "latency": round(latency, 4),
+            "stages": samples.stages(),
+            "samples": total,
+            "stacks": stacks.most_common(10),
+        }
+        self.slow.append(profile)
+        logger.warning(
+            "Profiler: slow tick %s frame %s took %.3f sec: %s",
+            samples.stream,
+            samples.frame,
+            latency,
+            profile["stages"],
+        )
+        self.write_status()
+
+    def status(self) -> dict:
+        """
+        Budget and profiles of the last slow ticks, newest first.
+        """
+        return {
+            "budget": self.budget,
+            "ticks": self.ticks,
+            "slow": list(reversed(self.slow)),
+        }
+
+    def write_status(self) -> None:
+        """
+        Write status as JSON for the web UI.
+        """
+        if self.status_file:
+            try:
+                (tmp := self.status_file.with_suffix(".tmp")).write_text(
+                    json.dumps(self.status())
+                )
+                tmp.replace(self.status_file)
+            except OSError as e:
+                logger.debug("Profiler: can't write status: %s", e)
@@ -7,7 +7,6 @@ Remote loop.
 import json
 import logging
 import threading
-import zmq
 from pathlib import Path
 
 from .thymio import Thymio
@@ -20,25 +19,35 @@ logger = logging.getLogger(__name__)
 
 class Remote(threading.Thread):
     """
-    Continuously watch FIFO for JSON remote control events.
+    Continuously watch the bus for JSON remote control events.
     Send button events to Thymio.
     Use program events to change Thymio program.
     """
 
     def __init__(
         self,
-        zmq_socket,
+        subscriber,
         thymio: Thymio,
+        governor=None,
+        models=None,
+        publisher=None,
+        ring=None,
+        needs=None,
     ):
         threading.Thread.__init__(self)
         self.sleep_event = threading.Event()
         self.daemon = True
 
-        self.zmq_socket = zmq_socket
+        self.subscriber = subscriber
 
         self.thymio = thymio
+        self.governor = governor
+        self.models = models
+        self.publisher = publisher
+        self.ring = ring
+        self.needs = needs
 
-        logger.info("Remote loop fires depending on zmq %s", self.zmq_socket)
+        logger.info("Remote loop fires depending on bus %s", self.subscriber.socket)
 
     def run(self):
         """
@@ -46,12 +55,12 @@ class Remote(threading.Thread):
         """
         logger.info("Remote thread run")
         while True:
-            line = self.zmq_socket.recv_string().removeprefix("remote")
-            logger.info("Remote: received %s", line)
+            received = self.subscriber.recv()
+            logger.info("Remote: received %s %s", received.topic, received.payload)
 
             try:
-                message = json.loads(line)
-            except JSONDecodeError(e):
+                message = received.json()
+            except json.JSONDecodeError as e:
                 logger.warn("Remote: Ignoring mangled JSON message: %s", e)
                 continue  # Skip to next message
 
@@ -65,7 +74,26 @@ class Remote(threading.Thread):
                 self.button(rc5)
             elif (program := message.get("program", None)) is not None:
                 logger.info("Remote: program %s", program)
-                self.program(program)
+                status = self.program(program)
+                self.ack(message, program=program, ok=status == "ran", status=status)
+            elif (setpoints := message.get("governor", None)) is not None:
+                logger.info("Remote: governor %s", setpoints)
+                try:
+                    if self.governor:
+                        self.governor.set(**setpoints)
+                except (TypeError, ValueError) as e:
+                    logger.warn("Remote: Ignoring invalid governor setpoints: %s", e)
+            elif (model := message.get("model", None)) is not None:
+                logger.info("Remote: model %s", model)
+                try:
+                    if self.models:
+                        self.models.select(model)
+                except KeyError:
+                    logger.warn("Remote: Ignoring unknown model %s", model)
+            elif message.get("debug", None) == "dump":
+                logger.info("Remote: dump debug ring")
+                path = self.ring.dump() if self.ring else None
+                self.ack(message, path=str(path) if path else None, ok=bool(path))
             else:
                 logger.warn("Remote: Ignoring invalid JSON message: %s", message)
 
@@ -77,14 +105,27 @@ class Remote(threading.Thread):
         self.thymio.events({"command": (e := [button])})
         logger.debug("Send event command [%s]", button)
 
-    def program(self, program: str):
+    def program(self, program: str) -> str:
         """
-        Handle a button event.
+        Handle a program event, return whether the program "ran", is
+        "queued" until the Thymio connects, or "failed".
         """
         logger.info("Program event from remote %s", program)
         aesl = program.removesuffix(".aesl") + ".aesl"
 
         if aesl in self.thymio.list_aesl_programs():
-            self.thymio.start(aesl)
+            status = self.thymio.start(aesl)
+            if self.needs:
+                self.needs.select(aesl)
+            return status
         else:
             logger.warn("Remote: invalid program %s", aesl)
+            return "failed"
+
+    def ack(self, message: dict, **result):
+        """
+        Acknowledge a message that asks for it with an id.
+        """
+        if self.publisher and (id := message.get("id")) is not None:
+            self.publisher.send("ack", dict(id=id, **result))
+            logger.debug("Remote: ack %s %s", id, result)
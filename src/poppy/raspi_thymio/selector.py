@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""
+Target selection with hysteresis.
+"""
+
+import logging
+from enum import IntEnum
+from typing import Dict, Type
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class TargetSelector:
+    """
+    Choose at most one target per kind, in one array pass over the features.
+
+    A feature scores its confidence, plus a bonus for being near (low
+    elevation) and centered (low azimuth), times the priority of its kind.
+    Features at or above the elevation limit are never targets. The current
+    target is kept until a challenger of the same kind beats its score by
+    margin for frames consecutive updates, or until it is lost.
+    """
+
+    def __init__(
+        self,
+        kinds: Type[IntEnum],
+        priority: Dict[str, float] | None = None,
+        margin: float = 0.1,
+        frames: int = 3,
+        near: float = 0.2,
+        center: float = 0.1,
+        max_el: float = 500.0,
+    ):
+        priority = dict(priority or {})
+        unknown = set(priority) - {k.name for k in kinds}
+        if unknown:
+            raise ValueError(f"TargetSelector: unknown kinds {', '.join(sorted(unknown))}")
+        # One priority per kind value.
+        self.priority = np.ones(max(k.value for k in kinds) + 1)
+        for name, weight in priority.items():
+            self.priority[kinds[name].value] = weight
+
+        self.margin = margin
+        self.frames = frames
+        self.near = near
+        self.center = center
+        self.max_el = max_el
+
+        # Consecutive updates a challenger has beaten the target, per kind.
+        self.streak = np.zeros(len(self.priority), dtype=int)
+        # Kind of the best target of the last update.
+        self.chosen: int | None = None
+
+    def scores(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Score of rows (kind, conf, az, el, target); -inf if not eligible.
+        """
+        kinds = rows[:, 0].astype(int)
+        near = np.clip(1.0 - rows[:, 3] / self.max_el, 0.0, 1.0)
+        centered = np.clip(1.0 - np.abs(rows[:, 2]) / 1000.0, 0.0, 1.0)
+        score = (rows[:, 1] + self.near * near + self.center * centered) * self.priority[kinds]
+        return np.where(rows[:, 3] < self.max_el, score, -np.inf)
+
+    def best(self, kinds: np.ndarray, score: np.ndarray) -> tuple:
+        """
+        Best score per kind, and the index of a row having it (-1 if none).
+        """
+        best = np.full(len(self.priority), -np.inf)
+        np.maximum.at(best, kinds, score)
+        index = np.full(len(self.priority), -1)
+        mask = np.isfinite(score) & (score == best[kinds])
+        index[kinds[mask]] = np.nonzero(mask)[0]
+        return best, index
+
+    def select(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Target flags for rows (kind, conf, az, el, target), one per kind.
+        """
+        if not len(rows):
+            self.streak[:] = 0
+            self.chosen = None
+            return np.zeros(0, dtype=bool)
+
+        kinds = rows[:, 0].astype(int)
+        score = self.scores(rows)
+        top, challenger = self.best(kinds, score)
+        held, current = self.best(kinds, np.where(rows[:, 4] > 0, score, -np.inf))
+
+        # Switch when the target is lost, or beaten long enough.
+        beaten = (current >= 0) & (challenger != current) & (top > held + self.margin)
+        self.streak = np.where(beaten, self.streak + 1, 0)
+        switch = (current < 0) | (self.streak >= self.frames)
+        self.streak[switch] = 0
+        chosen = np.where(switch, challenger, current)
+        chosen = chosen[chosen >= 0]
+
+        targets = np.zeros(len(rows), dtype=bool)
+        targets[chosen] = True
+        self.chosen = int(kinds[chosen[np.argmax(score[chosen])]]) if len(chosen) else None
+        logger.debug("Targets: rows %s streak %s", chosen, self.streak)
+        return targets
@@ -6,39 +6,26 @@ Things that can be detected.
 
 import logging
 import os
-from enum import IntEnum
+import threading
 from pathlib import Path
 from typing import List, Tuple
 
+import cv2
 import numpy as np
+import torch
 from ultralytics import YOLO
 
+from .blob import BlobTracker
+from .boxfilter import BoxFilter
 from .detectable import Detectable, DetectableList
+from .events import EventEncoder
 from .frame import Frame
+from .kinds import ThingKind
 from .self_type import Self
 
 logger = logging.getLogger(__name__)
 
 
-class ThingKind(IntEnum):
-    Parking = 0   # V3 native 0
-    Zebra = 1     # V3 native 14
-    Stop = 2      # V3 native 12
-    Balle = 3     # V3 native 1
-    Cube = 4      # V3 native 3
-    Cylindre = 5  # V3 native 4
-    Hexagone = 6  # V3 native 5
-    Maison = 7    # V3 native 6
-    Etoile = 8    # V3 native 11
-    Triangle = 9  # V3 native 13
-    Cible = 10    # V3 native 2
-    Nid = 11      # V3 native 10
-    Gauche = 12   # V3 native 7
-    Droite = 13   # V3 native 8
-    Voie = 14     # V3 native 9
-    Other = 15
-
-
 class Thing(Detectable):
     """
     A thing that has been detected somewhere.
@@ -65,12 +52,12 @@ class Thing(Detectable):
         """Thing text label."""
         return f"{self.kind.name} {self.confidence:3.2f} {self.azel}"
 
-    def event(self) -> List[List[int]]:
+    def event(self) -> List[int]:
         """
         Format single thing as Thymio event.
         """
-        f = self.format()
-        return [f.get(i, 0) for i in ["conf", "color", "az", "el"]]
+        with ThingList.encoder.lock:
+            return ThingList.encoder.vectors("camera.thing", ThingList([self]))[0].tolist()
 
     def __str__(self) -> str:
         # return self.label
@@ -82,9 +69,18 @@ class ThingList(DetectableList[Thing]):
     List of detected things.
     """
 
+    feature = Thing
+    kinds = ThingKind
+    name = "things"
+    event_name = "camera.thing"
+    cost = "high"
+    views = ("color", "gray")
+
     # YOLO parameters are class attributes.
     minconfidence = 0.5
     maxdetect = 15
+    classes = None  # Kind names to detect, all if None.
+    imgsz = None  # Frame size unless set, e.g. by the governor.
     yolo_version = os.environ.get("UCIA_YOLO_VERSION", "v8n")
     yolo_epochs = os.environ.get("UCIA_YOLO_EPOCHS", 300)
     yolo_batch = os.environ.get("UCIA_YOLO_BATCH", 30)
@@ -95,11 +91,60 @@ class ThingList(DetectableList[Thing]):
         / f"batch-{int(yolo_batch):02d}_epo-{int(yolo_epochs):03d}"
         / "weights/best_ncnn_model"
     )
-    logger.info("Loading YOLO model %s", yolo_weights)
-    yolo = YOLO(yolo_weights, task="detect", verbose=False)
-    logger.info("Loaded YOLO model")
+    if yolo_weights.exists():
+        logger.info("Loading YOLO model %s", yolo_weights)
+        yolo = YOLO(yolo_weights, task="detect", verbose=False)
+        logger.info("Loaded YOLO model")
+    else:
+        logger.warning("No YOLO model %s, waiting for a model variant", yolo_weights)
+        yolo = None
+    # One model instance is shared by all video streams.
+    yolo_lock = threading.Lock()
 
     kind_remap = [0, 3, 10, 4, 5, 6, 7, 12, 13, 14, 11, 8, 2, 9, 1]
+    box_filter = BoxFilter.load(ThingKind, kind_remap, os.environ.get("UCIA_BOX_FILTER"))
+
+    # Reusable input tensors, by image size.
+    inputs = {}
+    # Event encoder of event(), its buffers shared by all lists.
+    encoder = EventEncoder()
+
+    # Track balls and targets by color between YOLO runs, YOLO confirming
+    # them at its own rate.
+    blob_tracking = False
+    blob_kinds = ("Balle", "Cible")
+    blob_tracker = BlobTracker()
+
+    @classmethod
+    def use_model(cls, weights: Path) -> None:
+        """
+        Switch to another YOLO model, without stopping detection.
+        """
+        weights = Path(weights)
+        if weights == cls.yolo_weights and cls.yolo:
+            return
+        logger.info("Loading YOLO model %s", weights)
+        yolo = YOLO(weights, task="detect", verbose=False)
+        with cls.yolo_lock:
+            cls.yolo, cls.yolo_weights = yolo, weights
+        logger.info("Loaded YOLO model")
+
+    @classmethod
+    def configure(cls, model: Path | None = None, **settings) -> None:
+        """
+        Apply settings, and switch model if another one is given.
+        """
+        super().configure(**settings)
+        if model:
+            cls.use_model(model)
+
+    @classmethod
+    def model_classes(cls) -> List[int]:
+        """
+        Model classes of the kinds to detect.
+        """
+        kinds = [ThingKind[name] for name in cls.classes] if cls.classes else list(ThingKind)
+        return [i for i, kind in enumerate(cls.kind_remap) if kind in kinds]
 
     @classmethod
     def detect(cls, frame: Frame) -> Self:
@@ -110,71 +155,96 @@ class ThingList(DetectableList[Thing]):
             return cls([])
 
         # YOLO detection
-        results = cls.yolo.predict(
-            frame.gray,
-            imgsz=frame.frame_size[0],
-            classes=[e.value for e in ThingKind],
-            conf=cls.minconfidence,
-            max_det=cls.maxdetect,
-            verbose=False,
+        imgsz = cls.imgsz or frame.frame_size[0]
+        with cls.yolo_lock:
+            results = cls.yolo.predict(
+                cls.preprocess(frame, imgsz),
+                imgsz=imgsz,
+                classes=cls.model_classes(),
+                conf=cls.minconfidence,
+                max_det=cls.maxdetect,
+                verbose=False,
+            )
+        data = results[0].boxes.data.cpu().numpy()
+        logger.debug("Thing Detect: detect %d boxes", len(data))
+
+        # Return list of things, colored in one batch.
+        things = cls.postprocess(
+            data, scale=frame.frame_size[0] / imgsz, height=frame.frame_size[1]
+        )
+        things.colorize(frame)
+        logger.debug("Thing Detect: found %s", things)
+        return things
+
+    @classmethod
+    def preprocess(cls, frame: Frame, imgsz: int) -> torch.Tensor:
+        """
+        Write the grayscale frame into a reusable 1×3×imgsz×imgsz input
+        tensor, scaled to [0, 1], as YOLO expects.
+        """
+        if (buffers := cls.inputs.get(imgsz)) is None:
+            tensor = torch.zeros((1, 3, imgsz, imgsz), dtype=torch.float32)
+            resized = np.zeros((imgsz, imgsz), dtype=np.uint8)
+            buffers = cls.inputs[imgsz] = (tensor, tensor.numpy(), resized)
+        tensor, array, resized = buffers
+
+        gray = np.asarray(frame.gray)
+        if gray.shape != resized.shape:
+            gray = cv2.resize(gray, (imgsz, imgsz), dst=resized, interpolation=cv2.INTER_AREA)
+        np.multiply(gray, 1.0 / 255.0, out=array[0], casting="unsafe")
+        return tensor
+
+    @classmethod
+    def postprocess(cls, data: np.ndarray, scale: float = 1.0, height: int = 640) -> Self:
+        """
+        Interpret YOLO results (rows x1, y1, x2, y2, conf, class) as Things,
+        ignoring boxes rejected by the box filter.
+        """
+        coords = (data[:, :4] * scale).astype(int)
+        keep, kinds = cls.box_filter(coords, data[:, 5], height)
+        return cls(
+            Thing(xyxy=xyxy, kind=ThingKind(kind), confidence=float(confidence))
+            for xyxy, kind, confidence in zip(
+                coords[keep][:, [0, 3, 2, 1]], kinds, data[keep, 4]
+            )
         )
-        boxes = results[0].boxes
-        logger.debug("Thing Detect: detect %d boxes", len(boxes))
-
-        # Interpret YOLO results as Things.
-        def find_features(frame, boxes):
-            """Interpret YOLO results as Things."""
-
-            for class_id, confidence, xyxy in zip(
-                (ThingKind(int(i)) for i in boxes.cls), boxes.conf, boxes.xyxy
-            ):
-                # label = f"{class_id.name} {confidence:3.2f}"
-                # Bounding box and center
-                x1, y1, x2, y2 = (coords := xyxy.numpy().astype(int))
-                if (
-                    (slope := abs(np.arctan2(y2 - y1, x2 - x1)) - 0.785) > 0.15
-                    or abs(x2 - x1) < 20
-                    or abs(y2 - y1) < 20
-                ):
-                    logger.debug(
-                        "Ignoring misshaped (%g > 0.15) %s %g %d,%d %d,%d",
-                        slope,
-                        class_id.name,
-                        confidence,
-                        *coords,
-                    )
-                    continue
-
-                thing = Thing(
-                    xyxy=np.array((x1, y2, x2, y1)),
-                    kind=ThingKind(cls.kind_remap[class_id]),
-                    confidence=confidence,
-                )
-                thing.color = frame.center_color(thing.center)
-
-                # Yield thing.
-                logger.debug("Yielding %s", str(thing))
-                yield thing
-
-        # Return list of things.
-        return cls(find_features(frame, boxes))
-
-    def event(self) -> List[List[int]]:
+
+    def follow(self: Self, frame: Frame) -> None:
+        """
+        Move balls and targets to the blob of their confirmed color; drop
+        them when it is lost for their TTL.
+        """
+        if not self.blob_tracking:
+            return
+        kinds = {ThingKind[name] for name in self.blob_kinds}
+        if not any(thing.kind in kinds for thing in self):
+            return
+        scale = frame.blob_width / frame.frame_size[0]
+        for i, thing in reversed(list(enumerate(self))):
+            if thing.kind not in kinds:
+                continue
+            box = self.blob_tracker.find(frame.hsv, thing.hue, thing.xyxy, scale)
+            if box is None:
+                thing.ttl -= 1
+                if thing.ttl < 1:
+                    del self[i]
+                continue
+            self[i] = Thing(
+                xyxy=box[[0, 3, 2, 1]].astype(int),  # Same order as postprocess.
+                kind=thing.kind,
+                color=thing.color,
+                confidence=thing.confidence,
+                target=thing.target,
+                ttl=thing.ttl,
+            )
+        logger.debug("Thing Track: %s", self)
+
+    def event(self) -> List[int]:
         """
         Format things as Thymio event.
         """
-        best = {
-            k: obj.event()
-            for k in ThingKind
-            for obj in self
-            if obj.kind == k and obj.target
-        }
-        return [
-            i
-            for k in ThingKind
-            for i in best.get(k, [0, 0, 0, 0])
-            if k < ThingKind.Other
-        ]
+        with self.encoder.lock:
+            return self.encoder.targets(self).tolist()
 
     def __str__(self) -> str:
         return f"ThingList<{hex(id(self))}({', '.join(str(t) for t in self)})>"
@@ -5,98 +5,225 @@ Communication with a Thymio robot.
 """
 
 import logging
+import threading
+import time
 from importlib.resources import as_file, files
+from typing import Tuple
 
 from tdmclient import ClientAsync, aw
 
+from .debug import Lazy
+from .events import EVENTS
+
 logger = logging.getLogger(__name__)
 
 
 class Thymio:
     """
-    Manage a connection to a Thymio.
+    Manage a connection to a Thymio, made and remade in a background thread.
+
+    While disconnected, events and variables are dropped, or with policy
+    "latest" the last value of each is kept and sent after reconnecting.
+    After a reconnection, events are registered again, watches restored,
+    and the last started program runs again.
     """
 
-    def __init__(self, start: bool = True):
+    # Reconnection delays (sec): first, and maximum after doubling.
+    backoff = (1.0, 30.0)
+
+    def __init__(self, start: bool = True, events=EVENTS, policy: str = "drop"):
+        if policy not in ("drop", "latest"):
+            raise ValueError(f"Thymio: unknown policy {policy}")
         self.client = None
         self.node = None
+        self.registered = tuple(events)
+        self.policy = policy
+        self.program = None
+        self.watching = False
+        self.listeners = []
+        # Values kept while disconnected, by kind ("events", "variables").
+        self.pending = {"events": {}, "variables": {}}
+        # Serialize requests from the remote and control threads.
+        self.lock = threading.RLock()
+        self.lost = threading.Event()
+        self.connected = threading.Event()
         if start:
-            self.get_node()
-            self.start()
+            self.thread = threading.Thread(target=self.connect, name="Thymio", daemon=True)
+            self.thread.start()
+
+    def connect(self) -> None:
+        """
+        Connect, and reconnect with backoff whenever the link is lost.
+        """
+        delay = self.backoff[0]
+        while True:
+            try:
+                self.get_node()
+                self.setup()
+                delay = self.backoff[0]
+                self.lost.wait()
+            except Exception as e:
+                logger.warning("Thymio: no link, retry in %g sec: %s", delay, e)
+                time.sleep(delay)
+                delay = min(2 * delay, self.backoff[1])
+            self.disconnect()
 
     def get_node(self) -> None:
         """
-        Start communication with a Thymio.
+        Start communication with a Thymio, wait for one.
         """
         if not self.client:
             self.client = ClientAsync()
 
-        self.node = aw(self.client.wait_for_node())
-
-    def start(self, program=None) -> None:
-        """
-        Register events and program with a Thymio.
-        """
-        if self.node:
-            aw(self.node.lock())
-            aw(
-                self.node.register_events(
-                    [
-                        ("camera.detect", 5),
-                        ("camera.thing", 60),
-                        ("camera.lane", 3),
-                        ("command", 1),
-                        ("A_sound_system", 1),
-                        ("M_motor_left", 1),
-                        ("M_motor_right", 1),
-                        ("Q_add_motion", 4),
-                        ("Q_cancel_motion", 1),
-                        ("Q_reset", 0),
-                    ]
-                )
-            )
-            aw(self.node.set_scratchpad(self.aseba_program(program)))
-            if (r := aw(self.node.compile(self.aseba_program(program)))) is None:
-                self.run()
-            else:
-                logger.warning("CAN'T RUN AESL: error %d", r)
+        node = aw(self.client.wait_for_node())
+        with self.lock:
+            self.node = node
+            self.lost.clear()
+        logger.info("Thymio: connected to %s", node)
+
+    def setup(self) -> None:
+        """
+        Register events, restore watches and program, flush what was kept.
+        """
+        self.start(self.program)
+        if self.watching:
+            self.watch()
+        with self.lock:
+            for listener in self.listeners:
+                self.node.add_variables_changed_listener(listener)
+            pending, self.pending = self.pending, {"events": {}, "variables": {}}
+        if pending["events"]:
+            self.events(pending["events"])
+        if pending["variables"]:
+            self.variables(pending["variables"])
+        self.connected.set()
+
+    def disconnect(self) -> None:
+        """
+        Forget the node and the client, before connecting again.
+        """
+        self.connected.clear()
+        with self.lock:
+            self.node = None
+            client, self.client = self.client, None
+        try:
+            if client:
+                client.disconnect()
+        except Exception as e:
+            logger.debug("Thymio: disconnect: %s", e)
+
+    def request(
+        self, *calls, kind: str | None = None, values: dict | None = None
+    ) -> list | None:
+        """
+        Run node requests (functions of the node returning a coroutine)
+        with the node locked; return their results, None if they did not
+        run. While disconnected, values of kind are kept by policy. A failed
+        request drops the link.
+        """
+        with self.lock:
+            if not (node := self.node):
+                if kind and self.policy == "latest":
+                    self.pending[kind].update(values or {})
+                return None
+            try:
+                aw(node.lock())
+                return [aw(call(node)) for call in calls]
+            except Exception as e:
+                logger.warning("Thymio: link lost: %s", e)
+                self.node = None
+                if kind and self.policy == "latest":
+                    self.pending[kind].update(values or {})
+        self.lost.set()
+        return None
+
+    def start(self, program=None) -> str:
+        """
+        Register events and program with a Thymio. Return "ran" if it
+        compiled and runs, "queued" if it runs when connected, else
+        "failed".
+        """
+        self.program = program
+        code = self.aseba_program(program)
+        results = self.request(
+            lambda node: node.register_events(list(self.registered)),
+            lambda node: node.set_scratchpad(code),
+            lambda node: node.compile(code),
+        )
+        if results is None:
+            logger.warning("Init_thymio: NO NODE, %s runs when connected", program)
+            return "queued"
+        elif (r := results[-1]) is None:
+            return "ran" if self.run() else "failed"
         else:
-            logger.warning("Init_thymio: NO NODE")
+            logger.warning("CAN'T RUN AESL: error %d", r)
+        return "failed"
 
-    def run(self) -> None:
+    def run(self) -> bool:
         """
-        Run program on a Thymio.
+        Run program on a Thymio, return whether it runs.
         """
-        if self.node:
-            aw(self.node.lock())
-            aw(self.node.run())
-            logger.info("RUNNING AESL")
+        if self.request(lambda node: node.run()) is None:
+            return False
+        logger.info("RUNNING AESL")
+        return True
 
     def events(self, events: dict) -> None:
         """
         Send event to Thymio.
         """
-        logger.debug("Thymio send event %s", str(events))
-        if self.node:
-            aw(self.node.lock())
-            aw(self.node.send_events(events))
+        logger.debug("Thymio send event %s", events)
+        self.request(lambda node: node.send_events(events), kind="events", values=events)
 
     def variables(self, assignments: dict) -> None:
         """
         Assign variables on Thymio.
         """
-        for var, values in assignments.items():
-            logger.debug("Thymio set variable %s", str(var))
+        logger.debug("Thymio set variables %s", Lazy(lambda: list(assignments)))
+        self.request(
+            lambda node: node.set_variables(assignments),
+            kind="variables",
+            values=assignments,
+        )
+
+    def watch(self) -> None:
+        """
+        Receive variable updates from a Thymio, now and after reconnecting.
+        """
+        self.watching = True
+        self.request(lambda node: node.watch(variables=True))
+
+    def on_variables(self, callback) -> None:
+        """
+        Call callback(variables) when watched variables change.
+        """
+
+        def listener(node, variables):
+            callback(variables)
+
+        with self.lock:
+            self.listeners.append(listener)
             if self.node:
-                aw(self.node.lock())
-                aw(self.node.set_variables(assignments))
+                self.node.add_variables_changed_listener(listener)
+
+    def motors(self) -> Tuple[int, int] | None:
+        """
+        Commanded motor speeds (left, right), if variables are watched.
+        """
+        try:
+            return (
+                self.node.var["motor.left.target"][0],
+                self.node.var["motor.right.target"][0],
+            )
+        except (AttributeError, KeyError, IndexError, TypeError):
+            return None
 
     def update(self, vars=["state", "speed", "tracking_kind"]) -> None:
         """
         Read state variables on Thymio.
         """
         logger.debug("Waiting for variables")
-        aw(self.node.wait_for_variables(set(vars)))
+        self.request(lambda node: node.wait_for_variables(set(vars)))
         logger.debug("Received variables")
 
     def aseba_program(self, program=None) -> str:
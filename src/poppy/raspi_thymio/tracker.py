@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+"""
+Lane tracking between frames.
+"""
+
+import logging
+from typing import List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class LaneFilter:
+    """
+    Kalman filter of one lane. State: column of the lane midpoint (px),
+    slope, and their rates of change (per sec). Measurements: column, slope.
+    """
+
+    # Measurement matrix.
+    H = np.array([[1.0, 0.0, 0.0, 0.0], [0.0, 0.0, 1.0, 0.0]])
+    # Measurement noise: column (px²), slope.
+    R = np.diag([15.0**2, 0.05**2])
+    # Process noise spectral density: column rate (px²/s³), slope rate.
+    q = np.array([400.0**2, 0.5**2])
+
+    def __init__(self, row: np.ndarray, t: float):
+        """
+        Start from a lane row (mx, my, x1, y1, x2, y2, slope), at time t (sec).
+        """
+        self.state = np.array([row[0], 0.0, row[6], 0.0])
+        self.cov = np.diag([self.R[0, 0], 200.0**2, self.R[1, 1], 1.0])
+        self.shape = np.asarray(row[1:6], dtype=float) - (0, row[0], 0, row[0], 0)
+        self.t = t
+        self.misses = 0
+
+    def predict(self, t: float, shift: float = 0.0) -> None:
+        """
+        Predict state at time t (sec), the lane moving shift px/sec sideways
+        because the robot turns.
+        """
+        dt = max(t - self.t, 0.0)
+        F = np.array(
+            [
+                [1.0, dt, 0.0, 0.0],
+                [0.0, 1.0, 0.0, 0.0],
+                [0.0, 0.0, 1.0, dt],
+                [0.0, 0.0, 0.0, 1.0],
+            ]
+        )
+        # Piecewise white acceleration noise, column and slope blocks.
+        Q = np.zeros((4, 4))
+        for k, q in zip((0, 2), self.q):
+            Q[k : k + 2, k : k + 2] = q * np.array(
+                [[dt**3 / 3, dt**2 / 2], [dt**2 / 2, dt]]
+            )
+        self.state = F @ self.state + np.array([shift * dt, 0.0, 0.0, 0.0])
+        self.cov = F @ self.cov @ F.T + Q
+        self.t = t
+
+    def distance(self, row: np.ndarray) -> float:
+        """
+        Mahalanobis distance of a measured lane row from the prediction.
+        """
+        innovation = np.array([row[0], row[6]]) - self.H @ self.state
+        S = self.H @ self.cov @ self.H.T + self.R
+        return float(np.sqrt(innovation @ np.linalg.solve(S, innovation)))
+
+    def update(self, row: np.ndarray) -> None:
+        """
+        Correct the prediction with a measured lane row.
+        """
+        innovation = np.array([row[0], row[6]]) - self.H @ self.state
+        S = self.H @ self.cov @ self.H.T + self.R
+        K = self.cov @ self.H.T @ np.linalg.inv(S)
+        self.state = self.state + K @ innovation
+        self.cov = (np.eye(4) - K @ self.H) @ self.cov
+        self.shape = np.asarray(row[1:6], dtype=float) - (0, row[0], 0, row[0], 0)
+        self.misses = 0
+
+    @property
+    def row(self) -> Tuple:
+        """
+        Estimated lane row (mx, my, x1, y1, x2, y2, slope).
+        """
+        x, _, slope, _ = self.state
+        my, x1, y1, x2, y2 = self.shape + (0, x, 0, x, 0)
+        return (x, my, x1, y1, x2, y2, slope)
+
+
+class LaneTracker:
+    """
+    Track lanes across frames: predict each lane, associate it with the
+    nearest measured lane, and predict the band of columns where lanes
+    should be found in the next frame.
+    """
+
+    # Association gate (Mahalanobis distance), frames a lane survives unseen.
+    gate = 4.0
+    max_misses = 3
+    # Half-width (px) of the predicted band searched for lane borders.
+    band_width = 120
+    # Sideways image motion (px/sec) per unit of motor speed difference.
+    turn_gain = 1.5
+
+    def __init__(self):
+        self.filters: List[LaneFilter] = []
+
+    def predict(self, t: float, motors: Tuple[int, int] | None = None) -> None:
+        """
+        Predict all lanes at time t (sec). Commanded motor speeds (left,
+        right) move lanes sideways: turning left shifts them right.
+        """
+        shift = self.turn_gain * (motors[1] - motors[0]) if motors else 0.0
+        for f in self.filters:
+            f.predict(t, shift)
+
+    def update(self, rows: np.ndarray, t: float) -> List[Tuple]:
+        """
+        Associate measured lane rows with tracked lanes, greedily by distance,
+        then return the estimated rows of the (at most two) lanes seen last.
+        """
+        pairs = sorted(
+            (f.distance(row), i, j)
+            for i, f in enumerate(self.filters)
+            for j, row in enumerate(rows)
+        )
+        matched, used = set(), set()
+        for d, i, j in pairs:
+            if d > self.gate or i in matched or j in used:
+                continue
+            self.filters[i].update(rows[j])
+            matched.add(i)
+            used.add(j)
+
+        for i, f in enumerate(self.filters):
+            if i not in matched:
+                f.misses += 1
+        self.filters = [f for f in self.filters if f.misses <= self.max_misses]
+        self.filters.extend(LaneFilter(row, t) for j, row in enumerate(rows) if j not in used)
+        logger.debug("Tracker: %d lanes, %d matched", len(self.filters), len(matched))
+
+        return [f.row for f in sorted(self.filters, key=lambda f: f.misses)[:2]]
+
+    def band(self, width: int, scale: float) -> np.ndarray | None:
+        """
+        Column mask (width wide, in image px scaled by scale) of the
+        predicted lanes, or None to search the whole image.
+        """
+        if not self.filters:
+            return None
+        mask = np.zeros(width, dtype=bool)
+        for f in self.filters:
+            lo = int(max((f.state[0] - self.band_width) * scale, 0))
+            hi = int(min((f.state[0] + self.band_width) * scale + 1, width))
+            mask[lo:hi] = True
+        return mask
@@ -3,29 +3,48 @@
 #   2024/12/16 - v1.1
 ######################################
 
+import asyncio
 import json
 import logging
 import os
 import signal
-import subprocess
-import zmq
 from importlib.resources import as_file, files
 from itertools import cycle
 from pathlib import Path
-from time import sleep
 
 import click
-from flask import Flask, Response, render_template
-from flask.cli import FlaskGroup
+import zmq
+import zmq.asyncio
+from quart import Quart, render_template, websocket
+from quart.cli import QuartGroup
 
 from poppy.raspi_thymio import __version__ as poppy_version
+
+from ..bus import DETECTION_CLIENT, REMOTE_CLIENT, Publisher, Subscriber, attach
 from .aesl import AeslData
+from .broadcast import Broadcaster
+from .jobs import Job, JobRunner
 
 REMOTE_FIFO = Path("/run/ucia/remote.fifo")
 CUR_FRAME = Path("/run/ucia/frame.jpeg")
+GOVERNOR = Path("/run/ucia/governor.json")
+MODELS = Path("/run/ucia/models.json")
+DEBUG_RING = Path("/run/ucia/debug-ring.json")
+SLOW_TICKS = Path("/run/ucia/slow-ticks.json")
+LATENCY = Path("/run/ucia/latency.json")
+
+app = Quart(__name__)
+publisher = None
+detection_address = DETECTION_CLIENT
 
-app = Flask(__name__)
-zmq_socket = None
+# Shared by all clients: one reader each for the frames and the bus.
+video = Broadcaster("video", maxsize=1)
+events = Broadcaster("events", maxsize=8)
+
+# Admin actions run in the background, their updates go to the clients.
+jobs = JobRunner(notify=events.publish)
+# Acknowledgements expected from the detector, by job id.
+acks: dict[int, asyncio.Future] = {}
 
 RC5 = dict(
     ((j := i.split(":"))[0], int(j[1]))
@@ -36,8 +55,8 @@ RC5 = dict(
 )
 
 
-def generate_frames():
-    """Get frames from /run/ucia to stream to client."""
+async def read_frames():
+    """Read frames from /run/ucia once for all video clients."""
 
     static_resource = files("poppy.raspi_thymio.webui").joinpath("static")
     with as_file(static_resource) as static:
@@ -49,11 +68,11 @@ def generate_frames():
     previous = None
     while True:
         # Sleep
-        sleep(0.200)
+        await asyncio.sleep(0.200)
 
         # Send frame to video stream.
         try:
-            frame = CUR_FRAME.read_bytes()
+            frame = await asyncio.to_thread(CUR_FRAME.read_bytes)
         except FileNotFoundError:
             frame = next(fallback)
 
@@ -62,78 +81,261 @@ def generate_frames():
 
         if frame and frame != previous:
             previous = frame
+            video.publish(frame)
+
+
+async def read_bus():
+    """Read detections and acknowledgements from the bus once for all clients."""
+    context = zmq.asyncio.Context.instance()
+    socket = context.socket(zmq.SUB)
+    socket.setsockopt(zmq.RCVHWM, Subscriber.hwm)
+    socket.setsockopt(zmq.LINGER, 0)
+    socket.setsockopt(zmq.SUBSCRIBE, b"detection")
+    socket.setsockopt(zmq.SUBSCRIBE, b"ack")
+    attach(socket, detection_address, bind=False)
+    try:
+        while True:
+            try:
+                message = Subscriber.decode(await socket.recv_multipart())
+                payload = message.json()
+            except ValueError as e:
+                logging.warning("Webui: ignoring mangled detection: %s", e)
+                continue
+            if message.topic == "ack":
+                future = acks.pop(payload.get("id"), None)
+                if future and not future.done():
+                    future.set_result(payload)
+                continue
+            events.publish(
+                {"topic": message.topic, "header": message.header, "detections": payload}
+            )
+    finally:
+        socket.close()
+
+
+@app.before_serving
+async def start_readers():
+    """Start shared readers."""
+    app.add_background_task(read_frames)
+    app.add_background_task(read_bus)
+
+
+async def generate_frames():
+    """Stream latest frames to one client."""
+    with video.subscribe() as frames:
+        while True:
+            frame = await frames.get()
             yield (b"--frame\r\n" b"Content-Type: image/jpeg\r\n\r\n" + frame + b"\r\n")
 
 
 def write_zmq_event(event: dict):
     """Write event to ZMQ."""
-    global zmq_socket
     output = json.dumps(event)
-    zmq_socket.send_string(f"remote {output}")
-    logging.debug("Webui: wrote zmq (%s) remote %s", zmq_socket, output)
+    publisher.send("remote", output.encode())
+    logging.debug("Webui: published remote %s", output)
+
+
+def command(kind: str, name: str) -> dict:
+    """Send a button or program event, as chosen in the UI."""
+    if kind == "button":
+        rc5 = RC5.get(name, 99)
+        logging.debug(f"Sending button event {name} = {rc5}.")
+        write_zmq_event(response := {"button": rc5})
+    elif kind == "program":
+        logging.debug(f"Sending program event {name}.")
+        write_zmq_event(response := {"program": name})
+    else:
+        response = {"error": f"unknown command {kind}"}
+    return response
 
 
 @app.route("/")
-def dashboard():
-    return render_template("index.html")
+async def dashboard():
+    return await render_template("index.html")
 
 
 @app.route("/video")
-def video_feed():
-    return Response(
-        generate_frames(), mimetype="multipart/x-mixed-replace; boundary=frame"
-    )
+async def video_feed():
+    response = await app.make_response(generate_frames())
+    response.mimetype = "multipart/x-mixed-replace; boundary=frame"
+    response.timeout = None  # Stream for as long as the client stays.
+    return response
 
 
-@app.route("/halt")
-@app.route("/power/shutdown")
-def halt():
-    logging.warning(response := "Shutting down the RPi4.")
-    write_zmq_event(response := {"program": "_poweroff.aesl"})
-    sleep(5)
-    logging.shutdown()
-    subprocess.run(["sudo", "shutdown", "-fh", "now"])
-    return response
+@app.websocket("/ws")
+async def ws():
+    """Push detections to the client, take button and program commands."""
+
+    async def push(queue):
+        while True:
+            await websocket.send_json(await queue.get())
+
+    with events.subscribe() as queue:
+        pusher = asyncio.create_task(push(queue))
+        try:
+            while True:
+                try:
+                    message = json.loads(await websocket.receive())
+                    response = command(message["kind"], str(message["id"]))
+                except (ValueError, KeyError, TypeError) as e:
+                    response = {"error": f"invalid command: {e}"}
+                await websocket.send_json({"response": response})
+        finally:
+            pusher.cancel()
 
 
 @app.route("/button/<string:button>")
-def button(button: str):
+async def button(button: str):
     """Button route sends control event."""
-    rc5 = RC5.get(button, 99)
-    logging.debug(f"Sending button event {button} = {rc5}.")
-    write_zmq_event(response := {"button": rc5})
-    return response
+    return command("button", button)
 
 
 @app.route("/program/<string:aesl>")
-def program(aesl: str):
+async def program(aesl: str):
     """Program route sends control event."""
-    logging.debug(f"Sending program event {aesl}.")
-    write_zmq_event(response := {"program": aesl})
+    return command("program", aesl)
+
+
+@app.route("/governor")
+async def governor():
+    """Governor route returns setpoints and measurements."""
+    try:
+        return json.loads(GOVERNOR.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+@app.route("/governor/<string:key>/<string:value>")
+async def governor_set(key: str, value: str):
+    """Governor route sends a setpoint event."""
+    if key not in ("target_latency", "target_temp", "level"):
+        return {"error": f"unknown setpoint {key}"}, 400
+    logging.debug(f"Sending governor event {key} = {value}.")
+    write_zmq_event(response := {"governor": {key: value}})
     return response
 
 
-@app.route("/power/restart")
-def restart():
-    logging.warning(response := "Restarting ucia-detector.")
-    subprocess.run(["sudo", "systemctl", "restart", "ucia-detector"])
+@app.route("/models")
+async def models():
+    """Models route returns model variants and the current one."""
+    try:
+        return json.loads(MODELS.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+@app.route("/model/<path:name>")
+async def model(name: str):
+    """Model route sends a model switch event."""
+    logging.debug(f"Sending model event {name}.")
+    write_zmq_event(response := {"model": name})
     return response
 
 
-@app.route("/power/stopThymio")
-def stopThymio():
-    logging.warning(response := "Stopping the Thymio.")
-    write_zmq_event(response := {"program": "_poweroff.aesl"})
-    sleep(8)
-    subprocess.run(["sudo", "systemctl", "stop", "ucia-detector"])
+@app.route("/latency")
+async def latency():
+    """Latency route returns stage histograms and the last frame trace."""
+    try:
+        return json.loads(LATENCY.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+@app.route("/slow")
+async def slow():
+    """Slow route returns the profiles of the last slow ticks."""
+    try:
+        return json.loads(SLOW_TICKS.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+@app.route("/debug")
+async def debug():
+    """Debug route returns the last dumped per-tick records."""
+    try:
+        return json.loads(DEBUG_RING.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+@app.route("/debug/dump")
+async def debug_dump():
+    """Debug route asks the detector to dump its per-tick records."""
+    write_zmq_event(response := {"debug": "dump"})
     return response
 
 
+async def switch_program(job: Job, aesl: str) -> None:
+    """Switch the Thymio program, and wait until the detector acknowledges."""
+    acks[job.id] = asyncio.get_running_loop().create_future()
+    try:
+        write_zmq_event({"program": aesl, "id": job.id})
+        ack = await acks[job.id]
+    finally:
+        acks.pop(job.id, None)
+    if not ack.get("ok"):
+        raise RuntimeError(f"detector could not start {aesl}: {ack.get('status', 'failed')}")
+
+
+async def run_command(*args: str) -> str:
+    """Run a system command without blocking the server."""
+    process = await asyncio.create_subprocess_exec(*args)
+    if await process.wait():
+        raise RuntimeError(f"{' '.join(args)} exited with {process.returncode}")
+    return " ".join(args)
+
+
+async def shutdown_job(job: Job) -> str:
+    await switch_program(job, "_poweroff.aesl")
+    logging.warning("Shutting down the RPi4.")
+    return await run_command("sudo", "shutdown", "-fh", "now")
+
+
+async def restart_job(job: Job) -> str:
+    return await run_command("sudo", "systemctl", "restart", "ucia-detector")
+
+
+async def stop_thymio_job(job: Job) -> str:
+    await switch_program(job, "_poweroff.aesl")
+    return await run_command("sudo", "systemctl", "stop", "ucia-detector")
+
+
+async def quit_job(job: Job) -> str:
+    # Leave time for the response, then stop cleanly.
+    asyncio.get_running_loop().call_later(0.5, os.kill, os.getpid(), signal.SIGTERM)
+    return "Web UI stopping"
+
+
+@app.route("/halt")
+@app.route("/power/shutdown")
+async def halt():
+    logging.warning("Shutting down the RPi4.")
+    return jobs.submit("shutdown", shutdown_job, timeout=15.0).status(), 202
+
+
+@app.route("/power/restart")
+async def restart():
+    logging.warning("Restarting ucia-detector.")
+    return jobs.submit("restart", restart_job, timeout=30.0).status(), 202
+
+
+@app.route("/power/stopThymio")
+async def stopThymio():
+    logging.warning("Stopping the Thymio.")
+    return jobs.submit("stopThymio", stop_thymio_job, timeout=20.0).status(), 202
+
+
 @app.route("/quit")
-def quit():
+async def quit():
     logging.warning("Stopping the Web UI.")
-    os.kill(os.getpid(), 9)
-    sys.exit(0)
+    return jobs.submit("quit", quit_job, timeout=1.0).status(), 202
+
+
+@app.route("/jobs")
+async def jobs_status():
+    """Jobs route returns the status of the last admin actions."""
+    return {"jobs": jobs.status()}
 
 
 @app.context_processor
@@ -158,37 +360,50 @@ def inject_software_version():
     return dict(software_version=f"v{poppy_version}")
 
 
-@click.group(cls=FlaskGroup, create_app=lambda: app)
+@click.group(cls=QuartGroup, create_app=lambda: app)
 @click.option("--verbose/--quiet", default=False, help="Verbosity")
+@click.option(
+    "--zmq-address",
+    help="Endpoints to send remote control events to (@ binds, > connects)",
+    default=REMOTE_CLIENT,
+    show_default=True,
+    type=click.STRING,
+)
+@click.option(
+    "--zmq-detections",
+    help="Endpoints to receive detections from (@ binds, > connects)",
+    default=DETECTION_CLIENT,
+    show_default=True,
+    type=click.STRING,
+)
 @click.option(
     "--loglevel",
     help="Logging level",
-    default="DEBUG",
+    default="INFO",
     show_default=True,
     type=click.STRING,
 )
 def main(
-    # zmq_address: Path,
     verbose: bool,
+    zmq_address: str,
+    zmq_detections: str,
     loglevel: str,
 ):
     """
     Run the server for the Web UI.
     """
-    loglevel_int = getattr(logging, loglevel.upper(), logging.DEBUG)
+    loglevel_int = getattr(logging, loglevel.upper(), logging.INFO)
     logging.basicConfig(format="%(asctime)s %(message)s", level=loglevel_int)
     logging.info("Setting loglevel to %s = %s", loglevel, str(loglevel_int))
 
-    # Output zmq.
-    global zmq_socket
-    context = zmq.Context()
-    zmq_socket = context.socket(zmq.PUB)
-    zmq_socket.connect("tcp://localhost:5556")
-    logging.info("Open output zmq %s", zmq_socket)
+    # Output bus.
+    global publisher, detection_address
+    publisher = Publisher(zmq_address, bind=False)
+    detection_address = zmq_detections
 
     # Guard for running the Web UI as a script.
     if __name__ == "__main__":
-        app.run(host="0.0.0.0", port=5000, threaded=True)
+        app.run(host="0.0.0.0", port=5000)
 
 
 if __name__ == "__main__":
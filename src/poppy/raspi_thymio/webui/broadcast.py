@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+"""
+Fan out items to many asyncio clients with bounded memory.
+"""
+
+import asyncio
+import logging
+from contextlib import contextmanager
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class Broadcaster:
+    """
+    Each client gets its own bounded queue. When a slow client's queue is
+    full its oldest item is dropped, so it always catches up to the latest.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1):
+        self.name = name
+        self.maxsize = maxsize
+        self.clients: set[asyncio.Queue] = set()
+        self.latest = None
+        self.dropped = 0
+
+    def publish(self, item) -> None:
+        """
+        Offer item to all clients, never waiting.
+        """
+        self.latest = item
+        for queue in self.clients:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(item)
+
+    @contextmanager
+    def subscribe(self, replay: bool = True) -> Iterator[asyncio.Queue]:
+        """
+        Queue of items for one client, starting with the latest item if replay.
+        """
+        queue = asyncio.Queue(self.maxsize)
+        if replay and self.latest is not None:
+            queue.put_nowait(self.latest)
+        self.clients.add(queue)
+        logger.debug("Broadcast %s: %d clients", self.name, len(self.clients))
+        try:
+            yield queue
+        finally:
+            self.clients.discard(queue)
+            logger.debug("Broadcast %s: %d clients", self.name, len(self.clients))
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""
+Background jobs for admin actions.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """
+    An admin action running in the background.
+    """
+
+    ids = itertools.count(1)
+
+    def __init__(self, name: str, timeout: float):
+        self.id = next(self.ids)
+        self.name = name
+        self.timeout = timeout
+        self.state = "running"
+        self.message = ""
+        self.started = time.time()
+        self.finished = None
+
+    @property
+    def done(self) -> bool:
+        """Whether the job is over."""
+        return self.state != "running"
+
+    def status(self) -> dict:
+        """
+        State, for the web UI.
+        """
+        return dict(
+            id=self.id,
+            name=self.name,
+            state=self.state,
+            message=self.message,
+            started=self.started,
+            finished=self.finished,
+        )
+
+
+class JobRunner:
+    """
+    Run admin actions as asyncio tasks with a timeout, one at a time per
+    action, and keep the status of the last jobs.
+    """
+
+    keep = 20
+
+    def __init__(self, notify: Callable[[dict], None] | None = None):
+        self.jobs: OrderedDict[int, Job] = OrderedDict()
+        self.tasks: set[asyncio.Task] = set()
+        self.notify = notify
+
+    def submit(
+        self, name: str, action: Callable[[Job], Awaitable[str]], timeout: float = 30.0
+    ) -> Job:
+        """
+        Start action(job) in the background, unless the same action is
+        already running; return its job.
+        """
+        for job in self.jobs.values():
+            if job.name == name and not job.done:
+                return job
+
+        job = Job(name, timeout)
+        self.jobs[job.id] = job
+        while len(self.jobs) > self.keep:
+            self.jobs.popitem(last=False)
+
+        task = asyncio.create_task(self.run(job, action))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        self.update(job)
+        return job
+
+    async def run(self, job: Job, action: Callable[[Job], Awaitable[str]]) -> None:
+        """
+        Run action, recording its outcome.
+        """
+        try:
+            job.message = await asyncio.wait_for(action(job), job.timeout)
+            job.state = "done"
+        except asyncio.TimeoutError:
+            job.state, job.message = "timeout", f"no result in {job.timeout:g} sec"
+        except Exception as e:  # Report any failure to the UI.
+            job.state, job.message = "failed", str(e)
+        job.finished = time.time()
+        logger.log(
+            logging.INFO if job.state == "done" else logging.WARNING,
+            "Job %d %s: %s %s",
+            job.id,
+            job.name,
+            job.state,
+            job.message,
+        )
+        self.update(job)
+
+    def update(self, job: Job) -> None:
+        """
+        Notify clients of a job change.
+        """
+        if self.notify:
+            self.notify({"job": job.status()})
+
+    def status(self) -> list:
+        """
+        Status of the last jobs.
+        """
+        return [job.status() for job in self.jobs.values()]
@@ -57,8 +57,12 @@ var doButton = function(buttonId, kind="button", meta={}) {
     }
 
     buttonState(0.4, true);
-    xhttp.open("GET", urlCommand, true);
-    xhttp.send();
+    if (socket && socket.readyState == WebSocket.OPEN && kind != "power") {
+	socket.send(JSON.stringify({kind: kind, id: buttonId}));
+    } else {
+	xhttp.open("GET", urlCommand, true);
+	xhttp.send();
+    }
 
     // Reenable the button after debounce delay 200 ms.
     setTimeout(buttonState, 200);
@@ -86,3 +90,84 @@ var doButton = function(buttonId, kind="button", meta={}) {
 	}
     }
 }
+
+// Show governor setpoints and measurements every 2 s.
+var showGovernor = function() {
+    var xhttp = new XMLHttpRequest();
+    xhttp.onreadystatechange = function() {
+	if (this.readyState == 4 && this.status == 200) {
+	    var g = JSON.parse(this.responseText);
+	    var info = document.getElementById("governor");
+	    if (info && "level" in g) {
+		info.innerText = info.textContent =
+		    "niveau " + g.level + " — " + Math.round(g.latency * 1000) + " ms / "
+		    + Math.round(g.target_latency * 1000) + " ms, "
+		    + (g.temp == null ? "?" : g.temp.toFixed(1)) + " °C / " + g.target_temp + " °C, "
+		    + "image " + g.imgsz;
+	    }
+	}
+    };
+    xhttp.open("GET", window.location.origin + "/governor", true);
+    xhttp.send();
+}
+setInterval(showGovernor, 2000);
+
+// Show the last slow tick every 5 s, its profile is at /slow.
+var showSlow = function() {
+    var xhttp = new XMLHttpRequest();
+    xhttp.onreadystatechange = function() {
+	if (this.readyState == 4 && this.status == 200) {
+	    var s = JSON.parse(this.responseText);
+	    var info = document.getElementById("slow");
+	    if (info && s.slow && s.slow.length) {
+		var last = s.slow[0];
+		info.innerText = info.textContent =
+		    s.slow.length + " ticks lents — dernier : image " + last.frame + ", "
+		    + Math.round(last.latency * 1000) + " ms";
+	    }
+	}
+    };
+    xhttp.open("GET", window.location.origin + "/slow", true);
+    xhttp.send();
+}
+setInterval(showSlow, 5000);
+
+// Live detections, and button commands, over a WebSocket.
+var socket = null;
+var detected = {};
+
+var showDetections = function(message) {
+    detected[message.topic] = message.detections.map(d => d.label || d.name).join(", ");
+    var info = document.getElementById("detections");
+    if (info) {
+	info.innerText = info.textContent = Object.values(detected).filter(d => d).join(" — ");
+    }
+}
+
+// Admin actions run as background jobs on the server.
+var showJob = function(job) {
+    var info = document.getElementById("jobs");
+    if (info) {
+	info.innerText = info.textContent =
+	    job.name + " : " + job.state + (job.message ? " — " + job.message : "");
+    }
+}
+
+var connectSocket = function() {
+    socket = new WebSocket(window.location.origin.replace(/^http/, "ws") + "/ws");
+    socket.onmessage = function(event) {
+	var message = JSON.parse(event.data);
+	if ("response" in message) {
+	    window.console.info(JSON.stringify(message.response));
+	} else if ("detections" in message) {
+	    showDetections(message);
+	} else if ("job" in message) {
+	    showJob(message.job);
+	}
+    };
+    socket.onclose = function() {
+	socket = null;
+	setTimeout(connectSocket, 2000);
+    };
+}
+window.addEventListener("load", connectSocket);
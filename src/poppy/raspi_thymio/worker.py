@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+"""
+Detection worker processes.
+"""
+
+import importlib
+import logging
+import multiprocessing as mp
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .detectable import DetectableList
+from .frame import Frame
+
+logger = logging.getLogger(__name__)
+
+
+class SharedFrame:
+    """
+    Frame image in shared memory, written by the control loop and read by
+    the workers.
+    """
+
+    def __init__(self, frame_size: Tuple[int, int] = (640, 640), name: str | None = None):
+        self.shape = (frame_size[1], frame_size[0], 3)
+        self.shm = shared_memory.SharedMemory(
+            name=name, create=name is None, size=int(np.prod(self.shape))
+        )
+        self.image = np.ndarray(self.shape, dtype=np.uint8, buffer=self.shm.buf)
+        if name:
+            # Only the creator frees the block (needed before Python 3.13).
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+
+    @property
+    def name(self) -> str:
+        """Shared memory block name."""
+        return self.shm.name
+
+    def close(self, unlink: bool = False) -> None:
+        """
+        Detach from shared memory, and free it if unlink.
+        """
+        del self.image
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def serve(conn, shm_name: str, frame_size, out_dir: Path, detectable: str) -> None:
+    """
+    Worker process main loop: detect features in each shared frame and
+    return them in compact array form.
+    """
+    module, _, qualname = detectable.partition(":")
+    objects = getattr(importlib.import_module(module), qualname)()
+    shared = SharedFrame(frame_size, name=shm_name)
+    frame = Frame(out_dir=out_dir, frame_size=frame_size)
+    logger.info("Worker %s: ready", qualname)
+
+    while (request := conn.recv()) is not None:
+        timestamp, sequence, settings = request
+        objects.configure(**settings)
+        frame.load(Image.fromarray(shared.image), timestamp, sequence)
+        try:
+            conn.send((sequence, objects.update(frame).to_array()))
+        except Exception as e:  # Report and keep serving.
+            logger.exception("Worker %s: detection failed", qualname)
+            conn.send((sequence, e))
+
+    shared.close()
+
+
+class DetectionWorker:
+    """
+    Run detection for one kind of detectable list in a separate process.
+    """
+
+    # Spawn, don't fork the threads and camera of the control process.
+    context = mp.get_context("spawn")
+    timeout = 10.0
+
+    def __init__(self, objects: DetectableList, shared: SharedFrame, out_dir: Path):
+        self.objects = objects
+        self.sequence = None
+        cls = type(objects)
+        self.conn, child = self.context.Pipe()
+        self.process = self.context.Process(
+            target=serve,
+            args=(
+                child,
+                shared.name,
+                shared.shape[1::-1],
+                out_dir,
+                f"{cls.__module__}:{cls.__qualname__}",
+            ),
+            name=f"worker-{cls.__name__}",
+            daemon=True,
+        )
+        self.process.start()
+        logger.info("Worker %s: started pid %d", cls.__name__, self.process.pid)
+
+    def submit(self, frame: Frame, settings: dict | None = None) -> None:
+        """
+        Ask worker to detect features in the shared frame.
+        """
+        self.sequence = frame.sequence
+        self.conn.send((frame.timestamp, frame.sequence, settings or {}))
+
+    def result(self) -> DetectableList:
+        """
+        Wait for the features detected in the last submitted frame.
+        Late results of earlier frames are discarded.
+        """
+        cls = type(self.objects)
+        while self.conn.poll(self.timeout):
+            sequence, array = self.conn.recv()
+            if sequence != self.sequence:
+                continue
+            if isinstance(array, Exception):
+                logger.warning("Worker %s: failed: %s", cls.__name__, array)
+                return cls([])
+            return cls.from_array(array)
+
+        logger.warning("Worker %s: no result in %g sec", cls.__name__, self.timeout)
+        return cls([])
+
+    def stop(self) -> None:
+        """
+        Stop worker process.
+        """
+        self.conn.send(None)
+        self.process.join(timeout=self.timeout)
+
+
+class WorkerPool:
+    """
+    One worker process per detectable list, sharing one frame buffer.
+    """
+
+    def __init__(self, detectables: List[DetectableList], frame: Frame):
+        self.lock = threading.Lock()
+        self.shared = SharedFrame(frame.frame_size)
+        self.workers = [
+            DetectionWorker(objects, self.shared, frame.out_dir) for objects in detectables
+        ]
+
+    def refresh(
+        self,
+        frame: Frame,
+        active: List[DetectableList] | None = None,
+        settings: dict | None = None,
+    ) -> None:
+        """
+        Detect features in the workers of the active detectable lists (all
+        by default) concurrently, then merge them.
+        """
+        workers = [
+            w for w in self.workers if active is None or any(w.objects is a for a in active)
+        ]
+        with self.lock:
+            np.copyto(self.shared.image, np.asarray(frame.color.convert("RGB")))
+            for worker in workers:
+                worker.submit(frame, settings)
+            for worker in workers:
+                worker.objects.merge(worker.result())
+
+    def stop(self) -> None:
+        """
+        Stop all workers and free the frame buffer.
+        """
+        for worker in self.workers:
+            worker.stop()
+        self.shared.close(unlink=True)
@@ -0,0 +1,84 @@
+"""Bird's-eye lanes feature tests."""
+
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+from pytest_bdd import given, parsers, scenario, then, when
+
+from poppy.raspi_thymio.birdseye import WindowSearch
+from poppy.raspi_thymio.lanebench import ENGINES, benchmark
+
+
+@scenario("birdseye.feature", "Find lanes in the bird's-eye view")
+def test_find_lanes_in_the_birds_eye_view():
+    """Find lanes in the bird's-eye view."""
+
+
+@scenario("birdseye.feature", "Compare lane engines")
+def test_compare_lane_engines():
+    """Compare lane engines."""
+
+
+@given(
+    parsers.parse("a road with borders at {left:S} and {right:S} px"), target_fixture="gray"
+)
+def _(left, right):
+    """a road with borders at <left> and <right> px."""
+    image = Image.new("L", (640, 640), 200)
+    if left != "None":
+        draw = ImageDraw.Draw(image)
+        # Borders converging toward the top of the default view.
+        for x in (int(left), int(right)):
+            draw.line([(x, 640), (x + (320 - x) * 0.4, 352)], fill=20, width=12)
+    return np.asarray(image)
+
+
+@when(parsers.parse("search lanes in {count:d} frames"), target_fixture="rows")
+def _(gray, count):
+    """search lanes in <count> frames."""
+    search = WindowSearch()
+    for _ in range(count):
+        rows = search.find(gray)
+    return rows
+
+
+@then(parsers.parse("the lanes found are centered at {center:S}"))
+def _(rows, center):
+    """the lanes found are centered at <center>."""
+    if center == "None":
+        assert rows == []
+    else:
+        assert len(rows) == 1
+        assert abs(rows[0][0] - int(center)) < 20
+
+
+@then("the lanes found point straight ahead")
+def _(rows):
+    """the lanes found point straight ahead."""
+    for row in rows:
+        # Centerline from the lookahead row down, slope as in LaneList.
+        assert row[3] < row[5]
+        assert abs(row[6]) < 0.2
+
+
+@given(parsers.parse("the frames {images}"), target_fixture="images")
+def _(images):
+    """the frames <images>."""
+    return [Path("tests") / "data" / image for image in images.split()]
+
+
+@when("benchmark the lane engines", target_fixture="results")
+def _(images):
+    """benchmark the lane engines."""
+    return benchmark(images)
+
+
+@then("each engine has a latency and a detection rate")
+def _(results, images):
+    """each engine has a latency and a detection rate."""
+    assert list(results) == list(ENGINES)
+    for result in results.values():
+        assert result["frames"] == len(images)
+        assert 0 < result["mean_ms"] <= result["max_ms"]
+        assert 0 <= result["found"] <= 1
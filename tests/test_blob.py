@@ -0,0 +1,44 @@
+"""Blob feature tests."""
+
+import numpy as np
+from PIL import Image, ImageDraw
+from pytest_bdd import given, parsers, scenario, then, when
+
+from poppy.raspi_thymio.blob import BlobTracker
+from poppy.raspi_thymio.colors import rgb_to_hue
+from poppy.raspi_thymio.frame import Frame
+
+COLORS = {"orange": (240, 120, 20), "blue": (30, 60, 220)}
+
+
+@scenario("blob.feature", "Find blobs")
+def test_find_blobs():
+    """Find blobs."""
+
+
+@given(parsers.parse("a frame with a {color:w} ball at {x:d},{y:d}"), target_fixture="frame")
+def _(tmpdir, color, x, y):
+    """a frame with a <color> ball at <x>,<y>."""
+    image = Image.new("RGB", (640, 640), (128, 128, 128))
+    ImageDraw.Draw(image).ellipse((x - 30, y - 30, x + 30, y + 30), fill=COLORS[color])
+    frame = Frame(out_dir=tmpdir)
+    frame.load(image)
+    return frame
+
+
+@when(parsers.parse("look for an orange blob near {px:d},{py:d}"), target_fixture="box")
+def _(frame, px, py):
+    """look for an orange blob near <px>,<py>."""
+    hue = float(rgb_to_hue(COLORS["orange"]))
+    box = np.array([px - 30, py + 30, px + 30, py - 30])  # Like Thing.xyxy.
+    return BlobTracker().find(frame.hsv, hue, box, frame.blob_width / frame.frame_size[0])
+
+
+@then(parsers.parse("the blob found is at {found:S}"))
+def _(box, found):
+    """the blob found is at <found>."""
+    if found == "None":
+        assert box is None
+    else:
+        center = (box[:2] + box[2:]) / 2
+        assert np.abs(center - [int(v) for v in found.split(",")]).max() <= 6
@@ -0,0 +1,46 @@
+"""Box filter feature tests."""
+
+import json
+
+import numpy as np
+from pytest_bdd import given, parsers, scenario, then, when
+
+from poppy.raspi_thymio.boxfilter import BoxFilter
+from poppy.raspi_thymio.thing import ThingKind, ThingList
+
+
+@scenario("boxfilter.feature", "Filter boxes")
+def test_filter_boxes():
+    """Filter boxes."""
+
+
+@given(parsers.parse("a box filter with settings {settings}"), target_fixture="box_filter")
+def _(tmp_path, settings):
+    """a box filter with settings <settings>."""
+    (path := tmp_path / "boxfilter.yaml").write_text(settings)
+    return BoxFilter.load(ThingKind, ThingList.kind_remap, path)
+
+
+@when(parsers.parse("filter boxes {boxes:S}"), target_fixture="kept")
+def _(box_filter, boxes):
+    """filter boxes <boxes>."""
+    rows = [
+        (*map(int, coords.split(",")), int(class_id))
+        for class_id, coords in (box.split(":") for box in boxes.split(";"))
+    ]
+    data = np.array(rows)
+    keep, kinds = box_filter(data[:, :4], data[:, 4], height=640)
+    assert keep.sum() == len(kinds)
+    return kinds
+
+
+@then(parsers.parse("kept kinds are {kinds:S}"))
+def _(kept, kinds):
+    """kept kinds are <kinds>."""
+    assert [ThingKind(k).name for k in kept] == kinds.split(",")
+
+
+@then(parsers.parse("dropped counts are {dropped:S}"))
+def _(box_filter, dropped):
+    """dropped counts are <dropped>."""
+    assert list(box_filter.dropped.values()) == json.loads(f"[{dropped}]")
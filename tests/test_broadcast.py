@@ -0,0 +1,71 @@
+"""Broadcast feature tests."""
+
+import asyncio
+
+from pytest_bdd import given, parsers, scenario, then, when
+
+from poppy.raspi_thymio.webui.broadcast import Broadcaster
+
+
+@scenario("broadcast.feature", "Slow client keeps the latest items")
+def test_slow_client_keeps_the_latest_items():
+    """Slow client keeps the latest items."""
+
+
+@scenario("broadcast.feature", "New client starts with the latest item")
+def test_new_client_starts_with_the_latest_item():
+    """New client starts with the latest item."""
+
+
+def drain(queue):
+    """Items waiting in queue."""
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+@given(parsers.parse("a broadcaster with queues of {size:d}"), target_fixture="broadcaster")
+def _(size):
+    """a broadcaster with queues of <size>."""
+    return Broadcaster("test", maxsize=size)
+
+
+@when(
+    parsers.parse("a client subscribes and {count:d} items are published"),
+    target_fixture="received",
+)
+def _(broadcaster, count):
+    """a client subscribes and <count> items are published."""
+
+    async def client():
+        with broadcaster.subscribe() as queue:
+            for i in range(1, count + 1):
+                broadcaster.publish(i)
+            return drain(queue)
+
+    received = asyncio.run(client())
+    assert not broadcaster.clients
+    return received
+
+
+@when(
+    parsers.parse("{count:d} items are published and a client subscribes"),
+    target_fixture="received",
+)
+def _(broadcaster, count):
+    """<count> items are published and a client subscribes."""
+
+    async def client():
+        for i in range(1, count + 1):
+            broadcaster.publish(i)
+        with broadcaster.subscribe() as queue:
+            return drain(queue)
+
+    return asyncio.run(client())
+
+
+@then(parsers.parse("the client gets items {items:S}"))
+def _(received, items):
+    """the client gets items <items>."""
+    assert received == [int(i) for i in items.split(",")]
@@ -0,0 +1,111 @@
+"""Bus feature tests."""
+
+import json
+import time
+
+import pytest
+import zmq
+from pytest_bdd import given, parsers, scenario, then, when
+
+from poppy.raspi_thymio.bus import Publisher, Subscriber
+
+
+@scenario("bus.feature", "Receive messages in order")
+def test_receive_messages_in_order():
+    """Receive messages in order."""
+
+
+@scenario("bus.feature", "Receive only the latest message")
+def test_receive_only_the_latest_message():
+    """Receive only the latest message."""
+
+
+@scenario("bus.feature", "Ignore other topics")
+def test_ignore_other_topics():
+    """Ignore other topics."""
+
+
+@scenario("bus.feature", "Accept single frame messages")
+def test_accept_single_frame_messages():
+    """Accept single frame messages."""
+
+
+@pytest.fixture
+def context():
+    context = zmq.Context()
+    yield context
+    context.term()
+
+
+@given(
+    parsers.re(r"a publisher and a (?P<latest>latest-value )?subscriber to (?P<topic>\w+)"),
+    target_fixture="bus",
+)
+def _(context, latest, topic):
+    """a publisher and a subscriber to <topic>."""
+    publisher = Publisher("@inproc://bus", context=context)
+    subscriber = Subscriber(
+        ">inproc://bus", topics=[topic], context=context, latest=bool(latest)
+    )
+    time.sleep(0.1)  # Let the subscription through.
+    yield publisher, subscriber
+    subscriber.close()
+    publisher.close()
+
+
+@given(parsers.parse("a subscriber to {topic:w}"), target_fixture="bus")
+def _(context, topic):
+    """a subscriber to <topic>."""
+    legacy = context.socket(zmq.PUB)
+    legacy.bind("inproc://bus")
+    subscriber = Subscriber(">inproc://bus", topics=[topic], context=context)
+    time.sleep(0.1)
+    yield legacy, subscriber
+    subscriber.close()
+    legacy.close()
+
+
+@when(parsers.parse("publish {count:d} messages on {topic:w}"))
+def _(bus, count, topic):
+    """publish <count> messages on <topic>."""
+    publisher, _ = bus
+    for i in range(1, count + 1):
+        publisher.send(topic, {"n": i}, frame=i)
+    time.sleep(0.1)
+
+
+@when(parsers.parse("send legacy message {topic:w} {payload}"))
+def _(bus, topic, payload):
+    """send legacy message <topic> <payload>."""
+    legacy, _ = bus
+    legacy.send_string(f"{topic} {payload}")
+    time.sleep(0.1)
+
+
+@then(parsers.parse("receive messages {numbers:S} on {topic:w}"))
+def _(bus, numbers, topic):
+    """receive messages <numbers> on <topic>."""
+    _, subscriber = bus
+    for n in map(int, numbers.split(",")):
+        message = subscriber.recv(timeout=1.0)
+        assert message.topic == topic
+        assert message.json() == {"n": n}
+        assert message.header["frame"] == n
+        assert message.header["seq"] == n
+    assert subscriber.recv(timeout=0.1) is None
+
+
+@then("receive no message")
+def _(bus):
+    """receive no message."""
+    _, subscriber = bus
+    assert subscriber.recv(timeout=0.1) is None
+
+
+@then(parsers.parse("receive payload {payload} on {topic:w}"))
+def _(bus, payload, topic):
+    """receive payload <payload> on <topic>."""
+    _, subscriber = bus
+    message = subscriber.recv(timeout=1.0)
+    assert message.topic == topic
+    assert message.json() == json.loads(payload)
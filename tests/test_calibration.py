@@ -0,0 +1,100 @@
+"""Calibration feature tests."""
+
+import numpy as np
+from pytest_bdd import given, parsers, scenario, then, when
+
+from poppy.raspi_thymio.calibration import AzelMaps, Calibration
+from poppy.raspi_thymio.frame import Frame
+
+
+@scenario("calibration.feature", "Look up uncalibrated maps")
+def test_look_up_uncalibrated_maps():
+    """Look up uncalibrated maps."""
+
+
+@scenario("calibration.feature", "Undistort points")
+def test_undistort_points():
+    """Undistort points."""
+
+
+@scenario("calibration.feature", "Refuse a calibration for another frame size")
+def test_refuse_a_calibration_for_another_frame_size():
+    """Refuse a calibration for another frame size."""
+
+
+@given("linear maps", target_fixture="maps")
+def _():
+    """linear maps."""
+    return AzelMaps.linear((640, 640))
+
+
+@when(parsers.parse("look up the center {x:d},{y:d}"), target_fixture="found")
+def _(maps, x, y):
+    """look up the center <x>,<y>."""
+    return maps.lookup(np.array([[x, y]]))[0]
+
+
+@then(parsers.parse("the azimuth is {az:d} and the elevation is {el:d}"))
+def _(found, az, el):
+    """the azimuth is <az> and the elevation is <el>."""
+    assert found.tolist() == [az, el, -1]
+
+
+@given(parsers.parse("a calibration with distortion {k1:g}"), target_fixture="calibration")
+def _(k1):
+    """a calibration with distortion <k1>."""
+    camera = np.array([[500.0, 0.0, 320.0], [0.0, 500.0, 320.0], [0.0, 0.0, 1.0]])
+    return Calibration((640, 640), camera, np.array([k1, 0.0, 0.0, 0.0, 0.0]))
+
+
+@when(parsers.parse("undistort and distort the point {x:d},{y:d}"), target_fixture="point")
+def _(calibration, x, y):
+    """undistort and distort the point <x>,<y>."""
+    return calibration.distort_points(calibration.undistort_points(np.array([[x, y]])))[0]
+
+
+@then(parsers.parse("the point comes back to {x:d},{y:d}"))
+def _(point, x, y):
+    """the point comes back to <x>,<y>."""
+    assert np.abs(point - (x, y)).max() < 0.5
+
+
+@then("the maps are the same after saving")
+def _(tmp_path, calibration):
+    """the maps are the same after saving."""
+    az = calibration.maps.table[..., 0]
+    assert az[320, 320] == 0
+    # The corners are beyond the inverse of k1 = -0.2: check the center row.
+    assert (np.diff(az[320]) >= 0).all()
+    calibration.save(path := tmp_path / "calibration.npz")
+    loaded = Calibration.load(path)
+    assert (loaded.maps.table == calibration.maps.table).all()
+    assert np.allclose(loaded.camera, calibration.camera)
+
+
+@given(
+    parsers.parse("a calibration for frames of {width:d}x{height:d}"),
+    target_fixture="calibration",
+)
+def _(width, height):
+    """a calibration for frames of <width>x<height>."""
+    camera = np.array([[500.0, 0.0, width / 2], [0.0, 500.0, height / 2], [0.0, 0.0, 1.0]])
+    return Calibration((width, height), camera, np.zeros(5))
+
+
+@when("calibrate the frames", target_fixture="error")
+def _(calibration):
+    """calibrate the frames."""
+    try:
+        Frame.calibrate(calibration)
+    except ValueError as e:
+        return e
+    assert Frame.calibration is calibration
+    Frame.calibrate(None)
+    return None
+
+
+@then(parsers.parse("the calibration is {result}"))
+def _(error, result):
+    """the calibration is <result>."""
+    assert (error is not None) == (result == "refused")
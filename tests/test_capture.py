@@ -0,0 +1,55 @@
+"""Capture feature tests."""
+
+from pathlib import Path
+
+from pytest_bdd import given, parsers, scenario, then, when
+
+from poppy.raspi_thymio.capture import CaptureThread, FileSource
+from poppy.raspi_thymio.frame import Frame
+
+
+@scenario("capture.feature", "Replay image files")
+def test_replay_image_files():
+    """Replay image files."""
+
+
+@given(parsers.parse("a capture thread replaying {images:S}"), target_fixture="capture")
+def _(images):
+    """a capture thread replaying <images>."""
+    files = [Path("tests") / "data" / image for image in images.split(";")]
+    capture = CaptureThread(FileSource(files, freq_hz=100))
+    capture.start()
+    yield capture
+    capture.stop()
+
+
+@when(parsers.parse("wait for {count:d} snapshots"), target_fixture="snapshots")
+def _(capture, count):
+    """wait for <count> snapshots."""
+    snapshots = []
+    after = -1
+    for _ in range(count):
+        snapshot = capture.wait(after=after, timeout=5.0)
+        snapshots.append(snapshot._replace(image=snapshot.image.copy()))
+        after = snapshot.sequence
+    return snapshots
+
+
+@then("snapshots are in sequence")
+def _(snapshots):
+    """snapshots are in sequence."""
+    for previous, current in zip(snapshots, snapshots[1:]):
+        assert current.sequence > previous.sequence
+        assert current.timestamp > previous.timestamp
+    for snapshot in snapshots:
+        assert snapshot.image.shape == (640, 640, 3)
+
+
+@then("frame takes the latest snapshot")
+def _(tmpdir, capture):
+    """frame takes the latest snapshot."""
+    frame = Frame(out_dir=tmpdir, capture=capture)
+    frame.get_frame()
+    assert frame.color.size == (640, 640)
+    assert frame.sequence >= 0
+    assert frame.timestamp > 0
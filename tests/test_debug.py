@@ -0,0 +1,59 @@
+"""Debug feature tests."""
+
+import json
+import logging
+
+from pytest_bdd import given, parsers, scenario, then, when
+
+from poppy.raspi_thymio.debug import DebugRing, Lazy
+
+
+@scenario("debug.feature", "Keep the last records")
+def test_keep_the_last_records():
+    """Keep the last records."""
+
+
+@scenario("debug.feature", "Format lazy arguments only when emitted")
+def test_format_lazy_arguments_only_when_emitted():
+    """Format lazy arguments only when emitted."""
+
+
+@given(parsers.parse("a debug ring of size {size:d}"), target_fixture="ring")
+def _(tmp_path, size):
+    """a debug ring of size <size>."""
+    return DebugRing(size, path=tmp_path / "debug-ring.json")
+
+
+@when(parsers.parse("record {count:d} ticks"))
+def _(ring, count):
+    """record <count> ticks."""
+    for tick in range(1, count + 1):
+        ring.record(tick=tick, found=[tick % 3])
+
+
+@then(parsers.parse("the dump holds ticks {ticks:S}"))
+def _(ring, ticks):
+    """the dump holds ticks <ticks>."""
+    dump = json.loads(ring.dump(reason="test").read_text())
+    assert dump["reason"] == "test"
+    assert [r["tick"] for r in dump["records"]] == [int(t) for t in ticks.split(",")]
+
+
+@given("a lazy log argument", target_fixture="calls")
+def _():
+    """a lazy log argument."""
+    return []
+
+
+@when("log it at DEBUG with level INFO")
+def _(calls):
+    """log it at DEBUG with level INFO."""
+    logger = logging.getLogger("test_debug")
+    logger.setLevel(logging.INFO)
+    logger.debug("Lazy %s", Lazy(lambda: calls.append("formatted")))
+
+
+@then("it was not formatted")
+def _(calls):
+    """it was not formatted."""
+    assert calls == []
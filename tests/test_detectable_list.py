@@ -24,6 +24,11 @@ def test_merge_thing_lists():
     """Merge thing lists."""
 
 
+@scenario("detectable-list.feature", "Compact array form")
+def test_compact_array_form():
+    """Compact array form."""
+
+
 @given(
     parsers.parse("a list with one thing {initial_spec:S}"), target_fixture="current"
 )
@@ -44,6 +49,12 @@ def _(current, todo):
     current.merge(todo)
 
 
+@when("convert to array and back", target_fixture="current")
+def _(current):
+    """convert to array and back."""
+    return DetectableList.from_array(current.to_array())
+
+
 @then(parsers.parse("result is {expect_spec:S}"))
 def _(expect_spec, current):
     """result is <expect_spec>."""
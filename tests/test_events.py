@@ -0,0 +1,119 @@
+"""Events feature tests."""
+
+from pathlib import Path
+
+import numpy as np
+from pytest_bdd import given, parsers, scenario, then, when
+
+from poppy.raspi_thymio.events import EventEncoder
+from poppy.raspi_thymio.frame import Frame
+from poppy.raspi_thymio.lane import LaneList
+from poppy.raspi_thymio.thing import ThingKind, ThingList
+
+
+@scenario("events.feature", "Encode things")
+def test_encode_things():
+    """Encode things."""
+
+
+@scenario("events.feature", "Encode lanes")
+def test_encode_lanes():
+    """Encode lanes."""
+
+
+@scenario("events.feature", "Encode frame age")
+def test_encode_frame_age():
+    """Encode frame age."""
+
+
+@given(parsers.re(r"things (?P<things>.*)"), target_fixture="objects")
+def _(things):
+    """things <things>."""
+    rows = [
+        [float(kind), float(conf), *map(float, xyxy.split(",")), *map(float, rgb.split(","))]
+        for kind, conf, xyxy, rgb in (t.split(":") for t in things.split(";") if t)
+    ]
+    objects = ThingList.from_array(np.array(rows).reshape(-1, 9))
+    objects.update_targets()
+    return objects
+
+
+@given(parsers.parse("image from file {image:S}"), target_fixture="frame")
+def _(tmpdir, image):
+    """image from file <image>."""
+    frame = Frame(out_dir=tmpdir)
+    frame.get_frame(Path("tests") / "data" / image)
+    return frame
+
+
+@when("encode events", target_fixture="encoded")
+def _(objects):
+    """encode events."""
+    encoder = EventEncoder()
+    return (
+        encoder.vectors("camera.detect", objects).tolist(),
+        encoder.targets(objects).tolist(),
+    )
+
+
+@when("find lanes and encode events", target_fixture="encoded")
+def _(frame):
+    """find lanes and encode events."""
+    lanes = LaneList()
+    lanes.refresh(frame)
+    lanes.update_targets()
+    return lanes, EventEncoder().targets(lanes).tolist()
+
+
+@when(
+    parsers.parse("encode events of frame {frame:d} aged {age:d} ms"),
+    target_fixture="encoded",
+)
+def _(objects, frame, age):
+    """encode events of frame <frame> aged <age> ms."""
+    encoder = EventEncoder(frame_age=True)
+    assert dict(encoder.events)["camera.detect"] == 7
+    encoder.stamp(frame, age)
+    return encoder.vectors("camera.detect", objects).tolist()
+
+
+@then(parsers.parse("camera.detect vectors end with trace {trace:d} and age {age:d}"))
+def _(objects, encoded, trace, age):
+    """camera.detect vectors end with trace <trace> and age <age>."""
+    assert encoded == [
+        [f[k] for k in ("class", "conf", "color", "az", "el")] + [trace, age]
+        for f in (thing.format() for thing in objects)
+    ]
+
+
+@then("camera.detect vectors match the JSON format")
+def _(objects, encoded):
+    """camera.detect vectors match the JSON format."""
+    detect, _ = encoded
+    assert detect == [
+        [f[k] for k in ("class", "conf", "color", "az", "el")]
+        for f in (thing.format() for thing in objects)
+    ]
+
+
+@then(parsers.re(r"camera.thing has targets (?P<targets>.*)"))
+def _(objects, encoded, targets):
+    """camera.thing has targets <targets>."""
+    _, vector = encoded
+    assert len(vector) == 4 * (len(ThingKind) - 1)
+    kinds = [int(k) for k in targets.split(",") if k]
+    for kind in range(len(ThingKind) - 1):
+        slot = vector[4 * kind : 4 * kind + 4]
+        if kind in kinds:
+            f = next(t for t in objects if t.kind == kind).format()
+            assert slot == [f["conf"], f["color"], f["az"], f["el"]]
+        else:
+            assert slot == [0, 0, 0, 0]
+
+
+@then("camera.lane vector matches the JSON format")
+def _(encoded):
+    """camera.lane vector matches the JSON format."""
+    lanes, vector = encoded
+    target = next(lane for lane in lanes if lane.target).format()
+    assert vector == [target["az"], target["el"], int(target["slope"] * 100)]
@@ -31,6 +31,11 @@ def test_retrieve_edges():
     """Retrieve edges."""
 
 
+@scenario("frame.feature", "Sample center colors")
+def test_sample_center_colors():
+    """Sample center colors."""
+
+
 @scenario("frame.feature", "Retrieve grayscale")
 def test_retrieve_grayscale():
     """Retrieve grayscale."""
@@ -137,6 +142,12 @@ def _(frame, x_y):
     return frame.remap_gray(x_y)
 
 
+@when("sample center color", target_fixture="center_color")
+def _(frame, x_y):
+    """sample center color."""
+    return frame.center_color(x_y)
+
+
 @then("decorated things are as expected")
 def _(frame, things):
     """decorated things are as expected."""
@@ -183,3 +194,12 @@ def _(remap_edge, edge_xy):
 def _(remap_gray, gray_xy):
     """remapped grayscale feature is correct."""
     assert remap_gray.tolist() == [int(x) for x in gray_xy.split(",")]
+
+
+@then("center color is the mean around the feature")
+def _(frame, x_y, center_color):
+    """center color is the mean around the feature."""
+    cx, cy = x_y
+    pixels = np.array(frame.color)[(cy - 7):(cy + 7), (cx - 7):(cx + 7)]
+    expected = pixels.reshape(-1, 3).mean(axis=0).astype(int)
+    assert center_color.tolist() == expected.tolist()
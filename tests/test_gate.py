@@ -0,0 +1,43 @@
+"""Gate feature tests."""
+
+import time
+from pathlib import Path
+
+from pytest_bdd import given, parsers, scenario, then, when
+
+from poppy.raspi_thymio.frame import Frame
+from poppy.raspi_thymio.gate import ChangeGate
+
+
+@scenario("gate.feature", "Detect scene changes")
+def test_detect_scene_changes():
+    """Detect scene changes."""
+
+
+@given(parsers.parse("a change gate that saw {image:S}"), target_fixture="gate")
+def _(tmpdir, image):
+    """a change gate that saw <image>."""
+    gate = ChangeGate(max_age=0.2)
+    frame = Frame(out_dir=tmpdir)
+    frame.get_frame(Path("tests") / "data" / image)
+    assert gate.changed(frame)
+    return gate
+
+
+@when(
+    parsers.parse("the gate sees {image:S} after {delay:g} sec"),
+    target_fixture="changed",
+)
+def _(tmpdir, gate, image, delay):
+    """the gate sees <image> after <delay> sec."""
+    time.sleep(delay)
+    frame = Frame(out_dir=tmpdir)
+    frame.get_frame(Path("tests") / "data" / image)
+    return gate.changed(frame)
+
+
+@then(parsers.parse("the scene changed is {expected:w}"))
+def _(gate, changed, expected):
+    """the scene changed is <expected>."""
+    assert str(changed) == expected
+    assert gate.skipped == (not changed)
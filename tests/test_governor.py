@@ -0,0 +1,53 @@
+"""Governor feature tests."""
+
+import json
+
+from pytest_bdd import given, parsers, scenario, then, when
+
+from poppy.raspi_thymio.governor import Governor
+
+
+@scenario("governor.feature", "Adapt to latency and temperature")
+def test_adapt_to_latency_and_temperature():
+    """Adapt to latency and temperature."""
+
+
+@scenario("governor.feature", "Recover when load drops")
+def test_recover_when_load_drops():
+    """Recover when load drops."""
+
+
+@given(
+    parsers.parse("a governor with target latency {latency:g} and temperature {temp:g}"),
+    target_fixture="governor",
+)
+def _(tmp_path, monkeypatch, latency, temp):
+    """a governor with target latency <latency> and temperature <temp>."""
+    monkeypatch.setattr(Governor, "throttled", tmp_path / "get_throttled")
+    monkeypatch.setattr("os.getloadavg", lambda: (0.0, 0.0, 0.0))
+    return Governor(
+        target_latency=latency, target_temp=temp, status_file=tmp_path / "governor.json"
+    )
+
+
+@given(parsers.parse("CPU temperature {temp:g}"))
+def _(tmp_path, monkeypatch, governor, temp):
+    """CPU temperature <temp>."""
+    (zone := tmp_path / "temp").write_text(str(int(temp * 1000)))
+    monkeypatch.setattr(governor, "thermal_zone", zone)
+
+
+@when(parsers.parse("{ticks:d} ticks take {latency:g} sec"))
+def _(governor, ticks, latency):
+    """<ticks> ticks take <latency> sec."""
+    for _ in range(ticks):
+        governor.tick(latency)
+
+
+@then(parsers.parse("governor level is {level:d}"))
+def _(governor, level):
+    """governor level is <level>."""
+    assert governor.level == level
+    status = json.loads(governor.status_file.read_text())
+    assert status["level"] == level
+    assert status["imgsz"] == Governor.ladder[level][1]
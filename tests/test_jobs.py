@@ -0,0 +1,82 @@
+"""Jobs feature tests."""
+
+import asyncio
+
+from pytest_bdd import given, parsers, scenario, then, when
+
+from poppy.raspi_thymio.webui.jobs import JobRunner
+
+
+@scenario("jobs.feature", "Job outcome")
+def test_job_outcome():
+    """Job outcome."""
+
+
+@scenario("jobs.feature", "Same action runs once")
+def test_same_action_runs_once():
+    """Same action runs once."""
+
+
+async def returns(job):
+    return "ok"
+
+
+async def raises(job):
+    raise RuntimeError("no detector")
+
+
+async def waits_for_an_ack(job):
+    await asyncio.get_running_loop().create_future()
+
+
+@given("a job runner", target_fixture="runner")
+def _():
+    """a job runner."""
+    updates = []
+    runner = JobRunner(notify=updates.append)
+    runner.updates = updates
+    return runner
+
+
+@when(
+    parsers.parse("run a job that {behavior} with timeout {timeout:g} sec"),
+    target_fixture="job",
+)
+def _(runner, behavior, timeout):
+    """run a job that <behavior> with timeout <timeout> sec."""
+    action = globals()[behavior.replace(" ", "_")]
+
+    async def run():
+        job = runner.submit(behavior, action, timeout=timeout)
+        assert job.state == "running"
+        await asyncio.gather(*runner.tasks)
+        return job
+
+    return asyncio.run(run())
+
+
+@when("start the same job twice", target_fixture="job")
+def _(runner):
+    """start the same job twice."""
+
+    async def run():
+        first = runner.submit("shutdown", waits_for_an_ack, timeout=0.1)
+        second = runner.submit("shutdown", waits_for_an_ack, timeout=0.1)
+        assert first is second
+        await asyncio.gather(*runner.tasks)
+        return first
+
+    return asyncio.run(run())
+
+
+@then(parsers.parse("the job state is {state:w}"))
+def _(runner, job, state):
+    """the job state is <state>."""
+    assert job.state == state
+    assert runner.updates[-1]["job"]["state"] == state
+
+
+@then("only one job runs")
+def _(runner):
+    """only one job runs."""
+    assert len(runner.status()) == 1
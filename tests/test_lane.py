@@ -1,5 +1,6 @@
 """Lane feature tests."""
 
+from collections import deque
 from pathlib import Path
 
 from pytest import approx
@@ -14,6 +15,11 @@ def test_lane_detection():
     """Lane detection."""
 
 
+@scenario("lane.feature", "Lane history per stream")
+def test_lane_history_per_stream():
+    """Lane history per stream."""
+
+
 @given(parsers.parse("image from file {image:S}"), target_fixture="frame")
 def _(tmpdir, image):
     """image from file <image>."""
@@ -44,3 +50,67 @@ def _(lane, lanes):
             and candidate.azel[0] == approx(az, abs=10, rel=0.5)
             for candidate in lanes or []
         )
+
+
+@when("refresh one of two lane lists", target_fixture="lane_lists")
+def _(frame):
+    """refresh one of two lane lists."""
+    lane_lists = LaneList(), LaneList()
+    lane_lists[0].refresh(frame)
+    return lane_lists
+
+
+@then("only that lane list has history")
+def _(lane_lists):
+    """only that lane list has history."""
+    assert len(lane_lists[0].lines) == 1
+    assert len(lane_lists[1].lines) == 0
+    assert lane_lists[0].lines is not LaneList.lines
+
+
+@scenario("lane.feature", "Lane tracking")
+def test_lane_tracking():
+    """Lane tracking."""
+
+
+@scenario("lane.feature", "Tracked lanes survive a missed frame")
+def test_tracked_lanes_survive_a_missed_frame():
+    """Tracked lanes survive a missed frame."""
+
+
+@when(parsers.parse("track lanes in {count:d} frames"), target_fixture="tracked")
+def _(frame, count):
+    """track lanes in <count> frames."""
+    lanes = LaneList()
+    for i in range(count):
+        frame.timestamp = (i + 1) * 500_000_000
+        tracked = lanes.track(frame)
+    return [lanes, tracked]
+
+
+@when(parsers.parse("track lanes in image {image:S} with motors {motors:S}"))
+def _(tmpdir, frame, tracked, image, motors):
+    """track lanes in image <image> with motors <motors>."""
+    lanes, _ = tracked
+    other = Frame(out_dir=tmpdir)
+    other.get_frame(Path("tests") / "data" / image)
+    other.timestamp = frame.timestamp + 500_000_000
+    lanes.motors = tuple(int(i) for i in motors.split(","))
+    tracked.append(lanes.track(other))
+
+
+@then("tracked lanes are the detected lanes")
+def _(frame, tracked):
+    """tracked lanes are the detected lanes."""
+    _, lanes = tracked
+    detected = LaneList.detect(frame, history=deque())
+    assert sorted(lane.azel for lane in lanes) == sorted(lane.azel for lane in detected)
+
+
+@then(parsers.parse("tracked lanes moved by {shift:d} px"))
+def _(tracked, shift):
+    """tracked lanes moved by <shift> px."""
+    _, before, after = tracked
+    assert len(after) == len(before)
+    for a, b in zip(after, before):
+        assert a.xyxy[0] - b.xyxy[0] == approx(shift, abs=2)
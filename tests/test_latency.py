@@ -0,0 +1,55 @@
+"""Latency feature tests."""
+
+from pytest_bdd import given, parsers, scenario, then, when
+
+from poppy.raspi_thymio.latency import LatencyTracer
+
+
+@scenario("latency.feature", "Acknowledge sent events")
+def test_acknowledge_sent_events():
+    """Acknowledge sent events."""
+
+
+@given("a latency tracer", target_fixture="tracer")
+def _(tmp_path):
+    """a latency tracer."""
+    return LatencyTracer(status_file=tmp_path / "latency.json")
+
+
+@when(parsers.parse("trace a frame with {events:d} camera.detect events"))
+def _(tracer, events):
+    """trace a frame with <events> camera.detect events."""
+    trace = LatencyTracer.begin("test/1", 0)
+    for stage in ("detect", "publish", "send"):
+        LatencyTracer.mark(trace, stage)
+    tracer.end(trace, events=events)
+
+
+@when(parsers.parse("the Thymio heartbeat goes {beats:S}"))
+def _(tracer, beats):
+    """the Thymio heartbeat goes <beats>."""
+    for beat in beats.split(","):
+        tracer.variables({"_camera.heartbeat": [int(beat)]})
+
+
+@then("each stage was counted once")
+def _(tracer):
+    """each stage was counted once."""
+    tracer.write_status()
+    status = tracer.status()
+    assert status["last"]["trace"] == "test/1"
+    for segment in ("detect", "publish", "send", "total"):
+        assert sum(status["histograms"][segment]) == 1
+
+
+@then(parsers.parse("the frame was acknowledged {acked}"))
+def _(tracer, acked):
+    """the frame was acknowledged <acked>."""
+    histograms = tracer.status()["histograms"]
+    assert sum(histograms["ack"]) == sum(histograms["acked"]) == (acked == "True")
+
+
+@then(parsers.parse("{waiting:d} events wait for acknowledgement"))
+def _(tracer, waiting):
+    """<waiting> events wait for acknowledgement."""
+    assert len(tracer.sent) == waiting
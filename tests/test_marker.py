@@ -0,0 +1,50 @@
+"""Marker feature tests."""
+
+import cv2
+import numpy as np
+from PIL import Image
+from pytest_bdd import given, parsers, scenario, then, when
+
+from poppy.raspi_thymio.frame import Frame
+from poppy.raspi_thymio.marker import MarkerList
+
+
+@scenario("marker.feature", "Find markers")
+def test_find_markers():
+    """Find markers."""
+
+
+@given(parsers.parse("a frame with marker {marker:d} at {x:d},{y:d}"), target_fixture="frame")
+def _(tmpdir, marker, x, y):
+    """a frame with marker <marker> at <x>,<y>."""
+    dictionary = cv2.aruco.getPredefinedDictionary(getattr(cv2.aruco, MarkerList.dictionary))
+    tag = cv2.aruco.generateImageMarker(dictionary, marker, 120)
+    image = Image.new("RGB", (640, 640), (255, 255, 255))
+    image.paste(Image.fromarray(tag).convert("RGB"), (x - 60, y - 60))
+    frame = Frame(out_dir=tmpdir)
+    frame.load(image)
+    return frame
+
+
+@when(parsers.parse("detect markers for classes {classes:S}"), target_fixture="markers")
+def _(frame, classes):
+    """detect markers for classes <classes>."""
+    MarkerList.configure(classes=None if classes == "None" else classes.split(","))
+    try:
+        return MarkerList.detect(frame)
+    finally:
+        MarkerList.configure(classes=None)
+
+
+@then(parsers.parse("the markers found are {kinds:S}"))
+def _(markers, kinds):
+    """the markers found are <kinds>."""
+    assert [m.kind.name for m in markers] == ([] if kinds == "None" else kinds.split(","))
+
+
+@then(parsers.parse("the things are centered at {x:d},{y:d}"))
+def _(markers, x, y):
+    """the things are centered at <x>,<y>."""
+    for marker in markers:
+        assert np.abs(marker.center - (x, y)).max() <= 2
+        assert marker.confidence == 1.0
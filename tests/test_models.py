@@ -0,0 +1,63 @@
+"""Models feature tests."""
+
+import yaml
+from pytest_bdd import given, parsers, scenario, then, when
+
+from poppy.raspi_thymio.models import ModelRegistry
+
+
+@scenario("models.feature", "Choose a model variant")
+def test_choose_a_model_variant():
+    """Choose a model variant."""
+
+
+@scenario("models.feature", "Cache benchmark times")
+def test_cache_benchmark_times():
+    """Cache benchmark times."""
+
+
+@given(parsers.parse("model variants {specs:S}"), target_fixture="registry")
+def _(tmp_path, specs):
+    """model variants <specs>."""
+    for spec in specs.split(","):
+        name, imgsz, precision = spec.split("-")
+        model_dir = tmp_path / "models" / f"UCIA-II-{name.upper()}" / f"{spec}_ncnn_model"
+        model_dir.mkdir(parents=True)
+        meta = dict(imgsz=[int(imgsz)], args=dict(half=precision == "fp16"))
+        meta["args"]["int8"] = precision == "int8"
+        (model_dir / "metadata.yaml").write_text(yaml.safe_dump(meta))
+    return ModelRegistry(root=tmp_path / "models", cache_file=tmp_path / "cache.json")
+
+
+@given(parsers.parse("benchmark times {times:S}"))
+def _(registry, times):
+    """benchmark times <times>."""
+    for spec, t in (i.split("=") for i in times.split(",")):
+        name = next(n for n in registry.variants if n.endswith(f"/{spec}_ncnn_model"))
+        registry.latency[name] = float(t)
+
+
+@when(parsers.parse("choose within {budget:g} sec"), target_fixture="chosen")
+def _(registry, budget):
+    """choose within <budget> sec."""
+    return registry.select(registry.choose(budget).name)
+
+
+@when("save benchmark cache")
+def _(registry):
+    """save benchmark cache."""
+    registry.save_cache()
+
+
+@then(parsers.parse("chosen variant is {variant:S}"))
+def _(registry, chosen, variant):
+    """chosen variant is <variant>."""
+    assert chosen.path.name == f"{variant}_ncnn_model"
+    assert registry.settings == {"model": str(chosen.path), "imgsz": chosen.imgsz}
+
+
+@then("a new registry knows the same benchmark times")
+def _(registry):
+    """a new registry knows the same benchmark times."""
+    again = ModelRegistry(root=registry.root, cache_file=registry.cache_file)
+    assert again.latency == registry.latency
@@ -0,0 +1,38 @@
+"""Program needs feature tests."""
+
+from pytest_bdd import given, parsers, scenario, then
+
+from poppy.raspi_thymio.needs import ProgramNeeds
+
+
+@scenario("needs.feature", "Read program needs")
+def test_read_program_needs():
+    """Read program needs."""
+
+
+@given(parsers.parse("the program {program:S}"), target_fixture="needs")
+def _(program):
+    """the program <program>."""
+    needs = ProgramNeeds()
+    needs.select(program)
+    return needs
+
+
+@then(parsers.parse("the camera is on {camera:S}"))
+def _(needs, camera):
+    """the camera is on <camera>."""
+    assert needs.camera_on == (camera == "True")
+
+
+@then(parsers.parse("the detectors run on tick {tick:d} at {hz:g} Hz are {detectors:S}"))
+def _(needs, tick, hz, detectors):
+    """the detectors run on tick <tick> at <hz> Hz are <detectors>."""
+    running = [name for name in ("things", "lanes") if needs.runs(name, tick, hz)]
+    assert running == ([] if detectors == "None" else detectors.split(","))
+
+
+@then(parsers.parse("the things classes are {classes:S}"))
+def _(needs, classes):
+    """the things classes are <classes>."""
+    expected = None if classes == "None" else classes.split(",")
+    assert needs.settings("things") == {"classes": expected}
@@ -0,0 +1,66 @@
+"""Detector plugins feature tests."""
+
+from pytest_bdd import given, parsers, scenario, then, when
+
+from poppy.raspi_thymio.detectable import DetectableList
+from poppy.raspi_thymio.events import EventEncoder
+from poppy.raspi_thymio.plugins import DetectorRegistry
+
+
+class MarkList(DetectableList):
+    """
+    Plugin with its own event, two kinds of three fields.
+    """
+
+    name = "marks"
+    event_name = "camera.mark"
+    event_layout = ("az", "el", "conf")
+    views = ("color", "gray")
+
+
+@scenario("plugins.feature", "Describe detectors")
+def test_describe_detectors():
+    """Describe detectors."""
+
+
+@scenario("plugins.feature", "Register plugin events")
+def test_register_plugin_events():
+    """Register plugin events."""
+
+
+@given("a detector registry", target_fixture="registry")
+def _():
+    """a detector registry."""
+    registry = DetectorRegistry()
+    registry.targets["marks"] = f"{__name__}:MarkList"
+    assert {"things", "lanes", "marks"} <= set(registry.names())
+    assert not registry.loaded
+    return registry
+
+
+@when(parsers.parse("load the detector {name:S}"))
+def _(registry, name):
+    """load the detector <name>."""
+    assert registry.create(name).name == name
+
+
+@then(
+    parsers.parse("the detector {name:S} costs {cost:S}, reads {views:S} and sends {event:S}")
+)
+def _(registry, name, cost, views, event):
+    """the detector <name> costs <cost>, reads <views> and sends <event>."""
+    described = registry.describe(name)
+    assert described["cost"] == cost
+    assert described["views"] == views.split(",")
+    assert described["event"] == event
+    assert described["layout"]
+    assert list(registry.loaded) == [name]
+
+
+@then(parsers.parse("the event encoder registers {event:S} with {size:d} values"))
+def _(registry, event, size):
+    """the event encoder registers <event> with <size> values."""
+    encoder = EventEncoder()
+    encoder.register(registry.load("marks"))
+    assert (event, size) in encoder.events
+    assert len(encoder.buffers[event]) == size
@@ -0,0 +1,63 @@
+"""Profiler feature tests."""
+
+import json
+import time
+
+from pytest_bdd import given, parsers, scenario, then, when
+
+from poppy.raspi_thymio.profiler import SlowTickProfiler
+
+
+@scenario("profiler.feature", "Profile slow ticks")
+def test_profile_slow_ticks():
+    """Profile slow ticks."""
+
+
+@given(parsers.parse("a profiler with budget {budget:g} sec"), target_fixture="profiler")
+def _(tmp_path, budget):
+    """a profiler with budget <budget> sec."""
+    profiler = SlowTickProfiler(budget=budget, status_file=tmp_path / "slow-ticks.json")
+    yield profiler
+    profiler.close()
+    assert not profiler.thread.is_alive()
+
+
+def wait_in_stage(wait):
+    time.sleep(wait)
+
+
+@when(
+    parsers.parse("run a tick that waits {wait:g} sec in stage {stage:S}"),
+    target_fixture="samples",
+)
+def _(profiler, wait, stage):
+    """run a tick that waits <wait> sec in stage <stage>."""
+    with profiler.tick("test") as samples:
+        samples.frame = 7
+        samples.mark(stage)
+        wait_in_stage(wait)
+    return samples
+
+
+@then(parsers.parse("{count:d} slow ticks are kept"))
+def _(profiler, count):
+    """<count> slow ticks are kept."""
+    assert len(profiler.status()["slow"]) == count
+    if count:
+        status = json.loads(profiler.status_file.read_text())
+        assert status["slow"][0]["frame"] == 7
+        assert any("wait_in_stage" in stack for stack, n in status["slow"][0]["stacks"])
+
+
+@then(parsers.parse("the slow tick stages include {stage:S}"))
+def _(profiler, stage):
+    """the slow tick stages include <stage>."""
+    for profile in profiler.status()["slow"]:
+        assert stage in [name for name, duration in profile["stages"]]
+
+
+@then(parsers.parse("the tick was sampled {sampled:S}"))
+def _(samples, sampled):
+    """the tick was sampled <sampled>."""
+    # Ticks are sampled only after half the budget.
+    assert bool(samples.stacks) == (sampled == "yes")
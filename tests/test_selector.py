@@ -0,0 +1,40 @@
+"""Target selector feature tests."""
+
+import numpy as np
+from pytest_bdd import given, parsers, scenario, then, when
+
+from poppy.raspi_thymio.selector import TargetSelector
+from poppy.raspi_thymio.thing import ThingKind
+
+
+@scenario("selector.feature", "Select targets")
+def test_select_targets():
+    """Select targets."""
+
+
+@given(
+    parsers.parse("a target selector with margin {margin:g} for {frames:d} frames"),
+    target_fixture="selector",
+)
+def _(margin, frames):
+    """a target selector with margin <margin> for <frames> frames."""
+    return TargetSelector(ThingKind, margin=margin, frames=frames)
+
+
+@when(parsers.parse("select targets in {frames:S}"), target_fixture="targets")
+def _(selector, frames):
+    """select targets in <frames>."""
+    targets = np.zeros(0, dtype=bool)
+    for spec in frames.split("/"):
+        rows = np.array([[float(v) for v in f.split(",")] for f in spec.split(";")])
+        # Features keep their place in the list from frame to frame.
+        held = np.zeros(len(rows))
+        held[: len(targets)] = targets[: len(rows)]
+        targets = selector.select(np.c_[rows, held])
+    return targets
+
+
+@then(parsers.parse("targets are {expected:S}"))
+def _(targets, expected):
+    """targets are <expected>."""
+    assert np.nonzero(targets)[0].tolist() == [int(i) for i in expected.split(",")]
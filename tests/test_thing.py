@@ -4,6 +4,9 @@ import base64
 import json
 from pathlib import Path
 
+import cv2
+import numpy as np
+import torch
 from pytest import approx
 from pytest_bdd import given, parsers, scenario, then, when
 
@@ -26,6 +29,16 @@ def test_format_things():
     """Format Things."""
 
 
+@scenario("thing.feature", "Interpret YOLO boxes")
+def test_interpret_yolo_boxes():
+    """Interpret YOLO boxes."""
+
+
+@scenario("thing.feature", "Reuse the YOLO input tensor")
+def test_reuse_the_yolo_input_tensor():
+    """Reuse the YOLO input tensor."""
+
+
 @given(parsers.parse("image from file {image:S}"), target_fixture="frame")
 def _(tmpdir, image):
     """image from file <image>."""
@@ -107,3 +120,60 @@ def _(things, balls, cubes, stars):
             and candidate.confidence * 100 == approx(conf, abs=10, rel=0.5)
             for candidate in things or []
         )
+
+
+@given(parsers.parse("YOLO boxes {boxes:S}"), target_fixture="data")
+def _(boxes):
+    """YOLO boxes <boxes>."""
+    if boxes == "None":
+        return np.zeros((0, 6))
+    return np.array([[float(v) for v in box.split(",")] for box in boxes.split(";")])
+
+
+@when(parsers.parse("interpret them at scale {scale:g}"), target_fixture="things")
+def _(data, scale):
+    """interpret them at scale <scale>."""
+    return ThingList.postprocess(data, scale=scale, height=640)
+
+
+@then(parsers.parse("things are {expected:S}"))
+def _(things, expected):
+    """things are <things>."""
+    found = [f"{t.kind.name}:{','.join(str(v) for v in t.xyxy)}" for t in things]
+    assert found == ([] if expected == "None" else expected.split(";"))
+
+
+@when(parsers.parse("preprocess at {imgsz:d}"), target_fixture="tensors")
+def _(frame, imgsz):
+    """preprocess at <imgsz>."""
+    return [ThingList.preprocess(frame, imgsz)]
+
+
+@when(parsers.parse("preprocess image {image:S} at {imgsz:d}"))
+def _(frame, tensors, image, imgsz):
+    """preprocess image <image> at <imgsz>."""
+    frame.get_frame(Path("tests") / "data" / image)
+    tensors.append(ThingList.preprocess(frame, imgsz))
+
+
+@then(parsers.parse("the inputs are one 1x3x{imgsz:d}x{imgsz2:d} tensor"))
+def _(tensors, imgsz, imgsz2):
+    """the inputs are one 1x3x<imgsz>x<imgsz> tensor."""
+    first, last = tensors
+    assert last is first
+    assert first.dtype == torch.float32
+    assert tuple(first.shape) == (1, 3, imgsz, imgsz2)
+    # One buffer per image size.
+    assert ThingList.inputs[imgsz][0] is first
+    assert all(t is not first for size, (t, *_) in ThingList.inputs.items() if size != imgsz)
+
+
+@then("the input holds the last image")
+def _(frame, tensors):
+    """the input holds the last image."""
+    imgsz = tensors[-1].shape[-1]
+    gray = np.asarray(frame.gray)
+    if gray.shape != (imgsz, imgsz):
+        gray = cv2.resize(gray, (imgsz, imgsz), interpolation=cv2.INTER_AREA)
+    # The same gray image on the 3 channels, in [0, 1].
+    assert np.allclose(tensors[-1].numpy()[0], gray[None] / 255.0, atol=1e-6)
@@ -2,6 +2,9 @@
 Basic presence test for Thymio.
 """
 
+import pytest
+
+from poppy.raspi_thymio.remote import Remote
 from poppy.raspi_thymio.thymio import Thymio
 
 
@@ -19,3 +22,52 @@ def test_thymio():
         thymio.node.stop()
         thymio.node.unlock()
         thymio.client.disconnect()
+
+
+def test_thymio_disconnected():
+    """
+    Check that events are dropped, or the latest kept, without a Thymio.
+    """
+    for policy, kept in ("drop", {}), ("latest", {"command": [4]}):
+        thymio = Thymio(start=False, policy=policy)
+        thymio.events({"command": [3]})
+        thymio.events({"command": [4]})
+
+        assert thymio.pending["events"] == kept
+        assert not thymio.connected.is_set()
+
+
+def test_remote_program_disconnected():
+    """
+    Check that a program switch is not acknowledged as run without a Thymio.
+    """
+
+    class Received:
+        topic, payload = "remote", b""
+
+        def json(self):
+            return {"program": "_poweroff.aesl", "id": 7}
+
+    class Subscriber:
+        socket = "test"
+        messages = [Received()]
+
+        def recv(self):
+            if not self.messages:
+                raise EOFError
+            return self.messages.pop()
+
+    class Publisher:
+        sent = []
+
+        def send(self, topic, payload):
+            self.sent.append((topic, payload))
+
+    remote = Remote(Subscriber(), Thymio(start=False), publisher=(publisher := Publisher()))
+    with pytest.raises(EOFError):
+        remote.run()
+
+    # The program runs when a Thymio connects, which the ack tells apart.
+    assert publisher.sent == [
+        ("ack", {"id": 7, "program": "_poweroff.aesl", "ok": False, "status": "queued"})
+    ]
@@ -0,0 +1,48 @@
+"""Worker feature tests."""
+
+from pathlib import Path
+
+from pytest_bdd import given, parsers, scenario, then, when
+
+from poppy.raspi_thymio.frame import Frame
+from poppy.raspi_thymio.lane import LaneList
+from poppy.raspi_thymio.worker import WorkerPool
+
+
+@scenario("worker.feature", "Detect lanes in a worker process")
+def test_detect_lanes_in_a_worker_process():
+    """Detect lanes in a worker process."""
+
+
+@given(parsers.parse("image from file {image:S}"), target_fixture="frame")
+def _(tmpdir, image):
+    """image from file <image>."""
+    image_file = Path("tests") / "data" / image
+
+    frame = Frame(out_dir=tmpdir)
+    frame.get_frame(image_file)
+    return frame
+
+
+@given("a worker pool for lanes", target_fixture="pool")
+def _(frame):
+    """a worker pool for lanes."""
+    pool = WorkerPool([LaneList()], frame)
+    yield pool
+    pool.stop()
+
+
+@when("refresh in worker and in process", target_fixture="lanes")
+def _(frame, pool):
+    """refresh in worker and in process."""
+    pool.refresh(frame)
+    local = LaneList()
+    local.refresh(frame)
+    return pool.workers[0].objects, local
+
+
+@then("worker finds the same lanes")
+def _(lanes):
+    """worker finds the same lanes."""
+    remote, local = lanes
+    assert remote.to_array().tolist() == local.to_array().tolist()